@@ -0,0 +1,135 @@
+"""
+Write-behind buffer for User.last_activity.
+
+Requests record activity with a single HSET into a Redis hash of
+user_id -> timestamp instead of an UPDATE on accounts_user. A daemon thread
+in each worker (every USER_ACTIVITY FLUSH_INTERVAL seconds), or
+``manage.py flush_user_activity --interval N`` when the interval is 0,
+moves the buffered timestamps into the database with bulk_update,
+coalescing all writes per user. Concurrent flushers are safe: each takes
+the whole pending hash at once.
+"""
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+from core.connections import get_redis_client
+from core.flushing import PerProcess, start_periodic
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'user-activity:pending'
+
+DEFAULT_SETTINGS = {
+    'THROTTLE_SECONDS': 900,  # Minimum interval between recorded activity per user
+    'FLUSH_BATCH_SIZE': 1000,
+    'MAX_TRACKED_USERS': 10000,  # Size of the per-process throttle table
+    'FLUSH_INTERVAL': 60,  # Seconds between flushes by each worker, 0 disables
+}
+
+activity_settings = {**DEFAULT_SETTINGS, **getattr(settings, 'USER_ACTIVITY', {})}
+
+redis_client = get_redis_client('cache')
+
+# user_id -> monotonic time of the last HSET from this process, so a user whose
+# database value is stale until the next flush is not written on every request
+_recent = {}
+_recent_lock = threading.Lock()
+
+def should_record(user):
+    """Whether a request by ``user`` should record activity."""
+    throttle = activity_settings['THROTTLE_SECONDS']
+    last_activity = getattr(user, 'last_activity', None)
+    if last_activity and (datetime.now(dt_timezone.utc) - last_activity).total_seconds() <= throttle:
+        return False
+
+    recorded = _recent.get(user.pk)
+    return recorded is None or time.monotonic() - recorded > throttle
+
+def record_activity(user_id, timestamp=None):
+    """Buffer an activity timestamp; errors are logged, never raised."""
+    now = time.monotonic()
+    with _recent_lock:
+        if len(_recent) >= activity_settings['MAX_TRACKED_USERS']:
+            _recent.clear()
+        _recent[user_id] = now
+    _ensure_flusher()
+
+    try:
+        redis_client.hset(PENDING_KEY, user_id, timestamp if timestamp is not None else time.time())
+    except Exception as e:
+        logger.error(f"Error buffering activity for user {user_id}: {str(e)}")
+
+def flush_activity(batch_size=None):
+    """
+    Write buffered timestamps to accounts_user.
+
+    The pending hash is renamed to a private snapshot first, so activity
+    recorded during the flush goes to a fresh hash. If the database write
+    fails, the snapshot is merged back without overwriting newer entries.
+
+    Returns:
+        int: Number of users updated
+    """
+    batch_size = batch_size or activity_settings['FLUSH_BATCH_SIZE']
+    snapshot_key = f"{PENDING_KEY}:flushing:{uuid.uuid4().hex}"
+
+    try:
+        redis_client.rename(PENDING_KEY, snapshot_key)
+    except Exception:
+        # Nothing buffered
+        return 0
+
+    User = get_user_model()
+    updated = 0
+    try:
+        pending = redis_client.hgetall(snapshot_key)
+        users = [
+            User(pk=int(user_id), last_activity=datetime.fromtimestamp(float(timestamp), dt_timezone.utc))
+            for user_id, timestamp in pending.items()
+        ]
+        for i in range(0, len(users), batch_size):
+            batch = users[i:i + batch_size]
+            # bulk_update of users deleted meanwhile simply matches no row
+            User.objects.bulk_update(batch, ['last_activity'])
+            updated += len(batch)
+    except Exception as e:
+        logger.error(f"Error flushing user activity: {str(e)}")
+        _restore(snapshot_key)
+        raise
+    finally:
+        redis_client.unlink(snapshot_key)
+
+    return updated
+
+def _restore(snapshot_key):
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        for user_id, timestamp in redis_client.hgetall(snapshot_key).items():
+            pipe.hsetnx(PENDING_KEY, user_id, timestamp)
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Error restoring pending user activity: {str(e)}")
+
+def _ensure_flusher():
+    """Start the flush thread once per process."""
+    if activity_settings['FLUSH_INTERVAL']:
+        _flusher.ensure()
+
+def _start_flusher():
+    start_periodic(_flush_pending, activity_settings['FLUSH_INTERVAL'], 'user-activity-flusher')
+
+def _flush_pending():
+    try:
+        # The thread keeps its own connection; drop it once it is unusable
+        close_old_connections()
+        flush_activity()
+    except Exception:
+        # Already logged by flush_activity, retried on the next tick
+        pass
+
+_flusher = PerProcess(_start_flusher)
@@ -1,21 +1,19 @@
-from django.utils import timezone
 from django.utils.deprecation import MiddlewareMixin
+from .activity import record_activity, should_record
 
 class UserActivityMiddleware(MiddlewareMixin):
     """
     Middleware to track user's last activity time.
-    Updates the last_activity field for authenticated users.
+    Buffers the last_activity timestamp of authenticated users in Redis;
+    a flush thread in each worker (or `manage.py flush_user_activity`)
+    writes it to the database in batches.
     """
     
     def process_request(self, request):
         """
-        Process each request to update the user's last activity timestamp.
-        Only updates periodically to avoid excessive database writes.
+        Process each request to record the user's last activity timestamp.
+        Only records periodically (USER_ACTIVITY THROTTLE_SECONDS, 15 minutes
+        by default) and never writes to the database on the request path.
         """
-        if request.user.is_authenticated:
-            # Get last activity time
-            last_activity = getattr(request.user, 'last_activity', None)
-            
-            # If no last activity or it was more than 15 minutes ago, update it
-            if not last_activity or (timezone.now() - last_activity).seconds > 900:
-                request.user.mark_active()
\ No newline at end of file
+        if request.user.is_authenticated and should_record(request.user):
+            record_activity(request.user.pk)
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Token issuance shared by the register, login and refresh views.
+
+All Redis writes for one issuance (refresh token data plus the user's token
+index entries) go out in a single MULTI through the module-level token
+store, and expiry information is read from the token objects rather than by
+decoding the issued strings again.
+"""
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from core.authentication import token_store
+
+def token_response_data(refresh, access):
+    """
+    Build the token part of the auth responses.
+
+    Args:
+        refresh (RefreshToken): Newly issued refresh token, or None if the
+            refresh token was not rotated
+        access (AccessToken): Newly issued access token
+    """
+    access_expiry = settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
+    refresh_expiry = settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME']
+
+    data = {}
+    if refresh is not None:
+        data['refresh'] = str(refresh)
+    data['access'] = str(access)
+    data['expires'] = {'access': datetime_from_epoch(access['exp']).isoformat()}
+    data['expiry'] = {'access': f"{access_expiry.seconds // 3600}h"}
+
+    if refresh is not None:
+        data['expires']['refresh'] = datetime_from_epoch(refresh['exp']).isoformat()
+        data['expiry']['refresh'] = f"{refresh_expiry.days}d"
+    return data
+
+def issue_tokens(user):
+    """Create a token pair for ``user``, record it in Redis and return the response data"""
+    refresh = RefreshToken.for_user(user)
+    access = refresh.access_token
+    token_store.store_tokens(user.id, refresh, access)
+    return token_response_data(refresh, access)
+
+def record_refreshed_tokens(refresh, access):
+    """Record the tokens issued by a refresh; ``refresh`` is None without rotation"""
+    user_id = access[api_settings.USER_ID_CLAIM]
+    token_store.store_tokens(user_id, refresh, access)
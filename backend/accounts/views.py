@@ -3,7 +3,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth import get_user_model, login, logout, authenticate
-from django.utils import timezone 
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 from core.cache.utils import invalidate_cache_prefix
 from drf_yasg.utils import swagger_auto_schema
@@ -11,8 +11,8 @@ from drf_yasg import openapi
 from .serializers import UserSerializer, RegisterSerializer, LoginSerializer
 from django_redis import get_redis_connection
 # Add the import at the top:
-from core.authentication import RedisTokenStore
-from django.conf import settings  # Add this import
+from core.authentication import token_store, RedisTokenRefreshSerializer
+from .tokens import issue_tokens, record_refreshed_tokens, token_response_data
 # Import the token_refresh_view
 from rest_framework_simplejwt.views import TokenRefreshView
 import json
@@ -95,38 +95,10 @@ class RegisterView(APIView):
         if serializer.is_valid():
             user = serializer.save()
             
-            # Generate tokens
-            refresh = RefreshToken.for_user(user)
-            
-            # Calculate expiration times
-            access_exp = timezone.now() + settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
-            refresh_exp = timezone.now() + settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME']
-            
-            # Format expiration times in a human-readable way
-            access_expiry = settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
-            refresh_expiry = settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME']
-            
-            # Store token in Redis
-            token_store = RedisTokenStore()
-            token_store.add_token(
-                user_id=user.id,
-                jti=refresh['jti'],
-                token_data=str(refresh),
-                expires_at=refresh_exp
-            )
-            
+            # Generate tokens and store them in Redis
             return Response({
                 'user': UserSerializer(user).data,
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-                'expires': {
-                    'access': access_exp.isoformat(),
-                    'refresh': refresh_exp.isoformat(),
-                },
-                'expiry': {
-                    'access': f"{access_expiry.seconds // 3600}h",
-                    'refresh': f"{refresh_expiry.days}d"
-                }
+                **issue_tokens(user),
             }, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -183,25 +155,8 @@ class LoginView(APIView):
             user = authenticate(username=username, password=password)
             
             if user is not None:
-                # Generate tokens
-                refresh = RefreshToken.for_user(user)
-                
-                # Calculate expiration times
-                access_exp = timezone.now() + settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
-                refresh_exp = timezone.now() + settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME']
-                
-                # Format expiration times in a human-readable way
-                access_expiry = settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
-                refresh_expiry = settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME']
-                
-                # Store token in Redis
-                token_store = RedisTokenStore()
-                token_store.add_token(
-                    user_id=user.id,
-                    jti=refresh['jti'],
-                    token_data=str(refresh),
-                    expires_at=refresh_exp
-                )
+                # Generate tokens and store them in Redis
+                tokens = issue_tokens(user)
                 
                 # Try to login user through Django's session mechanism
                 try:
@@ -212,16 +167,7 @@ class LoginView(APIView):
                 
                 return Response({
                     'user': UserSerializer(user).data,
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                    'expires': {
-                        'access': access_exp.isoformat(),
-                        'refresh': refresh_exp.isoformat(),
-                    },
-                    'expiry': {
-                        'access': f"{access_expiry.seconds // 3600}h",
-                        'refresh': f"{refresh_expiry.days}d"
-                    }
+                    **tokens,
                 })
             # Rest of your code...
             else:
@@ -293,6 +239,9 @@ class ChangePasswordView(APIView):
             invalidate_cache_prefix(f'user-detail:{user.pk}')
             invalidate_cache_prefix(f'user-profile:{user.pk}')
             
+            # End every session: all of the user's tokens are revoked at once
+            token_store.revoke_all_for_user(user.pk)
+            
             return Response({
                 'message': 'Password changed successfully'
             }, status=status.HTTP_200_OK)
@@ -339,7 +288,6 @@ class LogoutView(APIView):
             token.blacklist()
             
             # Also blacklist in Redis
-            token_store = RedisTokenStore()
             token_store.blacklist_token(token_jti)
             
             # Clear session if using session authentication as well
@@ -356,6 +304,7 @@ class CustomTokenRefreshView(TokenRefreshView):
     Takes a refresh token and returns a new access token with expiration information.
     """
     permission_classes = [AllowAny]
+    serializer_class = RedisTokenRefreshSerializer
     
     @swagger_auto_schema(
         request_body=openapi.Schema(
@@ -397,54 +346,21 @@ class CustomTokenRefreshView(TokenRefreshView):
         """
         Enhanced token refresh that also provides expiration information.
         """
-        # Call the parent implementation to get the new access token
-        response = super().post(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
         
-        # If the refresh was successful, add expiration info
-        if response.status_code == status.HTTP_200_OK:
-            # Calculate access token expiry
-            access_exp = timezone.now() + settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
-            access_expiry = settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
-            
-            # Add expiration information to response
-            response.data.update({
-                'expires': {
-                    'access': access_exp.isoformat(),
-                },
-                'expiry': {
-                    'access': f"{access_expiry.seconds // 3600}h",
-                }
-            })
-            
-            # If using token rotation, handle the new refresh token
-            if 'refresh' in response.data:
-                refresh_exp = timezone.now() + settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME']
-                refresh_expiry = settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME']
-                
-                # Add refresh token expiration information
-                response.data['expires']['refresh'] = refresh_exp.isoformat()
-                response.data['expiry']['refresh'] = f"{refresh_expiry.days}d"
-                
-                # Store the new refresh token in Redis if needed
-                # (This happens when ROTATE_REFRESH_TOKENS is True)
-                try:
-                    refresh_token = response.data['refresh']
-                    token = RefreshToken(refresh_token)
-                    token_jti = token.get('jti')
-                    user_id = token.get('user_id')
-                    
-                    token_store = RedisTokenStore()
-                    token_store.add_token(
-                        user_id=user_id,
-                        jti=token_jti,
-                        token_data=refresh_token,
-                        expires_at=refresh_exp
-                    )
-                except Exception as e:
-                    # Just log the error but continue - token renewal still works
-                    print(f"Redis token storage error (non-fatal): {e}")
+        # The serializer keeps the issued token objects, so nothing is decoded again
+        refresh, access = serializer.tokens
+        try:
+            record_refreshed_tokens(refresh, access)
+        except Exception as e:
+            # Just log the error but continue - token renewal still works
+            print(f"Redis token storage error (non-fatal): {e}")
         
-        return response
+        return Response(token_response_data(refresh, access), status=status.HTTP_200_OK)
     
 class UserProfileView(APIView):
     """
@@ -73,6 +73,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMonitoringMiddleware',  # First, so it times the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -145,6 +146,26 @@ REDIS_PORT = int(os.environ.get('REDIS_PORT', 6379))
 REDIS_DB = int(os.environ.get('REDIS_DB', 0))
 REDIS_PASSWORD = os.environ.get('REDIS_PASSWORD', None)
 
+# Shared connection pools per role (core.connections). Every Redis client in
+# the project, including the Django cache, draws from these pools.
+REDIS_POOLS = {
+    "cache": {
+        "MAX_CONNECTIONS": int(os.environ.get('REDIS_CACHE_MAX_CONNECTIONS', 50)),
+        "TIMEOUT": 5,  # Seconds to wait for a free connection
+        "HEALTH_CHECK_INTERVAL": 30,
+        "SOCKET_KEEPALIVE": True,
+        "SOCKET_CONNECT_TIMEOUT": 5,
+        "SOCKET_TIMEOUT": 5,
+    },
+    "tokens": {
+        "MAX_CONNECTIONS": int(os.environ.get('REDIS_TOKENS_MAX_CONNECTIONS', 20)),
+    },
+    "pubsub": {
+        "MAX_CONNECTIONS": 5,
+        "SOCKET_TIMEOUT": None,  # Subscribers block on reads
+    },
+}
+
 # Update this section in your CACHES configuration:
 CACHES = {
     "default": {
@@ -153,17 +174,100 @@ CACHES = {
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
             "PASSWORD": REDIS_PASSWORD,
-            "SOCKET_CONNECT_TIMEOUT": 5,
-            "SOCKET_TIMEOUT": 5,
-            "CONNECTION_POOL_KWARGS": {"max_connections": 50},
+            # Pool size and socket options come from REDIS_POOLS["cache"]
+            "CONNECTION_FACTORY": "core.connections.SharedConnectionFactory",
             # Remove or update the PARSER_CLASS
             # "PARSER_CLASS": "redis.connection.HiredisParser",  # This line causes the error
         },
         "KEY_PREFIX": "redis_cache",
         "TIMEOUT": 300,  # 5 minutes default cache timeout
+        # Global defaults for cache_view stale-while-revalidate (core.cache.stampede)
+        "STALE_WHILE_REVALIDATE": {
+            "ENABLED": False,
+            "SOFT_TIMEOUT_RATIO": 0.5,  # Serve stale after half of the view timeout
+            "MAX_WORKERS": 4,  # Background refresh threads per worker process
+            "MAX_PENDING": 100,  # Queued refreshes before new ones are rejected
+        },
     }
 }
 
+# In-process near cache in front of the "default" Redis cache (core.cache.local).
+# Workers stay coherent through invalidations published on CHANNEL.
+LOCAL_CACHE = {
+    "ENABLED": os.environ.get('LOCAL_CACHE_ENABLED', 'false').lower() == 'true',
+    "MAX_ENTRIES": 1024,
+    "MAX_BYTES": 8 * 1024 * 1024,  # 8 MB per worker
+    "TIMEOUT": 5,  # Local TTL in seconds, bounds staleness if a message is missed
+    "CHANNEL": "cache:invalidations",
+}
+
+# Tag index used by invalidate_cache_prefix instead of SCAN (core.cache.tags).
+# Keep SCAN_FALLBACK on until `manage.py backfill_cache_tags` has run once.
+CACHE_TAGS = {
+    "DEPTH": 3,  # Number of leading key segments registered as tags
+    "SCAN_FALLBACK": os.environ.get('CACHE_TAGS_SCAN_FALLBACK', 'false').lower() == 'true',
+    "BATCH_SIZE": 500,
+}
+
+# Per-prefix cache hit/miss/latency statistics (core.cache.stats), served to
+# admins at /api/status/cache/
+CACHE_STATS = {
+    "ENABLED": True,
+    "FLUSH_INTERVAL": 10,  # Seconds between flushes of each worker's counters
+    "SIZE_SAMPLE_RATE": 0.1,  # Fraction of set_cache writes whose size is measured
+}
+
+# Redis full-text index behind /api/tasks/search/ (task_manager.search);
+# backfill with manage.py rebuild_search_index
+TASK_SEARCH = {
+    "TITLE_WEIGHT": 3,  # A title occurrence counts as this many description ones
+    "MIN_PREFIX": 2,  # Shortest token indexed and autocompleted
+    "MAX_PREFIX": 10,
+    "RESULT_CACHE_TIMEOUT": 300,
+}
+
+# In-process copy of the JWT blacklist (core.authentication.LocalBlacklist),
+# so unrevoked tokens are checked without a Redis round trip.
+JWT_BLACKLIST_CACHE = {
+    "ENABLED": True,
+    "CHANNEL": "jwt:blacklist-events",
+    "RESYNC_INTERVAL": 30,  # Seconds between full reloads from Redis
+}
+
+# Query and Redis call accounting in PerformanceMonitoringMiddleware
+# (core.instrumentation), reported in Server-Timing and the slow-request log.
+PERFORMANCE_MONITORING = {
+    "SLOW_REQUEST_SECONDS": 1.0,
+    "N_PLUS_ONE_THRESHOLD": 5,  # Executions of one statement logged as N+1
+    # cProfile a sample of requests (core.profiling); browse the results
+    # with `manage.py request_profiles`
+    "PROFILING": {
+        "ENABLED": os.environ.get('REQUEST_PROFILING', 'false').lower() == 'true',
+        "RATE": float(os.environ.get('REQUEST_PROFILING_RATE', 0.01)),
+        # Requests sending one of these in X-Profile-Token are always profiled
+        "TOKENS": [t for t in os.environ.get('REQUEST_PROFILING_TOKENS', '').split(',') if t],
+        "TTL": 24 * 60 * 60,
+        "MAX_PROFILES": 200,
+    },
+}
+
+# Per-route request metrics from PerformanceMonitoringMiddleware (core.metrics),
+# aggregated in Redis and served at /api/metrics/ in Prometheus text format.
+METRICS = {
+    "ENABLED": True,
+    "FLUSH_INTERVAL": 5,  # Seconds between flushes of each worker's counters
+    "TOKEN": os.environ.get('METRICS_TOKEN') or None,  # Bearer token for scrapers
+}
+
+# Write-behind buffer for User.last_activity (accounts.activity). Each worker
+# persists it every FLUSH_INTERVAL seconds; with 0, run
+# `manage.py flush_user_activity --interval 60` instead.
+USER_ACTIVITY = {
+    "THROTTLE_SECONDS": 900,  # Record a user's activity at most every 15 minutes
+    "FLUSH_BATCH_SIZE": 1000,
+    "FLUSH_INTERVAL": int(os.environ.get('USER_ACTIVITY_FLUSH_INTERVAL', 60)),
+}
+
 
 
 # REST Framework settings
@@ -198,17 +302,27 @@ SWAGGER_SETTINGS = {
     'DEFAULT_MODEL_RENDERING': 'example'
 }
 
-# Optional: Update session configuration for development
-# During development, you might want to use database sessions instead of Redis
-# to avoid these kinds of errors while testing
-SESSION_ENGINE = "django.contrib.sessions.backends.db"  # Use database for sessions 
-# SESSION_CACHE_ALIAS = "default"  # Comment this out
-# SESSION_CACHE_ALIAS = "default"
+# Sessions live in the "default" Redis cache (core.sessions). Sessions still in
+# django_session are read from there and moved to Redis on first use; run
+# `manage.py migrate_sessions_to_redis` to move them all up front. Set
+# SESSION_ENGINE=django.contrib.sessions.backends.db to keep database sessions.
+SESSION_ENGINE = os.environ.get('SESSION_ENGINE', "core.sessions")
+SESSION_CACHE_ALIAS = "default"
+REDIS_SESSIONS = {
+    "DB_FALLBACK": True,  # Read (and, if Redis is down, write) django_session
+    "LOCAL_CACHE": {
+        "ENABLED": False,
+        "TIMEOUT": 2,  # Seconds a worker may serve a session from memory
+        "CHANNEL": "sessions:invalidations",
+    },
+}
 
 # CORS settings (if needed for frontend)
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # Vue.js frontend
 ]
+# Pagination and validator headers of the task list, readable by the frontend
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified', 'Link', 'X-Next-Cursor', 'X-Has-More', 'X-Page-Limit']
 
 # Logging configuration
 LOGGING = {
@@ -253,4 +367,4 @@ os.makedirs(os.path.join(BASE_DIR, 'media', 'avatars'), exist_ok=True)
 # Logging configuration for development
 LOGGING['handlers']['file']['level'] = 'DEBUG'
 LOGGING['loggers']['django']['level'] = 'INFO'
-LOGGING['loggers']['task_manager']['level'] = 'DEBUG'
\ No newline at end of file
+LOGGING['loggers']['task_manager']['level'] = 'DEBUG'
\ No newline at end of file
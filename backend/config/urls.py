@@ -7,6 +7,8 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from core.views import api_status
 from core.views import health_check
+from core.views import async_api_status, async_health_check
+from core.views import cache_statistics, metrics
 
 # Create schema view for API documentation
 schema_view = get_schema_view(
@@ -35,7 +37,11 @@ urlpatterns = [
     path('api/accounts/', include('accounts.urls')),
     path('api/tasks/', include('task_manager.urls')),
     path('api/status/', api_status, name='api-status'),
+    path('api/status/cache/', cache_statistics, name='api-cache-stats'),
     path('api/health/', health_check, name='api-health'),
+    path('api/metrics/', metrics, name='api-metrics'),
+    path('api/async/status/', async_api_status, name='api-async-status'),
+    path('api/async/health/', async_health_check, name='api-async-health'),
 ]
 
 # Add this for serving media files during development
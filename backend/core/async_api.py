@@ -0,0 +1,57 @@
+"""
+Helpers for native async API views served under ASGI.
+
+DRF's @api_view only supports sync views, so async endpoints use plain
+Django async views wrapped by ``async_api_view``. It applies the same
+authentication classes and permission default as the rest of the API.
+"""
+import logging
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+def _authenticate(request):
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    return drf_request.user
+
+def async_api_view(methods, allow_any=False):
+    """
+    Decorator for ``async def`` views returning JsonResponse.
+
+    Rejects other HTTP methods with 405 and, unless ``allow_any`` is set,
+    unauthenticated requests with 401. Authentication runs the configured
+    DRF authentication classes in a worker thread, since they query the
+    database and the sync Redis token store.
+
+    Usage:
+        @async_api_view(['GET'])
+        async def my_view(request):
+            ...
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+
+            if not allow_any:
+                try:
+                    user = await sync_to_async(_authenticate)(request)
+                except exceptions.APIException as e:
+                    return JsonResponse({'detail': str(e.detail)}, status=401)
+                if not user or not user.is_authenticated:
+                    return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+                request.user = user
+
+            return await view_func(request, *args, **kwargs)
+        return csrf_exempt(wrapper)
+    return decorator
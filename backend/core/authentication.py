@@ -1,16 +1,184 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken
-from django_redis import get_redis_connection
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.conf import settings
+from core.connections import get_redis_client
+from core.flushing import PerProcess
 from rest_framework_simplejwt.utils import aware_utcnow
 import json
+import time
+import logging
+import threading
+import redis
+
+logger = logging.getLogger(__name__)
+
+BLACKLIST_INDEX_KEY = "jwt:blacklist-index"
+BLACKLIST_MIGRATED_KEY = "jwt:blacklist-index:migrated"
+
+# In-process copy of the blacklist (see LocalBlacklist)
+BLACKLIST_CACHE_DEFAULTS = {
+    "ENABLED": True,
+    "CHANNEL": "jwt:blacklist-events",
+    "RESYNC_INTERVAL": 30,
+}
+
+class LocalBlacklist:
+    """
+    Process-local set of blacklisted JTIs.
+
+    The blacklist is tiny compared to the number of authenticated requests,
+    so every worker keeps a copy and answers the common "not blacklisted"
+    case without touching Redis. The copy is loaded from the
+    ``jwt:blacklist-index`` sorted set (JTI scored by expiry), kept current by
+    messages published by ``RedisTokenStore.blacklist_token`` and reloaded
+    every RESYNC_INTERVAL seconds in case a message was missed.
+
+    While the subscriber is down, lookups go to Redis so a revoked token is
+    never accepted because of a lost message.
+    """
+    
+    def __init__(self, redis_client, channel, resync_interval=30, enabled=True, pubsub_client=None):
+        self.redis_client = redis_client
+        self.pubsub_client = pubsub_client or redis_client
+        self.channel = channel
+        self.resync_interval = resync_interval
+        self.enabled = enabled
+        self._entries = {}
+        self._synced_at = 0.0
+        self._fallback_until = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+        # Threads do not survive a fork, so each worker subscribes on first use
+        self._listener = PerProcess(self._start_listener, self._lock)
+    
+    @classmethod
+    def from_settings(cls, redis_client, options=None, pubsub_client=None):
+        config = {**BLACKLIST_CACHE_DEFAULTS, **(options or {})}
+        return cls(
+            redis_client,
+            channel=config["CHANNEL"],
+            resync_interval=config["RESYNC_INTERVAL"],
+            enabled=config["ENABLED"],
+            pubsub_client=pubsub_client,
+        )
+    
+    def contains(self, jti, blacklist_key):
+        """Whether ``jti`` is blacklisted; ``blacklist_key`` is used on fallback."""
+        if not self.enabled or not self._ready():
+            return bool(self.redis_client.exists(blacklist_key))
+        
+        expires_at = self._entries.get(jti)
+        return expires_at is not None and expires_at > time.time()
+    
+    def add(self, jti, expires_at):
+        self._entries[jti] = expires_at
+    
+    def publish(self, pipe, jti, expires_at):
+        """Queue the notification for other workers on a pipeline."""
+        pipe.publish(self.channel, json.dumps({"jti": jti, "expires_at": expires_at}))
+    
+    def resync(self):
+        """Reload the local copy from the Redis index."""
+        now = time.time()
+        if not self.redis_client.exists(BLACKLIST_MIGRATED_KEY):
+            self._migrate_legacy_entries()
+        entries = self.redis_client.zrangebyscore(BLACKLIST_INDEX_KEY, now, "+inf", withscores=True)
+        self._entries = {
+            (jti.decode("utf-8") if isinstance(jti, bytes) else jti): expires_at
+            for jti, expires_at in entries
+        }
+        self._synced_at = time.monotonic()
+    
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "listening": bool(self._thread and self._thread.is_alive()),
+            "seconds_since_sync": round(time.monotonic() - self._synced_at, 3) if self._synced_at else None,
+        }
+    
+    def _ready(self):
+        """Start the subscriber and resync when due; False means ask Redis."""
+        try:
+            self._listener.ensure()
+            if time.monotonic() < self._fallback_until or self._thread is None:
+                return False
+            if time.monotonic() - self._synced_at >= self.resync_interval:
+                with self._lock:
+                    if time.monotonic() - self._synced_at >= self.resync_interval:
+                        self.resync()
+            return True
+        except Exception as e:
+            logger.error(f"Error syncing local JWT blacklist: {str(e)}")
+            return False
+    
+    def _start_listener(self):
+        self._entries = {}
+        self._synced_at = 0.0
+        self._thread = None
+        try:
+            # Subscribe before the first resync so no update falls in between
+            pubsub = self.pubsub_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.channel: self._handle_message})
+            self._thread = pubsub.run_in_thread(
+                sleep_time=1.0,
+                daemon=True,
+                exception_handler=self._handle_listener_error,
+            )
+        except Exception as e:
+            logger.error(f"Error starting JWT blacklist listener: {str(e)}")
+    
+    def _handle_message(self, message):
+        try:
+            data = json.loads(message["data"])
+            self.add(data["jti"], float(data["expires_at"]))
+        except (TypeError, ValueError, KeyError):
+            return
+    
+    def _handle_listener_error(self, exc, pubsub, thread):
+        # Messages may be lost until the pubsub reconnects: ask Redis
+        # directly for a while, then reload the whole set.
+        logger.warning(f"JWT blacklist listener error: {str(exc)}")
+        self._fallback_until = time.monotonic() + 5.0
+        self._synced_at = 0.0
+        time.sleep(1.0)
+    
+    def _migrate_legacy_entries(self):
+        """Index blacklist keys written before the index existed (runs once)."""
+        pipe = self.redis_client.pipeline(transaction=False)
+        now = time.time()
+        for key in self.redis_client.scan_iter(match="jwt:blacklist:*", count=1000):
+            key = key.decode("utf-8") if isinstance(key, bytes) else key
+            ttl = self.redis_client.ttl(key)
+            if ttl == -2:
+                continue
+            expires_at = now + ttl if ttl >= 0 else float("inf")
+            pipe.zadd(BLACKLIST_INDEX_KEY, {key[len("jwt:blacklist:"):]: expires_at})
+        pipe.set(BLACKLIST_MIGRATED_KEY, 1)
+        pipe.execute()
+
+local_blacklist = LocalBlacklist.from_settings(
+    get_redis_client('tokens'),
+    getattr(settings, 'JWT_BLACKLIST_CACHE', None),
+    pubsub_client=get_redis_client('pubsub'),
+)
 
 class RedisTokenStore:
     """Custom token store using Redis for JWT tokens"""
     
     def __init__(self):
-        self.redis_conn = get_redis_connection("default")
+        self.redis_conn = get_redis_client('tokens')
         self.token_prefix = "jwt:token:"
         self.blacklist_prefix = "jwt:blacklist:"
+        # The per-user index outlives none of its members by more than the
+        # longest token lifetime
+        self.user_index_ttl = int(settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'].total_seconds())
+    
+    def user_tokens_key(self, user_id):
+        return f"jwt:user:{user_id}:tokens"
     
     def add_token(self, user_id, jti, token_data, expires_at):
         """Store a token in Redis"""
@@ -27,17 +195,60 @@ class RedisTokenStore:
             "created_at": int(aware_utcnow().timestamp())
         }
         
-        # Store in Redis with expiration time
-        self.redis_conn.set(
-            token_key, 
-            json.dumps(data),
-            ex=int((expires_at - aware_utcnow()).total_seconds())
-        )
+        # Store in Redis with expiration time, and in the user's token index
+        def queue(pipe):
+            pipe.set(
+                token_key, 
+                json.dumps(data),
+                ex=int((expires_at - aware_utcnow()).total_seconds())
+            )
+            self._queue_index(pipe, user_id, jti, exp_timestamp)
+        
+        self._execute_for_user(user_id, queue)
+        return True
+    
+    def store_tokens(self, user_id, refresh=None, access=None):
+        """
+        Record the tokens issued by one login or refresh in a single MULTI:
+        the refresh token's data plus both JTIs in the user's index.
+        
+        Args:
+            user_id: Owner of the tokens
+            refresh (RefreshToken): Stored with its data, if given
+            access (AccessToken): Only indexed, if given
+        """
+        now = aware_utcnow()
+        jti_claim = jwt_settings.JTI_CLAIM
         
-        # Also store in a user's token list
-        user_tokens_key = f"jwt:user:{user_id}:tokens"
-        self.redis_conn.sadd(user_tokens_key, jti)
+        def queue(pipe):
+            if refresh is not None:
+                exp_timestamp = int(refresh['exp'])
+                data = {
+                    "user_id": user_id,
+                    "jti": refresh[jti_claim],
+                    "token_data": str(refresh),
+                    "expires_at": exp_timestamp,
+                    "created_at": int(now.timestamp())
+                }
+                pipe.set(
+                    f"{self.token_prefix}{refresh[jti_claim]}",
+                    json.dumps(data),
+                    ex=max(exp_timestamp - int(now.timestamp()), 1)
+                )
+                self._queue_index(pipe, user_id, refresh[jti_claim], exp_timestamp)
+            if access is not None:
+                self._queue_index(pipe, user_id, access[jti_claim], int(access['exp']))
         
+        self._execute_for_user(user_id, queue)
+        return True
+    
+    def track_token(self, user_id, jti, expires_at):
+        """
+        Record a token in the user's index without storing its data, so that
+        revoke_all_for_user also covers it (used for access tokens).
+        """
+        exp_timestamp = int(expires_at.timestamp())
+        self._execute_for_user(user_id, lambda pipe: self._queue_index(pipe, user_id, jti, exp_timestamp))
         return True
     
     def blacklist_token(self, jti):
@@ -49,31 +260,118 @@ class RedisTokenStore:
         if not token_data:
             return False
         
-        # Add to blacklist
-        blacklist_key = f"{self.blacklist_prefix}{jti}"
         token_data = json.loads(token_data)
-        
-        # Calculate remaining time for expiration
         expires_at = token_data.get("expires_at", 0)
-        now = int(aware_utcnow().timestamp())
-        ttl = max(0, expires_at - now)
         
-        # Store in blacklist with same expiration as original token
-        self.redis_conn.set(blacklist_key, "1", ex=ttl)
+        pipe = self.redis_conn.pipeline(transaction=True)
+        self._queue_blacklist(pipe, [(jti, expires_at)])
+        pipe.execute()
+        local_blacklist.add(jti, expires_at)
         
         return True
     
+    def revoke_all_for_user(self, user_id):
+        """
+        Blacklist every live token of a user in one pipeline.
+        
+        Returns:
+            int: Number of tokens revoked
+        """
+        now = int(aware_utcnow().timestamp())
+        key = self.user_tokens_key(user_id)
+        try:
+            entries = self.redis_conn.zrangebyscore(key, now, "+inf", withscores=True)
+        except redis.ResponseError as e:
+            if "WRONGTYPE" not in str(e):
+                raise
+            self._migrate_user_index(user_id)
+            entries = self.redis_conn.zrangebyscore(key, now, "+inf", withscores=True)
+        
+        entries = [
+            (jti.decode("utf-8") if isinstance(jti, bytes) else jti, int(expires_at))
+            for jti, expires_at in entries
+        ]
+        
+        pipe = self.redis_conn.pipeline(transaction=True)
+        if entries:
+            self._queue_blacklist(pipe, entries)
+        pipe.delete(key)
+        pipe.execute()
+        
+        for jti, expires_at in entries:
+            local_blacklist.add(jti, expires_at)
+        return len(entries)
+    
     def is_blacklisted(self, jti):
         """Check if a token is blacklisted"""
         blacklist_key = f"{self.blacklist_prefix}{jti}"
-        return bool(self.redis_conn.exists(blacklist_key))
+        return local_blacklist.contains(jti, blacklist_key)
+    
+    def _queue_index(self, pipe, user_id, jti, exp_timestamp):
+        # Sorted set scored by expiry; expired members are trimmed on every write
+        key = self.user_tokens_key(user_id)
+        pipe.zadd(key, {jti: exp_timestamp})
+        pipe.zremrangebyscore(key, "-inf", int(aware_utcnow().timestamp()))
+        pipe.expire(key, self.user_index_ttl)
+    
+    def _queue_blacklist(self, pipe, entries):
+        """
+        Blacklist (jti, expires_at) pairs with the same expiration as the
+        tokens, index them for the local copies and tell the other workers.
+        """
+        now = int(aware_utcnow().timestamp())
+        for jti, expires_at in entries:
+            pipe.set(f"{self.blacklist_prefix}{jti}", "1", ex=max(expires_at - now, 1))
+            pipe.zadd(BLACKLIST_INDEX_KEY, {jti: expires_at})
+            local_blacklist.publish(pipe, jti, expires_at)
+        pipe.zremrangebyscore(BLACKLIST_INDEX_KEY, "-inf", now)
+    
+    def _execute_for_user(self, user_id, queue):
+        """Run queued index commands, converting a legacy SET index on the way."""
+        pipe = self.redis_conn.pipeline(transaction=True)
+        queue(pipe)
+        try:
+            return pipe.execute()
+        except redis.ResponseError as e:
+            if "WRONGTYPE" not in str(e):
+                raise
+        
+        self._migrate_user_index(user_id)
+        pipe = self.redis_conn.pipeline(transaction=True)
+        queue(pipe)
+        return pipe.execute()
+    
+    def _migrate_user_index(self, user_id):
+        """Convert a pre-existing SET index into the sorted set format."""
+        key = self.user_tokens_key(user_id)
+        jtis = [
+            jti.decode("utf-8") if isinstance(jti, bytes) else jti
+            for jti in self.redis_conn.smembers(key)
+        ]
+        tokens = self.redis_conn.mget([f"{self.token_prefix}{jti}" for jti in jtis]) if jtis else []
+        
+        # Tokens whose data already expired are dropped
+        mapping = {
+            jti: json.loads(token)["expires_at"]
+            for jti, token in zip(jtis, tokens) if token
+        }
+        pipe = self.redis_conn.pipeline(transaction=True)
+        pipe.delete(key)
+        if mapping:
+            pipe.zadd(key, mapping)
+            pipe.expire(key, self.user_index_ttl)
+        pipe.execute()
+
+# Shared by the authentication class and the views; the store is stateless
+# and its client draws from the shared "tokens" pool
+token_store = RedisTokenStore()
 
 class RedisJWTAuthentication(JWTAuthentication):
     """Custom JWT authentication that uses Redis for token verification and blacklist checking"""
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.token_store = RedisTokenStore()
+        self.token_store = token_store
     
     def get_validated_token(self, raw_token):
         """
@@ -88,4 +386,46 @@ class RedisJWTAuthentication(JWTAuthentication):
         if jti and self.token_store.is_blacklisted(jti):
             raise InvalidToken('Token is blacklisted')
         
-        return token
\ No newline at end of file
+        return token
+
+class RedisRefreshToken(RefreshToken):
+    """Refresh token that is also rejected once revoked in RedisTokenStore"""
+    
+    def verify(self, *args, **kwargs):
+        jti = self.payload.get(jwt_settings.JTI_CLAIM)
+        if jti and token_store.is_blacklisted(jti):
+            raise TokenError('Token is blacklisted')
+        super().verify(*args, **kwargs)
+
+class RedisTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer that keeps the issued token objects on
+    ``self.tokens`` (refresh or None, access), so callers can record them
+    without decoding the strings again.
+    """
+    token_class = RedisRefreshToken
+    
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        access = refresh.access_token
+        data = {"access": str(access)}
+        rotated = None
+        
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    # Attempt to blacklist the given refresh token
+                    refresh.blacklist()
+                except AttributeError:
+                    # The blacklist app is not installed
+                    pass
+            
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            
+            data["refresh"] = str(refresh)
+            rotated = refresh
+        
+        self.tokens = (rotated, access)
+        return data
\ No newline at end of file
@@ -4,9 +4,12 @@ Custom Redis cache backends for specialized caching strategies.
 import time
 import json
 import logging
-from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
 from django.conf import settings
-import redis
+from core.connections import get_redis_client
+from .tags import TagIndex, DEFAULT_SETTINGS as TAG_DEFAULTS
+from .serializers import CacheSerializer, is_framed
+from .utils import cache_stats
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +19,18 @@ class HierarchicalRedisCache(BaseCache):
     
     Allows invalidating a group of related cache keys using a hierarchical structure.
     Example: 'tasks:user:1:list' can be invalidated with 'tasks:user:1:*'
+
+    Keys are registered in a tag index on write (see core.cache.tags), so
+    patterns of the form '<prefix>*' are resolved without scanning. The
+    number of indexed segments is set with the TAG_DEPTH option.
+    
+    Values are encoded by core.cache.serializers.CacheSerializer, configured
+    with the SERIALIZER ('json', 'orjson', 'msgpack'), COMPRESSOR (None,
+    'zlib', 'lz4'), COMPRESS_MIN_LENGTH and COMPRESS_LEVEL options. Integers
+    are stored as plain numbers so incr() keeps working.
+    
+    Reads, writes and deletions are counted per key prefix in
+    core.cache.stats.
     
     Usage in settings.py:
     
@@ -33,27 +48,32 @@ class HierarchicalRedisCache(BaseCache):
     
     def __init__(self, server, params):
         super().__init__(params)
-        self._client = redis.Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            db=settings.REDIS_DB,
-            password=settings.REDIS_PASSWORD,
-            decode_responses=False  # Keep binary format for compatibility
-        )
+        # Keep binary format for compatibility
+        self._client = get_redis_client('cache', decode_responses=False)
         self._options = params.get('OPTIONS', {})
+        self._serializer = CacheSerializer.from_options(self._options)
+
+        tag_settings = {**TAG_DEFAULTS, **getattr(settings, 'CACHE_TAGS', {})}
+        self._tags = TagIndex(
+            self._client,
+            self.make_key,
+            depth=self._options.get('TAG_DEPTH', tag_settings['DEPTH']),
+            batch_size=tag_settings['BATCH_SIZE'],
+        )
     
     def add(self, key, value, timeout=None, version=None):
         """Add key if it doesn't exist"""
-        key = self.make_key(key, version)
-        if self._client.exists(key):
+        if self._client.exists(self.make_key(key, version)):
             return False
         
-        return self.set(key, value, timeout)
+        return self.set(key, value, timeout, version)
     
     def get(self, key, default=None, version=None):
         """Get a value with automatic deserialization"""
-        key = self.make_key(key, version)
-        value = self._client.get(key)
+        start = time.perf_counter()
+        value = self._client.get(self.make_key(key, version))
+        if cache_stats.enabled:
+            cache_stats.record_get(key, value is not None, time.perf_counter() - start)
         
         if value is None:
             return default
@@ -62,34 +82,52 @@ class HierarchicalRedisCache(BaseCache):
     
     def set(self, key, value, timeout=None, version=None):
         """Set a value with automatic serialization"""
-        key = self.make_key(key, version)
+        start = time.perf_counter()
         timeout = self.get_timeout(timeout)
-        
         encoded_value = self.encode(value)
         
+        pipeline = self._client.pipeline(transaction=False)
+        self._tags.add(key, timeout, pipeline=pipeline, version=version)
+        
+        versioned_key = self.make_key(key, version)
         if timeout is None:
-            return self._client.set(key, encoded_value)
+            pipeline.set(versioned_key, encoded_value)
+        else:
+            pipeline.setex(versioned_key, timeout, encoded_value)
         
-        return self._client.setex(key, timeout, encoded_value)
+        result = pipeline.execute()[-1]
+        if cache_stats.enabled:
+            cache_stats.record_set(key, _size(encoded_value), time.perf_counter() - start)
+        return result
     
     def delete(self, key, version=None):
         """Delete a specific key"""
-        key = self.make_key(key, version)
-        self._client.delete(key)
+        pipeline = self._client.pipeline(transaction=False)
+        self._tags.remove(key, pipeline=pipeline, version=version)
+        pipeline.delete(self.make_key(key, version))
+        deleted = pipeline.execute()[-1]
+        if cache_stats.enabled:
+            cache_stats.record_invalidation(key, deleted)
+        return bool(deleted)
     
     def delete_pattern(self, pattern, version=None):
         """Delete all keys matching a pattern"""
-        pattern = self.make_key(pattern, version)
-        cursor = '0'
-        deleted = 0
+        if pattern.endswith('*') and self._tags.can_invalidate(pattern):
+            deleted = self._tags.invalidate(pattern)
+        else:
+            versioned_pattern = self.make_key(pattern, version)
+            cursor = '0'
+            deleted = 0
+            
+            while cursor != 0:
+                cursor, keys = self._client.scan(cursor=cursor, match=versioned_pattern, count=100)
+                if keys:
+                    deleted += self._client.delete(*keys)
+                if cursor == '0' or not cursor:
+                    break
         
-        while cursor != 0:
-            cursor, keys = self._client.scan(cursor=cursor, match=pattern, count=100)
-            if keys:
-                deleted += self._client.delete(*keys)
-            if cursor == '0' or not cursor:
-                break
-                
+        if cache_stats.enabled:
+            cache_stats.record_invalidation(pattern, deleted)
         return deleted
     
     def clear(self):
@@ -98,6 +136,7 @@ class HierarchicalRedisCache(BaseCache):
     
     def get_many(self, keys, version=None):
         """Get multiple keys at once"""
+        start = time.perf_counter()
         versioned_keys = [self.make_key(key, version) for key in keys]
         values = self._client.mget(versioned_keys)
         
@@ -105,7 +144,9 @@ class HierarchicalRedisCache(BaseCache):
         for key, value in zip(keys, values):
             if value is not None:
                 result[key] = self.decode(value)
-                
+        
+        if cache_stats.enabled:
+            cache_stats.record_get_many(list(keys), len(result), time.perf_counter() - start)
         return result
     
     def set_many(self, mapping, timeout=None, version=None):
@@ -113,6 +154,7 @@ class HierarchicalRedisCache(BaseCache):
         if not mapping:
             return
             
+        start = time.perf_counter()
         versioned_mapping = {
             self.make_key(key, version): self.encode(value)
             for key, value in mapping.items()
@@ -120,6 +162,7 @@ class HierarchicalRedisCache(BaseCache):
         
         pipeline = self._client.pipeline()
         timeout = self.get_timeout(timeout)
+        self._tags.add(list(mapping), timeout, pipeline=pipeline, version=version)
         
         if timeout is None:
             pipeline.mset(versioned_mapping)
@@ -128,14 +171,23 @@ class HierarchicalRedisCache(BaseCache):
                 pipeline.setex(key, timeout, value)
                 
         pipeline.execute()
+        if cache_stats.enabled:
+            size = sum(_size(value) for value in versioned_mapping.values())
+            cache_stats.record_set(next(iter(mapping)), size, time.perf_counter() - start, count=len(mapping))
     
     def delete_many(self, keys, version=None):
         """Delete multiple keys at once"""
         if not keys:
             return
             
+        keys = list(keys)
         versioned_keys = [self.make_key(key, version) for key in keys]
-        self._client.delete(*versioned_keys)
+        pipeline = self._client.pipeline(transaction=False)
+        self._tags.remove(keys, pipeline=pipeline, version=version)
+        pipeline.delete(*versioned_keys)
+        deleted = pipeline.execute()[-1]
+        if cache_stats.enabled:
+            cache_stats.record_invalidation(keys[0], deleted)
     
     def incr(self, key, delta=1, version=None):
         """Increment a key by delta"""
@@ -148,14 +200,29 @@ class HierarchicalRedisCache(BaseCache):
         key = self.make_key(key, version)
         return self._client.exists(key)
 
+    def get_timeout(self, timeout):
+        """Resolve a timeout in seconds, falling back to the configured TIMEOUT"""
+        if timeout is None or timeout is DEFAULT_TIMEOUT:
+            return self.default_timeout
+        return timeout
+
     def encode(self, obj):
         """Encode an object for storage"""
-        if isinstance(obj, bool) or not isinstance(obj, (int, float, str, bytes)):
-            return self._serialize(obj)
-        return obj
+        if isinstance(obj, int) and not isinstance(obj, bool):
+            return obj
+        return self._serializer.dumps(obj)
 
     def decode(self, obj):
         """Decode an object from storage"""
+        if is_framed(obj):
+            try:
+                return self._serializer.loads(obj)
+            except Exception:
+                # Legacy raw bytes that merely look like a framed payload
+                pass
+        
+        # Plain integers from encode() or incr(), or values written before
+        # payloads were framed
         try:
             value = int(obj)
         except (ValueError, TypeError):
@@ -168,15 +235,15 @@ class HierarchicalRedisCache(BaseCache):
                     value = obj
         return value
 
-    def _serialize(self, obj):
-        """Serialize an object to a string"""
-        return json.dumps(obj).encode('utf-8')
-
     def _deserialize(self, data):
-        """Deserialize an object from a string"""
+        """Deserialize a legacy JSON payload"""
         if isinstance(data, bytes):
             try:
                 return json.loads(data.decode('utf-8'))
             except (UnicodeDecodeError, json.JSONDecodeError):
                 return data
-        return data
\ No newline at end of file
+        return data
+
+def _size(encoded_value):
+    # Plain integers are stored as their decimal digits
+    return len(encoded_value) if isinstance(encoded_value, (bytes, str)) else len(str(encoded_value))
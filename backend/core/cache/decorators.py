@@ -1,17 +1,97 @@
 """
 Decorators for caching Django views, REST Framework views, and class methods.
 """
+import json
+import hashlib
 import functools
 import logging
 import time
 from django.utils.decorators import method_decorator
+from rest_framework.request import Request
 from rest_framework.response import Response
-from django.http import HttpResponse
+from django.http import HttpRequest, HttpResponse
 from .utils import get_cache, set_cache, invalidate_cache_prefix
+from .stampede import get_or_compute, swr_settings
 
 logger = logging.getLogger(__name__)
 
-def cache_view(prefix, timeout=300, include_user_id=False, vary_on_headers=None):
+def _response_to_cache(response):
+    """Convert a successful response into cacheable data, or None"""
+    if not (hasattr(response, 'status_code') and 200 <= response.status_code < 300):
+        return None
+    
+    # Different handling for Django and DRF responses
+    if isinstance(response, Response):
+        return response.data
+    if isinstance(response, HttpResponse):
+        return {
+            'content': response.content,
+            'status_code': response.status_code,
+            'content_type': response.get('Content-Type', 'application/json')
+        }
+    return None
+
+def _response_from_cache(cached_response):
+    """Rebuild a response from data stored by _response_to_cache"""
+    # Check response type (Django HttpResponse or DRF Response)
+    if isinstance(cached_response, dict) and 'content' in cached_response:
+        # Django HttpResponse
+        return HttpResponse(
+            content=cached_response.get('content'),
+            status=cached_response.get('status_code', 200),
+            content_type=cached_response.get('content_type', 'application/json')
+        )
+    # DRF Response
+    return Response(cached_response)
+
+def _detached_request(request):
+    """
+    Minimal copy of ``request`` for recomputing a view on the background
+    refresher, which runs after the original request has been finished.
+
+    A DRF Request, as seen by views stacked under @api_view, is rebuilt
+    around the copy with the same parsers, authenticators, user and auth.
+    """
+    http_request = request._request if isinstance(request, Request) else request
+    detached = HttpRequest()
+    detached.method = http_request.method
+    detached.path = http_request.path
+    detached.path_info = http_request.path_info
+    detached.GET = http_request.GET.copy()
+    # Plain header values only, leaving out the consumed input stream and friends
+    detached.META = {k: v for k, v in http_request.META.items() if isinstance(v, str)}
+    detached.COOKIES = dict(http_request.COOKIES)
+    detached.resolver_match = getattr(http_request, 'resolver_match', None)
+    if hasattr(http_request, 'user'):
+        detached.user = http_request.user
+
+    if not isinstance(request, Request):
+        return detached
+    drf_request = Request(
+        detached,
+        parsers=request.parsers,
+        authenticators=request.authenticators,
+        negotiator=request.negotiator,
+        parser_context=dict(request.parser_context),
+    )
+    # Carry the authentication over instead of authenticating again
+    drf_request.user = request.user
+    drf_request.auth = request.auth
+    return drf_request
+
+def _resolve_soft_timeout(timeout, soft_timeout):
+    """Per-view soft timeout, falling back to the global stale-while-revalidate ratio"""
+    if timeout is None:
+        return None
+    if soft_timeout is None and swr_settings['ENABLED']:
+        soft_timeout = int(timeout * swr_settings['SOFT_TIMEOUT_RATIO'])
+    if not soft_timeout or soft_timeout >= timeout:
+        return None
+    return soft_timeout
+
+def cache_view(prefix, timeout=300, include_user_id=False, vary_on_headers=None,
+               stampede_protection=False, early_recompute_beta=1.0, lock_timeout=10,
+               soft_timeout=None):
     """
     Cache the response of a Django or DRF view.
     
@@ -20,10 +100,21 @@ def cache_view(prefix, timeout=300, include_user_id=False, vary_on_headers=None)
         timeout (int): Cache timeout in seconds
         include_user_id (bool): Whether to include user ID in cache key
         vary_on_headers (list): List of headers to include in cache key
+        stampede_protection (bool): Recompute under a Redis lock and refresh
+            hot keys early (see core.cache.stampede)
+        early_recompute_beta (float): XFetch aggressiveness, 0 disables
+            early refreshes
+        lock_timeout (int): Seconds before a recompute lock is released
+        soft_timeout (int): Age in seconds after which the cached response is
+            served stale and refreshed in the background, while ``timeout``
+            stays the hard lifetime. Defaults to the global
+            STALE_WHILE_REVALIDATE setting; pass 0 to disable for this view.
         
     Returns:
         function: Decorator function
     """
+    soft = _resolve_soft_timeout(timeout, soft_timeout)
+    
     def decorator(view_func):
         @functools.wraps(view_func)
         def wrapper(request, *args, **kwargs):
@@ -51,22 +142,40 @@ def cache_view(prefix, timeout=300, include_user_id=False, vary_on_headers=None)
             # Generate final cache key
             cache_key = ":".join(key_parts)
             
+            if soft is not None or stampede_protection:
+                options = {}
+                if soft is not None:
+                    # Between soft and hard expiry serve stale, refresh in background
+                    # on a copy of the request, taken only once a refresh is due
+                    def make_refresh():
+                        detached = _detached_request(request)
+                        return lambda: view_func(detached, *args, **kwargs)
+
+                    options = {
+                        'stale_timeout': timeout - soft,
+                        'background': True,
+                        'make_refresh': make_refresh,
+                    }
+                
+                lookup = get_or_compute(
+                    cache_key,
+                    lambda: view_func(request, *args, **kwargs),
+                    soft or timeout,
+                    to_cache=_response_to_cache,
+                    beta=early_recompute_beta if stampede_protection else 0,
+                    lock_timeout=lock_timeout,
+                    **options
+                )
+                if lookup.computed:
+                    return lookup.result
+                logger.debug(f"Cache hit for view: {view_func.__name__} with key: {cache_key}")
+                return _response_from_cache(lookup.value)
+            
             # Try to get from cache
             cached_response = get_cache(cache_key)
             if cached_response:
                 logger.debug(f"Cache hit for view: {view_func.__name__} with key: {cache_key}")
-                
-                # Check response type (Django HttpResponse or DRF Response)
-                if isinstance(cached_response, dict) and 'content' in cached_response:
-                    # Django HttpResponse
-                    return HttpResponse(
-                        content=cached_response.get('content'),
-                        status=cached_response.get('status_code', 200),
-                        content_type=cached_response.get('content_type', 'application/json')
-                    )
-                else:
-                    # DRF Response
-                    return Response(cached_response)
+                return _response_from_cache(cached_response)
             
             # Call the view function and cache its response
             start_time = time.time()
@@ -74,25 +183,17 @@ def cache_view(prefix, timeout=300, include_user_id=False, vary_on_headers=None)
             execution_time = time.time() - start_time
             
             # Only cache if response is successful
-            if hasattr(response, 'status_code') and 200 <= response.status_code < 300:
+            cache_data = _response_to_cache(response)
+            if cache_data is not None:
                 logger.debug(f"Caching view result for: {view_func.__name__} (took {execution_time:.4f}s)")
-                
-                # Different handling for Django and DRF responses
-                if isinstance(response, HttpResponse):
-                    cache_data = {
-                        'content': response.content,
-                        'status_code': response.status_code,
-                        'content_type': response.get('Content-Type', 'application/json')
-                    }
-                    set_cache(cache_key, cache_data, timeout)
-                elif isinstance(response, Response):
-                    set_cache(cache_key, response.data, timeout)
+                set_cache(cache_key, cache_data, timeout)
             
             return response
         return wrapper
     return decorator
 
-def cache_method(prefix, timeout=3600, arg_positions=None, kwarg_keys=None):
+def cache_method(prefix, timeout=3600, arg_positions=None, kwarg_keys=None,
+                 stampede_protection=False, early_recompute_beta=1.0, lock_timeout=10):
     """
     Cache results of a class method.
     
@@ -101,6 +202,11 @@ def cache_method(prefix, timeout=3600, arg_positions=None, kwarg_keys=None):
         timeout (int): Cache timeout in seconds
         arg_positions (list): List of arg positions to include in cache key
         kwarg_keys (list): List of kwarg keys to include in cache key
+        stampede_protection (bool): Recompute under a Redis lock and refresh
+            hot keys early (see core.cache.stampede)
+        early_recompute_beta (float): XFetch aggressiveness, 0 disables
+            early refreshes
+        lock_timeout (int): Seconds before a recompute lock is released
         
     Returns:
         function: Decorator function
@@ -128,6 +234,16 @@ def cache_method(prefix, timeout=3600, arg_positions=None, kwarg_keys=None):
             
             cache_key = ":".join(key_parts)
             
+            if stampede_protection:
+                lookup = get_or_compute(
+                    cache_key,
+                    lambda: method(self, *args, **kwargs),
+                    timeout,
+                    beta=early_recompute_beta,
+                    lock_timeout=lock_timeout,
+                )
+                return lookup.result if lookup.computed else lookup.value
+            
             # Try to get from cache
             cached_result = get_cache(cache_key)
             if cached_result is not None:
@@ -145,6 +261,127 @@ def cache_method(prefix, timeout=3600, arg_positions=None, kwarg_keys=None):
         return wrapper
     return decorator
 
+# Headers that describe one particular response rather than its content
+MEMOIZE_SKIP_HEADERS = frozenset(('content-length', 'date', 'set-cookie', 'server-timing', 'x-profile-id'))
+
+def _find_request(args):
+    """The request among the arguments of a function view or view method"""
+    for arg in args[:2]:
+        if isinstance(arg, (HttpRequest, Request)):
+            return arg
+    raise TypeError("memoize_response needs a view or view method taking the request")
+
+def _memoize_key(prefix, request, kwargs, scope, vary_on_headers, version):
+    """Canonical key of a request: method, route, sorted query, user scope, headers"""
+    match = getattr(request, 'resolver_match', None)
+    route = match.view_name if match is not None and match.view_name else request.path
+    
+    parts = {
+        'method': request.method,
+        'kwargs': sorted((key, str(value)) for key, value in kwargs.items()),
+        'query': sorted(request.GET.lists()),
+    }
+    if scope == 'user':
+        user = getattr(request, 'user', None)
+        parts['user'] = user.pk if user is not None and user.is_authenticated else None
+    if vary_on_headers:
+        parts['headers'] = [request.headers.get(header) for header in vary_on_headers]
+    # DRF picks the renderer from the Accept header before the handler runs
+    media_type = getattr(request, 'accepted_media_type', None)
+    if media_type:
+        parts['media_type'] = media_type
+    if version is not None:
+        parts['version'] = version
+    
+    digest = hashlib.blake2b(json.dumps(parts, default=str).encode(), digest_size=16).hexdigest()
+    return f"{prefix}:{route}:{digest}"
+
+def _render(request, response):
+    """Render a DRF Response returned by a handler, the way APIView.finalize_response would"""
+    if isinstance(response, Response) and not response.is_rendered:
+        renderer = getattr(request, 'accepted_renderer', None)
+        view = getattr(request, 'parser_context', {}).get('view')
+        if renderer is None or view is None:
+            return None
+        response.accepted_renderer = renderer
+        response.accepted_media_type = request.accepted_media_type
+        response.renderer_context = view.get_renderer_context()
+        response.render()
+    return response
+
+def _memoized_from_response(response):
+    """Rendered bytes and headers of a response worth memoizing, or None"""
+    if response is None or response.status_code != 200 or getattr(response, 'streaming', False):
+        return None
+    if response.cookies:
+        return None
+    headers = [(name, value) for name, value in response.items() if name.lower() not in MEMOIZE_SKIP_HEADERS]
+    return {'content': response.content, 'headers': headers}
+
+def _response_from_memoized(memoized):
+    response = HttpResponse(memoized['content'])
+    for name, value in memoized['headers']:
+        response[name] = value
+    return response
+
+def memoize_response(prefix, timeout=300, scope='user', vary_on_headers=None, version=None):
+    """
+    Memoize the rendered response of a GET view.
+    
+    Unlike cache_view, the key is canonical: the HTTP method, the resolved
+    route name and its arguments, the query parameters sorted by name, the
+    user (unless ``scope`` is ``'global'``) and the negotiated media type,
+    so equal requests share an entry whatever their parameter order. The
+    stored value is the rendered body and headers, served back without
+    running the view or the renderer.
+    
+    Works on function views, under ``@api_view``, and on APIView methods.
+    
+    Args:
+        prefix (str): Cache key prefix, also the statistics prefix
+        timeout (int): Cache timeout in seconds
+        scope (str): ``'user'`` for per-user entries, ``'global'`` to share
+            them between users
+        vary_on_headers (list): Request headers to include in the key
+        version (callable): Called with the request; its result is part of
+            the key, so returning a new value retires every entry. Returning
+            None bypasses the cache.
+        
+    Returns:
+        function: Decorator function
+    """
+    if scope not in ('user', 'global'):
+        raise ValueError("scope must be 'user' or 'global'")
+    
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(*args, **kwargs):
+            request = _find_request(args)
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(*args, **kwargs)
+            
+            try:
+                current_version = version(request) if version is not None else None
+            except Exception as e:
+                logger.error(f"Error computing memoization version: {str(e)}")
+                current_version = None
+            if version is not None and current_version is None:
+                return view_func(*args, **kwargs)
+            
+            cache_key = _memoize_key(prefix, request, kwargs, scope, vary_on_headers, current_version)
+            memoized = get_cache(cache_key)
+            if memoized is not None:
+                logger.debug(f"Memoized response hit for: {view_func.__name__} with key: {cache_key}")
+                return _response_from_memoized(memoized)
+            
+            response = view_func(*args, **kwargs)
+            memoized = _memoized_from_response(_render(request, response))
+            if memoized is not None:
+                set_cache(cache_key, memoized, timeout)
+            return response
+        return wrapper
+    return decorator
+
 def invalidate_cache_on_change(prefixes):
     """
     Decorator to invalidate cache after a function/method executes.
@@ -0,0 +1,260 @@
+"""
+In-process near cache that sits in front of the shared Redis cache.
+
+Hot keys such as ``tasks`` and ``task_<id>`` are served from worker memory
+for a short time instead of costing a Redis round trip on every read.
+Workers stay coherent through invalidation messages published on a Redis
+pub/sub channel whenever a key is written or invalidated.
+"""
+import os
+import json
+import time
+import uuid
+import pickle
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': False,
+    'MAX_ENTRIES': 1024,
+    'MAX_BYTES': 8 * 1024 * 1024,
+    'TIMEOUT': 5,
+    'CHANNEL': 'cache:invalidations',
+}
+
+
+class LocalCache:
+    """
+    Thread-safe LRU cache bounded by entry count, total bytes and a short TTL.
+
+    Values are stored pickled so that callers never share mutable objects and
+    so that the byte budget reflects the real payload size.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=8 * 1024 * 1024, timeout=5):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._data = OrderedDict()  # key -> (expires_at, payload)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value or None, refreshing the key's LRU position."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, payload = entry
+            if expires_at <= time.monotonic():
+                self._pop(key)
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+
+        return pickle.loads(payload)
+
+    def set(self, key, value, timeout=None):
+        """
+        Store a value locally.
+
+        The local TTL never exceeds ``timeout`` so that a short-lived Redis
+        entry is not kept alive in memory after it expired upstream.
+        """
+        try:
+            payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+
+        if len(payload) > self.max_bytes:
+            self.delete(key)
+            return False
+
+        ttl = self.timeout if timeout is None else min(self.timeout, timeout)
+        if ttl <= 0:
+            self.delete(key)
+            return False
+
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (time.monotonic() + ttl, payload)
+            self._size += len(payload)
+
+            while len(self._data) > self.max_entries or self._size > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._pop(oldest)
+                self.evictions += 1
+
+        return True
+
+    def delete(self, key):
+        """Drop a single key."""
+        with self._lock:
+            return self._pop(key)
+
+    def delete_prefix(self, prefix):
+        """Drop every key that starts with ``prefix``."""
+        with self._lock:
+            keys = [key for key in self._data if key.startswith(prefix)]
+            for key in keys:
+                self._pop(key)
+        return len(keys)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    def stats(self):
+        """Return hit/miss counters and current usage of the local tier."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._data),
+                'bytes': self._size,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+            }
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self._size -= len(entry[1])
+        return True
+
+
+class NearCache:
+    """
+    LocalCache kept coherent across worker processes through Redis pub/sub.
+
+    Every write or invalidation is published on ``channel``; each process runs
+    a daemon subscriber that evicts the matching local entries. Messages sent
+    by the current process are ignored since it already updated itself.
+    """
+
+    def __init__(self, redis_client, channel, enabled=True, pubsub_client=None, **local_options):
+        self.redis_client = redis_client
+        # Subscriptions hold a connection for the process lifetime, so they
+        # can be given a client from a dedicated pool
+        self.pubsub_client = pubsub_client or redis_client
+        self.channel = channel
+        self.enabled = enabled
+        self.local = LocalCache(**local_options)
+        self._origin = uuid.uuid4().hex
+        self._pid = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, redis_client, options=None, pubsub_client=None):
+        """Build a near cache from a ``LOCAL_CACHE``-style settings dict."""
+        config = dict(DEFAULT_SETTINGS)
+        config.update(options or {})
+        return cls(
+            redis_client,
+            channel=config['CHANNEL'],
+            enabled=config['ENABLED'],
+            pubsub_client=pubsub_client,
+            max_entries=config['MAX_ENTRIES'],
+            max_bytes=config['MAX_BYTES'],
+            timeout=config['TIMEOUT'],
+        )
+
+    def get(self, key):
+        self._ensure_listener()
+        return self.local.get(key)
+
+    def set(self, key, value, timeout=None):
+        self._ensure_listener()
+        return self.local.set(key, value, timeout)
+
+    def invalidate_key(self, key):
+        """Evict a key locally and on every other worker."""
+        self.local.delete(key)
+        self._publish('key', key)
+
+    def invalidate_prefix(self, prefix):
+        """Evict all keys with a prefix locally and on every other worker."""
+        self.local.delete_prefix(prefix)
+        self._publish('prefix', prefix)
+
+    def stats(self):
+        stats = self.local.stats()
+        stats['enabled'] = self.enabled
+        stats['listening'] = bool(self._thread and self._thread.is_alive())
+        return stats
+
+    def _publish(self, op, target):
+        try:
+            message = json.dumps({'origin': self._origin, 'op': op, 'target': target})
+            self.redis_client.publish(self.channel, message)
+        except Exception as e:
+            logger.error(f"Error publishing cache invalidation for {target}: {str(e)}")
+
+    def _ensure_listener(self):
+        """
+        Start the subscriber thread once per process.
+
+        Threads do not survive a fork, so a pre-forking server (gunicorn)
+        gets a fresh listener and an empty local tier in every worker.
+        """
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            self.local.clear()
+            try:
+                pubsub = self.pubsub_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{self.channel: self._handle_message})
+                self._thread = pubsub.run_in_thread(
+                    sleep_time=1.0,
+                    daemon=True,
+                    exception_handler=self._handle_listener_error,
+                )
+            except Exception as e:
+                # Without a listener we cannot trust local entries beyond
+                # their TTL, so keep serving but log the degraded state.
+                logger.error(f"Error starting cache invalidation listener: {str(e)}")
+            self._pid = pid
+
+    def _handle_message(self, message):
+        try:
+            data = json.loads(message['data'])
+        except (TypeError, ValueError):
+            return
+
+        if data.get('origin') == self._origin:
+            return
+
+        if data.get('op') == 'key':
+            self.local.delete(data.get('target', ''))
+        elif data.get('op') == 'prefix':
+            self.local.delete_prefix(data.get('target', ''))
+        else:
+            self.local.clear()
+
+    def _handle_listener_error(self, exc, pubsub, thread):
+        # Messages may have been missed while disconnected; drop everything
+        # and let the pubsub reconnect on its next poll.
+        logger.warning(f"Cache invalidation listener error: {str(exc)}")
+        self.local.clear()
+        time.sleep(1.0)
\ No newline at end of file
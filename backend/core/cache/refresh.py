@@ -0,0 +1,70 @@
+"""
+Bounded background executor for stale-while-revalidate cache refreshes.
+"""
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+class BackgroundRefresher:
+    """
+    Runs cache recomputations off the request path.
+
+    At most ``max_workers`` refreshes run concurrently and at most
+    ``max_pending`` are queued; further submissions are rejected so a slow
+    database cannot build up an unbounded backlog.
+    """
+
+    def __init__(self, max_workers=4, max_pending=100):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def submit(self, func):
+        """
+        Schedule ``func`` in the background.
+
+        Returns:
+            bool: False if the queue is full and the job was not scheduled
+        """
+        executor = self._get_executor()
+        if not self._slots.acquire(blocking=False):
+            return False
+
+        try:
+            executor.submit(self._run, func)
+        except Exception as e:
+            self._slots.release()
+            logger.error(f"Error scheduling background cache refresh: {str(e)}")
+            return False
+        return True
+
+    def _run(self, func):
+        try:
+            func()
+        except Exception as e:
+            logger.error(f"Background cache refresh failed: {str(e)}")
+        finally:
+            # Database connections are per thread; don't leak them from the pool
+            connections.close_all()
+            self._slots.release()
+
+    def _get_executor(self):
+        # Worker threads do not survive a fork, so each process gets its own pool
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='cache-refresh',
+                    )
+                    self._slots = threading.BoundedSemaphore(self.max_pending)
+                    self._pid = pid
+        return self._executor
\ No newline at end of file
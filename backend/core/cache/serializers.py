@@ -0,0 +1,170 @@
+"""
+Pluggable serializers and compressors for Redis cache payloads.
+
+Every payload written by CacheSerializer starts with a two byte header: a
+marker byte (0xFF, which never occurs in UTF-8 or JSON text) followed by a
+type byte whose high nibble records the serializer and low nibble the
+compressor. Readers therefore decode any payload regardless of the current
+configuration. Legacy raw bytes values may start with 0xFF too, so a payload
+only counts as framed when its type byte is valid, and one that still fails
+to decode is read the legacy way.
+
+orjson, msgpack and lz4 are optional (requirements/optional.txt); selecting
+one that is not installed raises ImproperlyConfigured.
+"""
+import json
+import zlib
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+MARKER = 0xFF
+
+# Serializer codes (high nibble of the type byte)
+SERIALIZER_CODES = {
+    'json': 1,
+    'orjson': 2,
+    'msgpack': 3,
+    'str': 4,
+    'bytes': 5,
+}
+
+# Compressor codes (low nibble of the type byte)
+COMPRESSOR_CODES = {
+    None: 0,
+    'zlib': 1,
+    'lz4': 2,
+}
+
+def _json_dumps(obj):
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def _json_loads(data):
+    return json.loads(data.decode('utf-8'))
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+def _msgpack_dumps(obj):
+    return msgpack.packb(obj, use_bin_type=True)
+
+def _msgpack_loads(data):
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+def _zlib_compress(data, level):
+    return zlib.compress(data, 6 if level is None else level)
+
+def _lz4_compress(data, level):
+    # lz4 levels above 2 switch to the much slower high-compression mode
+    return lz4_frame.compress(data, compression_level=0 if level is None else level)
+
+SERIALIZERS = {
+    1: (_json_dumps, _json_loads),
+    2: (_orjson_dumps, lambda data: orjson.loads(data)),
+    3: (_msgpack_dumps, _msgpack_loads),
+    4: (lambda obj: obj.encode('utf-8'), lambda data: data.decode('utf-8')),
+    5: (lambda obj: obj, lambda data: data),
+}
+
+COMPRESSORS = {
+    1: (_zlib_compress, zlib.decompress),
+    2: (_lz4_compress, lambda data: lz4_frame.decompress(data)),
+}
+
+AVAILABLE = {
+    'json': True,
+    'orjson': orjson is not None,
+    'msgpack': msgpack is not None,
+    'zlib': True,
+    'lz4': lz4_frame is not None,
+}
+
+def is_framed(data):
+    """
+    Whether a stored payload carries a CacheSerializer header: the marker
+    followed by a type byte naming a known serializer and compressor.
+    """
+    if not (isinstance(data, bytes) and len(data) >= 2 and data[0] == MARKER):
+        return False
+    code, compressor_code = data[1] >> 4, data[1] & 0x0F
+    return code in SERIALIZERS and (compressor_code == 0 or compressor_code in COMPRESSORS)
+
+class CacheSerializer:
+    """
+    Encodes cache values with a configurable serializer and compressor.
+
+    Args:
+        serializer (str): 'json', 'orjson' or 'msgpack'
+        compressor (str): None, 'zlib' or 'lz4'
+        compress_min_length (int): Payloads shorter than this stay uncompressed
+        compress_level (int): Compression level, None for the compressor's default
+    """
+
+    def __init__(self, serializer='json', compressor=None, compress_min_length=1024, compress_level=None):
+        for name in (serializer, compressor):
+            if name is not None and name not in AVAILABLE:
+                raise ImproperlyConfigured(f"Unknown cache serializer or compressor: {name}")
+            if name is not None and not AVAILABLE[name]:
+                raise ImproperlyConfigured(f"Cache serializer or compressor '{name}' is not installed")
+
+        self.serializer = serializer
+        self.compressor = compressor
+        self.compress_min_length = compress_min_length
+        self.compress_level = compress_level
+        self._serializer_code = SERIALIZER_CODES[serializer]
+        self._compressor_code = COMPRESSOR_CODES[compressor]
+
+    @classmethod
+    def from_options(cls, options):
+        """Build a serializer from cache OPTIONS."""
+        return cls(
+            serializer=options.get('SERIALIZER', 'json'),
+            compressor=options.get('COMPRESSOR'),
+            compress_min_length=options.get('COMPRESS_MIN_LENGTH', 1024),
+            compress_level=options.get('COMPRESS_LEVEL'),
+        )
+
+    def dumps(self, obj):
+        """Serialize a value into a framed payload."""
+        if isinstance(obj, str):
+            code = SERIALIZER_CODES['str']
+        elif isinstance(obj, bytes):
+            code = SERIALIZER_CODES['bytes']
+        else:
+            code = self._serializer_code
+
+        payload = SERIALIZERS[code][0](obj)
+
+        compressor_code = 0
+        if self._compressor_code and len(payload) >= self.compress_min_length:
+            compressed = COMPRESSORS[self._compressor_code][0](payload, self.compress_level)
+            # Keep the original if compression does not pay off
+            if len(compressed) < len(payload):
+                payload = compressed
+                compressor_code = self._compressor_code
+
+        return bytes((MARKER, (code << 4) | compressor_code)) + payload
+
+    def loads(self, data):
+        """Deserialize a framed payload written by any CacheSerializer."""
+        type_byte = data[1]
+        code, compressor_code = type_byte >> 4, type_byte & 0x0F
+        payload = data[2:]
+
+        if compressor_code:
+            payload = COMPRESSORS[compressor_code][1](payload)
+
+        return SERIALIZERS[code][1](payload)
\ No newline at end of file
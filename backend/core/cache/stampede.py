@@ -0,0 +1,245 @@
+"""
+Cache stampede protection for expensive cached computations.
+
+Two complementary techniques are combined:
+
+- Single flight: when a key is missing or expired, only the worker holding a
+  short Redis lock recomputes it. Other workers are served the stale value
+  if one is still stored, or wait briefly for the winner to fill the key.
+- Probabilistic early expiration (XFetch): each read may decide to refresh
+  the key before it expires, with a probability that grows as expiry nears
+  and with how long the value took to compute. Hot keys are therefore
+  refreshed by a single request before the rest of the traffic misses.
+- Stale-while-revalidate: with a background refresher the lock holder also
+  returns the stale value at once and recomputes on a bounded thread pool,
+  so no request waits for the recomputation once the key has been warm.
+
+Values are stored in an envelope recording the logical expiry and compute
+time; the Redis TTL is extended by a grace period so stale values remain
+available while the refresh runs.
+"""
+import math
+import time
+import random
+import logging
+import threading
+from collections import namedtuple
+from django.conf import settings
+from .utils import get_cache, set_cache, redis_client
+from .refresh import BackgroundRefresher
+
+logger = logging.getLogger(__name__)
+
+ENVELOPE_MARKER = '__stampede__'
+LOCK_PREFIX = 'lock:'
+
+Lookup = namedtuple('Lookup', ['value', 'result', 'computed'])
+
+# Global stale-while-revalidate defaults, overridable per alias in settings.CACHES
+SWR_DEFAULTS = {
+    'ENABLED': False,
+    'SOFT_TIMEOUT_RATIO': 0.5,
+    'MAX_WORKERS': 4,
+    'MAX_PENDING': 100,
+}
+
+swr_settings = {
+    **SWR_DEFAULTS,
+    **settings.CACHES.get('default', {}).get('STALE_WHILE_REVALIDATE', {}),
+}
+
+refresher = BackgroundRefresher(
+    max_workers=swr_settings['MAX_WORKERS'],
+    max_pending=swr_settings['MAX_PENDING'],
+)
+
+class StampedeMetrics:
+    """Process-local counters for lock waits and early refreshes."""
+
+    FIELDS = (
+        'recomputes',
+        'early_refreshes',
+        'stale_served',
+        'lock_waits',
+        'lock_wait_timeouts',
+        'background_refreshes',
+        'refresh_rejected',
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counters = dict.fromkeys(self.FIELDS, 0)
+            self._lock_wait_seconds = 0.0
+
+    def incr(self, field, amount=1):
+        with self._lock:
+            self._counters[field] += amount
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self._counters['lock_waits'] += 1
+            self._lock_wait_seconds += seconds
+
+    def snapshot(self):
+        with self._lock:
+            data = dict(self._counters)
+            data['lock_wait_seconds'] = round(self._lock_wait_seconds, 6)
+        return data
+
+metrics = StampedeMetrics()
+
+def make_envelope(value, timeout, delta):
+    """Wrap a value with the metadata needed for early recomputation."""
+    return {
+        ENVELOPE_MARKER: 1,
+        'value': value,
+        'delta': delta,
+        'expiry': None if timeout is None else time.time() + timeout,
+    }
+
+def is_envelope(data):
+    return isinstance(data, dict) and data.get(ENVELOPE_MARKER) == 1
+
+def should_recompute(envelope, beta=1.0, now=None):
+    """
+    XFetch decision: recompute when now - delta * beta * ln(rand) >= expiry.
+
+    Returns True once the value is logically expired, and with increasing
+    probability as the expiry approaches. beta > 1 favours earlier refreshes.
+    """
+    expiry = envelope.get('expiry')
+    if expiry is None:
+        return False
+
+    now = time.time() if now is None else now
+    if now >= expiry:
+        return True
+    if beta <= 0:
+        return False
+
+    # 1 - random() lies in (0, 1], keeping log() defined
+    return now - envelope.get('delta', 0) * beta * math.log(1.0 - random.random()) >= expiry
+
+def get_or_compute(cache_key, compute, timeout, to_cache=None, beta=1.0,
+                   lock_timeout=10, wait_timeout=2.0, stale_timeout=60, background=False,
+                   make_refresh=None):
+    """
+    Return a cached value, recomputing it under a lock when needed.
+
+    Args:
+        cache_key (str): Cache key
+        compute (callable): Produces the fresh result
+        timeout (int): Logical lifetime of the value in seconds
+        to_cache (callable): Maps a result to the value to store, or None
+            if the result must not be cached. Defaults to the result itself.
+        beta (float): XFetch aggressiveness, 0 disables early refreshes
+        lock_timeout (int): Seconds before an abandoned lock is released
+        wait_timeout (float): Seconds to wait for another worker on a cold miss
+        stale_timeout (int): Seconds a value stays readable after expiry
+        background (bool): Serve the stale value and refresh it on the
+            background refresher instead of recomputing inline
+        make_refresh (callable): Returns the callable producing the fresh
+            result on the background refresher, for callers whose ``compute``
+            must not outlive the current request. Only called when a refresh
+            is scheduled. Defaults to reusing ``compute``.
+
+    Returns:
+        Lookup: ``computed`` tells whether ``result`` holds the fresh return
+        value of ``compute``; otherwise ``value`` holds the cached value.
+    """
+    to_cache = to_cache or (lambda result: result)
+    envelope = get_cache(cache_key)
+
+    if is_envelope(envelope):
+        if not should_recompute(envelope, beta):
+            return Lookup(envelope['value'], None, False)
+
+        expired = envelope['expiry'] is not None and time.time() >= envelope['expiry']
+        lock = _acquire(cache_key, lock_timeout)
+        if lock is None:
+            # Another worker is already refreshing this key
+            if expired:
+                metrics.incr('stale_served')
+            return Lookup(envelope['value'], None, False)
+
+        if not expired:
+            metrics.incr('early_refreshes')
+
+        if background:
+            refresh = make_refresh() if make_refresh is not None else compute
+            scheduled = refresher.submit(
+                lambda: _compute_and_store(cache_key, refresh, timeout, to_cache, stale_timeout, lock)
+            )
+            if scheduled:
+                metrics.incr('background_refreshes')
+            else:
+                # Pool saturated: keep serving stale and let a later read retry
+                metrics.incr('refresh_rejected')
+                _release(lock)
+            if expired:
+                metrics.incr('stale_served')
+            return Lookup(envelope['value'], None, False)
+
+        return _compute_and_store(cache_key, compute, timeout, to_cache, stale_timeout, lock)
+
+    lock = _acquire(cache_key, lock_timeout)
+    if lock is not None:
+        return _compute_and_store(cache_key, compute, timeout, to_cache, stale_timeout, lock)
+
+    # Cold miss while another worker computes: wait for it to fill the key
+    started = time.monotonic()
+    while time.monotonic() - started < wait_timeout:
+        time.sleep(0.05)
+        envelope = get_cache(cache_key)
+        if is_envelope(envelope):
+            metrics.record_wait(time.monotonic() - started)
+            return Lookup(envelope['value'], None, False)
+
+    metrics.record_wait(time.monotonic() - started)
+    metrics.incr('lock_wait_timeouts')
+    logger.warning(f"Timed out waiting for cache key {cache_key}, computing without lock")
+    return _compute_and_store(cache_key, compute, timeout, to_cache, stale_timeout, None)
+
+def _acquire(cache_key, lock_timeout):
+    try:
+        # Not thread local: a background refresh releases the lock on another thread
+        lock = redis_client.lock(f"{LOCK_PREFIX}{cache_key}", timeout=lock_timeout, thread_local=False)
+        if lock.acquire(blocking=False):
+            return lock
+    except Exception as e:
+        # Without Redis locking fall back to the unprotected behaviour
+        logger.error(f"Error acquiring cache lock for {cache_key}: {str(e)}")
+        return _NullLock()
+    return None
+
+def _compute_and_store(cache_key, compute, timeout, to_cache, stale_timeout, lock):
+    try:
+        start_time = time.time()
+        result = compute()
+        delta = time.time() - start_time
+        metrics.incr('recomputes')
+
+        value = to_cache(result)
+        if value is not None:
+            ttl = None if timeout is None else timeout + stale_timeout
+            set_cache(cache_key, make_envelope(value, timeout, delta), ttl)
+        return Lookup(value, result, True)
+    finally:
+        _release(lock)
+
+def _release(lock):
+    if lock is None:
+        return
+    try:
+        lock.release()
+    except Exception:
+        # The lock expired while computing; another worker may own it now
+        pass
+
+class _NullLock:
+    def release(self):
+        pass
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""
+Per-prefix cache statistics.
+
+Every read, write and invalidation through ``get_cache``/``set_cache``,
+HierarchicalRedisCache and the ``task_<id>`` keys of Task is counted under
+the key's prefix: its first ``:``-separated segment with a trailing numeric
+id removed, so ``tasks-list:/api/tasks/`` and ``task_42`` are reported as
+``tasks-list`` and ``task``.
+
+Counters and latency histograms are kept per process in RedisCounters
+(core.flushing) and added to Redis hashes every FLUSH_INTERVAL seconds, so
+recording costs a dict update. Latency percentiles are estimated from the
+merged histograms of all workers.
+"""
+import re
+import bisect
+import logging
+from collections import defaultdict
+from core.flushing import RedisCounters
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'KEY_PREFIX': 'cache-stats',
+    'FLUSH_INTERVAL': 10,
+    'SIZE_SAMPLE_RATE': 0.1,  # Fraction of set_cache writes whose size is measured
+}
+
+# Payload sizes are only known for some writes (see set_cache), so bytes are
+# tracked together with the number of sized writes
+COUNTERS = ('hits', 'local_hits', 'misses', 'sets', 'sized_sets', 'sized_bytes', 'invalidations')
+
+# Upper bounds in seconds of the latency histogram buckets, 50us to 1s
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 1.0,
+)
+
+PERCENTILES = (50, 95, 99)
+
+_TRAILING_ID = re.compile(r'[_-]?\d+$')
+
+SEP = '|'
+
+
+def key_prefix(key):
+    """Return the statistics prefix of a cache key."""
+    if isinstance(key, bytes):
+        key = key.decode('utf-8', 'replace')
+    segment = key.split(':', 1)[0]
+    return _TRAILING_ID.sub('', segment) or segment
+
+
+class CacheStats:
+    """Process-local per-prefix cache counters merged into Redis."""
+
+    def __init__(self, redis_client, key_prefix='cache-stats', flush_interval=10, enabled=True):
+        self.redis_client = redis_client
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.counters_key = f"{key_prefix}:counters"
+        self.latency_key = f"{key_prefix}:latency"
+        self._deltas = RedisCounters(redis_client, 'cache-stats', flush_interval, sep=SEP)
+
+    @classmethod
+    def from_settings(cls, redis_client, options=None):
+        """Build the recorder from a ``CACHE_STATS``-style settings dict."""
+        config = {**DEFAULT_SETTINGS, **(options or {})}
+        return cls(
+            redis_client,
+            key_prefix=config['KEY_PREFIX'],
+            flush_interval=config['FLUSH_INTERVAL'],
+            enabled=config['ENABLED'],
+        )
+
+    def record_get(self, key, hit, seconds, local=False):
+        self._record(key_prefix(key), 'get', seconds, ('local_hits' if local else 'hits') if hit else 'misses')
+
+    def record_get_many(self, keys, hits, seconds):
+        """Record a multi-key read; ``hits`` is the number of keys found."""
+        if not keys:
+            return
+        prefix = key_prefix(keys[0])
+        deltas = self._deltas
+        deltas.ensure_flusher()
+        with deltas.lock:
+            deltas.counts[self._field(prefix, 'hits')] += hits
+            deltas.counts[self._field(prefix, 'misses')] += len(keys) - hits
+            self._observe(prefix, 'get', seconds)
+
+    def record_set(self, key, size, seconds, count=1):
+        """Record ``count`` writes totalling ``size`` bytes, or of unknown size if None."""
+        prefix = key_prefix(key)
+        deltas = self._deltas
+        deltas.ensure_flusher()
+        with deltas.lock:
+            deltas.counts[self._field(prefix, 'sets')] += count
+            if size is not None:
+                deltas.counts[self._field(prefix, 'sized_sets')] += count
+                deltas.counts[self._field(prefix, 'sized_bytes')] += size
+            self._observe(prefix, 'set', seconds)
+
+    def record_invalidation(self, key, count=1):
+        if not count:
+            return
+        deltas = self._deltas
+        deltas.ensure_flusher()
+        with deltas.lock:
+            deltas.counts[self._field(key_prefix(key), 'invalidations')] += count
+
+    def flush(self):
+        """Add the counts recorded since the last flush to Redis."""
+        self._deltas.flush()
+
+    def snapshot(self):
+        """Aggregated statistics of all workers, per prefix."""
+        self.flush()
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hgetall(self.counters_key)
+        pipe.hgetall(self.latency_key)
+        counters, latency = pipe.execute()
+
+        prefixes = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+        for field, value in counters.items():
+            prefix, name = _decode(field).rsplit(SEP, 1)
+            if name in COUNTERS:
+                prefixes[prefix][name] = int(value)
+
+        histograms = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+        for field, value in latency.items():
+            prefix, op, index = _decode(field).rsplit(SEP, 2)
+            if int(index) <= len(LATENCY_BUCKETS):
+                histograms[(prefix, op)][int(index)] += int(value)
+
+        result = {}
+        for prefix, stats in sorted(prefixes.items()):
+            hits = stats['hits'] + stats['local_hits']
+            lookups = hits + stats['misses']
+            stats['hit_ratio'] = round(hits / lookups, 4) if lookups else 0.0
+            average = stats['sized_bytes'] / stats['sized_sets'] if stats['sized_sets'] else 0
+            stats['avg_set_bytes'] = round(average)
+            stats['bytes_written'] = round(average * stats['sets'])
+            stats['latency_ms'] = {
+                op: _percentiles(histograms[(prefix, op)])
+                for op in ('get', 'set') if (prefix, op) in histograms
+            }
+            result[prefix] = stats
+        return result
+
+    def reset(self):
+        """Drop all local and aggregated statistics."""
+        self._deltas.clear()
+        self.redis_client.delete(self.counters_key, self.latency_key)
+
+    def _record(self, prefix, op, seconds, counter):
+        deltas = self._deltas
+        deltas.ensure_flusher()
+        with deltas.lock:
+            deltas.counts[self._field(prefix, counter)] += 1
+            self._observe(prefix, op, seconds)
+
+    def _field(self, prefix, name):
+        return (self.counters_key, f"{prefix}{SEP}{name}")
+
+    def _observe(self, prefix, op, seconds):
+        buckets = self._deltas.histogram(self.latency_key, f"{prefix}{SEP}{op}", len(LATENCY_BUCKETS) + 1)
+        buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+
+def _percentiles(buckets):
+    """Estimate percentiles in milliseconds as the upper bound of their bucket."""
+    total = sum(buckets)
+    result = {}
+    for percentile in PERCENTILES:
+        rank = total * percentile / 100
+        seen = 0
+        for index, count in enumerate(buckets):
+            seen += count
+            if seen >= rank:
+                bound = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else None
+                result[f"p{percentile}"] = round(bound * 1000, 3) if bound is not None else None
+                break
+    return result
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
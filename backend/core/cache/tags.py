@@ -0,0 +1,239 @@
+"""
+Tag index for prefix invalidation without scanning the keyspace.
+
+Every cached key is registered under the tags formed by its leading
+colon-separated segments. With the default depth of 3 the key
+``user-detail:5:/api/accounts/profile/`` is registered under
+``user-detail``, ``user-detail:5`` and ``user-detail:5:/api/accounts/profile/``.
+Invalidating a prefix then only touches the keys recorded for that tag.
+
+Prefixes are therefore matched on whole segments: ``user-detail:1`` covers
+``user-detail:1:/api/x`` but not ``user-detail:10:/api/x``, and ``task_``
+covers nothing under ``task_5``. A prefix ending in ``*`` inside a segment,
+such as ``task_*``, cannot be answered from the index and is resolved by
+walking the keyspace instead.
+
+Each tag is a sorted set scored by the expiry time of its members, so
+expired members are trimmed lazily on every write, and the set itself
+expires with its longest-lived member, so the index never outgrows the
+live keyspace. Deleted keys are removed from their tags.
+"""
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+TAG_KEY_PREFIX = '_tags:'
+
+DEFAULT_SETTINGS = {
+    'DEPTH': 3,
+    'SCAN_FALLBACK': False,
+    'BATCH_SIZE': 500,
+}
+
+def key_tags(key, depth):
+    """
+    Return the tags a key is registered under.
+
+    Example: key_tags('user-detail:5:/api/x', 2) -> ['user-detail', 'user-detail:5']
+    """
+    parts = key.split(':')
+    return [':'.join(parts[:i]) for i in range(1, min(depth, len(parts)) + 1)]
+
+# Expire a tag with its longest-lived member, or never if one has no expiry
+EXPIRE_WITH_MEMBERS = """
+local top = redis.call('ZRANGE', KEYS[1], -1, -1, 'WITHSCORES')
+if top[2] == nil then
+    return 0
+end
+if top[2] == 'inf' then
+    return redis.call('PERSIST', KEYS[1])
+end
+return redis.call('EXPIREAT', KEYS[1], math.ceil(tonumber(top[2])) + 1)
+"""
+
+def normalize_prefix(prefix):
+    """Strip glob and separator suffixes so 'tasks:user:1:*' becomes 'tasks:user:1'."""
+    return prefix.rstrip('*').rstrip(':')
+
+class TagIndex:
+    """
+    Maintains the tag -> keys index for one cache namespace.
+
+    Args:
+        client: Redis client used for the index and for deleting keys
+        make_key (callable): Maps a cache key to the actual Redis key
+        depth (int): Number of leading key segments that become tags
+        batch_size (int): Members read and unlinked per round trip
+    """
+
+    def __init__(self, client, make_key, depth=3, batch_size=500):
+        self.client = client
+        self.make_key = make_key
+        self.depth = depth
+        self.batch_size = batch_size
+        self._expire_with_members = client.register_script(EXPIRE_WITH_MEMBERS)
+
+    def tag_key(self, tag):
+        return self.make_key(f"{TAG_KEY_PREFIX}{tag}")
+
+    def can_invalidate(self, prefix):
+        """Whether a prefix maps onto a tag rather than needing a SCAN."""
+        if prefix.endswith('*') and not prefix.rstrip('*').endswith(':'):
+            # 'task_*' asks for a partial segment, which no tag records
+            return False
+        tag = normalize_prefix(prefix)
+        if not tag or any(c in tag for c in '*?[]'):
+            return False
+        return len(tag.split(':')) <= self.depth
+
+    def add(self, keys, timeout=None, pipeline=None, version=None):
+        """
+        Register cache keys under their tags.
+
+        Args:
+            keys (str or list): Cache key(s) as passed to the cache API
+            timeout (int): Key timeout in seconds, None for no expiry
+            pipeline: Optional pipeline to queue the commands on
+            version (int): Cache key version, defaults to the cache's version
+
+        Returns:
+            The pipeline results when no pipeline was given, otherwise None
+        """
+        if isinstance(keys, str):
+            keys = [keys]
+
+        now = time.time()
+        expires_at = float('inf') if timeout is None else now + timeout
+        pipe = pipeline if pipeline is not None else self.client.pipeline(transaction=False)
+
+        members = {}
+        for key in keys:
+            redis_key = self.make_key(key, version)
+            for tag in key_tags(key, self.depth):
+                members.setdefault(tag, {})[redis_key] = expires_at
+
+        for tag, mapping in members.items():
+            tag_key = self.tag_key(tag)
+            pipe.zadd(tag_key, mapping)
+            pipe.zremrangebyscore(tag_key, '-inf', now)
+            self._expire_with_members(keys=[tag_key], client=pipe)
+
+        if pipeline is None:
+            return pipe.execute()
+        return None
+
+    def remove(self, keys, pipeline=None, version=None):
+        """
+        Drop deleted cache keys from their tags.
+
+        Args:
+            keys (str or list): Cache key(s) as passed to the cache API
+            pipeline: Optional pipeline to queue the commands on
+            version (int): Cache key version, defaults to the cache's version
+
+        Returns:
+            The pipeline results when no pipeline was given, otherwise None
+        """
+        if isinstance(keys, str):
+            keys = [keys]
+
+        pipe = pipeline if pipeline is not None else self.client.pipeline(transaction=False)
+
+        members = {}
+        for key in keys:
+            redis_key = self.make_key(key, version)
+            for tag in key_tags(key, self.depth):
+                members.setdefault(tag, []).append(redis_key)
+
+        for tag, redis_keys in members.items():
+            pipe.zrem(self.tag_key(tag), *redis_keys)
+
+        if pipeline is None:
+            return pipe.execute()
+        return None
+
+    def invalidate(self, prefix):
+        """
+        Unlink every key registered under a prefix's tag.
+
+        The tag set is renamed first so that keys written concurrently land in
+        a fresh set and are not dropped from the index.
+
+        Returns:
+            int: Number of keys removed
+        """
+        tag_key = self.tag_key(normalize_prefix(prefix))
+        snapshot_key = f"{tag_key}:invalidating:{time.monotonic_ns()}"
+
+        try:
+            self.client.rename(tag_key, snapshot_key)
+        except Exception:
+            # Nothing was ever cached under this tag
+            return 0
+
+        deleted = 0
+        start = 0
+        try:
+            while True:
+                members = self.client.zrange(snapshot_key, start, start + self.batch_size - 1)
+                if not members:
+                    break
+
+                pipe = self.client.pipeline(transaction=False)
+                for i in range(0, len(members), 100):
+                    pipe.unlink(*members[i:i + 100])
+                deleted += sum(pipe.execute())
+                start += self.batch_size
+        finally:
+            self.client.unlink(snapshot_key)
+
+        return deleted
+
+    def backfill(self, prefix, scan_count=1000):
+        """
+        Register keys written before the index existed.
+
+        Walks the keyspace once for ``prefix`` and records each key with its
+        remaining TTL. This is the one-off migration path; afterwards the
+        index is maintained on every write.
+
+        Returns:
+            int: Number of keys indexed
+        """
+        namespace = self.make_key('')
+        pattern = f"{self.make_key(prefix)}*"
+        indexed = 0
+
+        batch = []
+        for redis_key in self.client.scan_iter(match=pattern, count=scan_count):
+            if isinstance(redis_key, bytes):
+                redis_key = redis_key.decode('utf-8')
+            if TAG_KEY_PREFIX in redis_key:
+                continue
+            batch.append(redis_key)
+            if len(batch) >= self.batch_size:
+                indexed += self._backfill_batch(batch, namespace)
+                batch = []
+
+        if batch:
+            indexed += self._backfill_batch(batch, namespace)
+
+        return indexed
+
+    def _backfill_batch(self, redis_keys, namespace):
+        pipe = self.client.pipeline(transaction=False)
+        for redis_key in redis_keys:
+            pipe.ttl(redis_key)
+        ttls = pipe.execute()
+
+        pipe = self.client.pipeline(transaction=False)
+        indexed = 0
+        for redis_key, ttl in zip(redis_keys, ttls):
+            if ttl == -2:
+                continue  # Expired since the scan
+            key = redis_key[len(namespace):] if redis_key.startswith(namespace) else redis_key
+            self.add(key, None if ttl == -1 else ttl, pipeline=pipe)
+            indexed += 1
+        pipe.execute()
+        return indexed
\ No newline at end of file
@@ -1,31 +1,103 @@
 import json
+import time
+import pickle
+import random
 import logging
-import redis
 from django.conf import settings
 from django.core.cache import cache
+from core.connections import get_redis_client
+from .local import NearCache
+from .tags import TagIndex, DEFAULT_SETTINGS as TAG_DEFAULTS
+from .stats import CacheStats, DEFAULT_SETTINGS as STATS_DEFAULTS
 
 logger = logging.getLogger(__name__)
 
 # Redis client for operations not supported by Django's cache
-redis_client = redis.Redis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    db=settings.REDIS_DB,
-    password=settings.REDIS_PASSWORD,
-    decode_responses=True
+redis_client = get_redis_client('cache', decode_responses=True)
+
+# Optional in-process tier in front of Redis, see LOCAL_CACHE in settings
+near_cache = NearCache.from_settings(
+    redis_client,
+    getattr(settings, 'LOCAL_CACHE', None),
+    pubsub_client=get_redis_client('pubsub', decode_responses=True),
+)
+
+# Tag index that replaces keyspace scans in invalidate_cache_prefix
+tag_settings = {**TAG_DEFAULTS, **getattr(settings, 'CACHE_TAGS', {})}
+tag_index = TagIndex(
+    redis_client,
+    cache.make_key,
+    depth=tag_settings['DEPTH'],
+    batch_size=tag_settings['BATCH_SIZE'],
 )
 
+# Per-prefix hit/miss/latency counters, see CACHE_STATS in settings
+stats_settings = {**STATS_DEFAULTS, **getattr(settings, 'CACHE_STATS', {})}
+cache_stats = CacheStats.from_settings(redis_client, stats_settings)
+
 def get_cache(key):
-    """Get a value from cache."""
-    return cache.get(key)
+    """Get a value from cache, trying the in-process tier first."""
+    start = time.perf_counter()
+    if near_cache.enabled:
+        value = near_cache.get(key)
+        if value is not None:
+            if cache_stats.enabled:
+                cache_stats.record_get(key, True, time.perf_counter() - start, local=True)
+            return value
+
+    value = cache.get(key)
+    if cache_stats.enabled:
+        cache_stats.record_get(key, value is not None, time.perf_counter() - start)
+
+    if near_cache.enabled and value is not None:
+        near_cache.set(key, value)
+    return value
 
 def set_cache(key, value, timeout=None):
-    """Set a value in cache."""
-    return cache.set(key, value, timeout)
+    """Set a value in cache and register it in the tag index."""
+    start = time.perf_counter()
+    try:
+        # Index before writing so a failure can only leave a dangling member
+        tag_index.add(key, timeout)
+    except Exception as e:
+        logger.error(f"Error indexing cache key {key}: {str(e)}")
+
+    result = cache.set(key, value, timeout)
+    if cache_stats.enabled:
+        cache_stats.record_set(key, _sample_size(value), time.perf_counter() - start)
+    if near_cache.enabled:
+        near_cache.invalidate_key(key)
+        near_cache.set(key, value, timeout)
+    return result
 
 def delete_cache(key):
-    """Delete a key from cache."""
-    return cache.delete(key)
+    """Delete a key from cache and from the tag index."""
+    result = cache.delete(key)
+    try:
+        tag_index.remove(key)
+    except Exception as e:
+        logger.error(f"Error unindexing cache key {key}: {str(e)}")
+    if cache_stats.enabled:
+        cache_stats.record_invalidation(key, int(bool(result)))
+    if near_cache.enabled:
+        near_cache.invalidate_key(key)
+    return result
+
+def _sample_size(value):
+    """
+    Approximate stored size of a value for a sample of writes.
+
+    The Django cache serializes internally, so measuring every write would
+    pickle each value twice.
+    """
+    if random.random() >= stats_settings['SIZE_SAMPLE_RATE']:
+        return None
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return None
 
 def get_task_cache_key(task_id):
     """Get cache key for a specific task."""
@@ -35,27 +107,54 @@ def get_tasks_list_key():
     """Get cache key for tasks list."""
     return "tasks"
 
+def _scan_delete(pattern):
+    """Delete keys matching a pattern by walking the keyspace."""
+    cursor = '0'
+    deleted_count = 0
+
+    while cursor != 0:
+        cursor, keys = redis_client.scan(cursor=cursor, match=pattern, count=100)
+        if keys:
+            redis_client.delete(*keys)
+            deleted_count += len(keys)
+
+        if cursor == '0' or cursor == 0:
+            break
+
+    return deleted_count
+
 def invalidate_cache_prefix(prefix):
     """
     Delete all cache keys with a given prefix.
+
+    Prefixes of up to CACHE_TAGS['DEPTH'] segments are resolved through the
+    tag index in O(keys-in-tag) and match whole segments only, so
+    'user-detail:1' leaves 'user-detail:10:...' alone and 'task_' matches
+    nothing under 'task_5'. Pass 'task_*' to match a partial segment.
+    Partial-segment and deeper prefixes, and every prefix while
+    CACHE_TAGS['SCAN_FALLBACK'] is enabled during migration, walk the
+    keyspace.
     """
     try:
-        pattern = f"{prefix}*"
-        logger.info(f"Invalidating cache keys with pattern: {pattern}")
-        
-        cursor = '0'
+        if near_cache.enabled:
+            near_cache.invalidate_prefix(prefix.rstrip('*'))
+
         deleted_count = 0
-        
-        while cursor != 0:
-            cursor, keys = redis_client.scan(cursor=cursor, match=pattern, count=100)
-            if keys:
-                redis_client.delete(*keys)
-                deleted_count += len(keys)
-                
-            if cursor == '0' or cursor == 0:
-                break
-                
+        indexed = tag_index.can_invalidate(prefix)
+
+        if indexed:
+            deleted_count += tag_index.invalidate(prefix)
+
+        if not indexed or tag_settings['SCAN_FALLBACK']:
+            # Cover both Django cache keys and raw keys written via redis_client
+            scan_prefix = prefix.rstrip('*')
+            for pattern in (f"{cache.make_key(scan_prefix)}*", f"{scan_prefix}*"):
+                logger.info(f"Invalidating cache keys with pattern: {pattern}")
+                deleted_count += _scan_delete(pattern)
+
         logger.info(f"Invalidated {deleted_count} cache keys with prefix {prefix}")
+        if cache_stats.enabled:
+            cache_stats.record_invalidation(prefix, deleted_count)
         return deleted_count
     except Exception as e:
         logger.error(f"Error invalidating cache prefix {prefix}: {str(e)}")
@@ -0,0 +1,222 @@
+"""
+Central registry of Redis connections shared across the project.
+
+Every Redis client in the project is backed by a process-wide connection
+pool per role ("cache", "tokens", "pubsub"), so the number of open sockets
+is bounded by the configured MAX_CONNECTIONS instead of growing with every
+module that creates its own client. Pools block for up to TIMEOUT seconds
+when saturated and record how often and how long callers had to wait.
+
+Async views get the same per-role limits from redis.asyncio pools. Those are
+bound to the event loop that created them, so one pool exists per role and
+running loop (normally a single loop per ASGI worker).
+
+Sync clients are InstrumentedRedis instances, so their calls are counted in
+the per-request profile of PerformanceMonitoringMiddleware.
+
+Role settings are read from settings.REDIS_POOLS, e.g.:
+
+    REDIS_POOLS = {
+        "cache": {"MAX_CONNECTIONS": 50},
+        "pubsub": {"SOCKET_TIMEOUT": None},
+    }
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+import weakref
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+from django_redis.pool import ConnectionFactory
+from core.instrumentation import InstrumentedRedis
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SETTINGS = {
+    'MAX_CONNECTIONS': 50,
+    'TIMEOUT': 5,  # Seconds to wait for a free connection before failing
+    'HEALTH_CHECK_INTERVAL': 30,
+    'SOCKET_KEEPALIVE': True,
+    'SOCKET_CONNECT_TIMEOUT': 5,
+    'SOCKET_TIMEOUT': 5,
+}
+
+class InstrumentedConnectionPool(redis.BlockingConnectionPool):
+    """
+    BlockingConnectionPool that records saturation and checkout wait time.
+    """
+
+    def __init__(self, *args, role='default', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.role = role
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.exhausted = 0
+
+    def get_connection(self, *args, **kwargs):
+        saturated = self.pool.empty()
+        start = time.monotonic()
+        try:
+            connection = super().get_connection(*args, **kwargs)
+        except redis.ConnectionError as e:
+            if str(e) == "No connection available.":
+                with self._stats_lock:
+                    self.exhausted += 1
+                logger.error(f"Redis pool '{self.role}' exhausted after {self.timeout}s")
+            raise
+
+        waited = time.monotonic() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            if saturated:
+                self.waits += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return connection
+
+    def reset(self):
+        super().reset()
+        # reset() also runs from the base __init__ before our lock exists
+        if hasattr(self, '_stats_lock'):
+            with self._stats_lock:
+                self._reset_stats()
+
+    def stats(self):
+        """Return usage and saturation counters for this pool."""
+        with self._stats_lock:
+            idle = sum(1 for connection in list(self.pool.queue) if connection is not None)
+            created = len(self._connections)
+            in_use = created - idle
+            return {
+                'role': self.role,
+                'max_connections': self.max_connections,
+                'created': created,
+                'in_use': in_use,
+                'saturation': in_use / self.max_connections if self.max_connections else 0.0,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_seconds': round(self.wait_seconds, 6),
+                'max_wait_seconds': round(self.max_wait_seconds, 6),
+                'exhausted': self.exhausted,
+            }
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool_settings(role):
+    """Merge the defaults with settings.REDIS_POOLS[role]."""
+    return {**DEFAULT_POOL_SETTINGS, **getattr(settings, 'REDIS_POOLS', {}).get(role, {})}
+
+def _pool_kwargs(role, decode_responses):
+    config = get_pool_settings(role)
+    return {
+        'host': settings.REDIS_HOST,
+        'port': settings.REDIS_PORT,
+        'db': settings.REDIS_DB,
+        'password': settings.REDIS_PASSWORD,
+        'decode_responses': decode_responses,
+        'max_connections': config['MAX_CONNECTIONS'],
+        'timeout': config['TIMEOUT'],
+        'health_check_interval': config['HEALTH_CHECK_INTERVAL'],
+        'socket_keepalive': config['SOCKET_KEEPALIVE'],
+        'socket_connect_timeout': config['SOCKET_CONNECT_TIMEOUT'],
+        'socket_timeout': config['SOCKET_TIMEOUT'],
+    }
+
+def get_connection_pool(role='cache', decode_responses=False):
+    """Return the shared pool for a role, creating it on first use."""
+    key = (role, decode_responses)
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = InstrumentedConnectionPool(role=role, **_pool_kwargs(role, decode_responses))
+            _pools[key] = pool
+    return pool
+
+def get_redis_client(role='cache', decode_responses=False):
+    """
+    Return a Redis client backed by the shared pool for ``role``.
+
+    Args:
+        role (str): Pool role, one of the keys of settings.REDIS_POOLS
+        decode_responses (bool): Return str instead of bytes
+
+    Returns:
+        redis.Redis: Client sharing the role's connection pool
+    """
+    return InstrumentedRedis(connection_pool=get_connection_pool(role, decode_responses))
+
+# Event loop -> {(role, decode_responses): pool}; entries vanish with their loop
+_async_pools = weakref.WeakKeyDictionary()
+
+def get_async_connection_pool(role='cache', decode_responses=False):
+    """Return the redis.asyncio pool for a role on the running event loop."""
+    loop = asyncio.get_running_loop()
+    pools = _async_pools.setdefault(loop, {})
+    key = (role, decode_responses)
+    pool = pools.get(key)
+    if pool is None:
+        pool = aioredis.BlockingConnectionPool(**_pool_kwargs(role, decode_responses))
+        pools[key] = pool
+    return pool
+
+def get_async_redis_client(role='cache', decode_responses=False):
+    """
+    Return a redis.asyncio client backed by the shared async pool for ``role``.
+
+    Must be called from a running event loop.
+    """
+    return aioredis.Redis(connection_pool=get_async_connection_pool(role, decode_responses))
+
+def _async_pool_stats(pool):
+    in_use = len(pool._in_use_connections)
+    return {
+        'max_connections': pool.max_connections,
+        'created': in_use + len(pool._available_connections),
+        'in_use': in_use,
+    }
+
+def pool_stats():
+    """Return stats for every pool created in this process."""
+    stats = {
+        f"{role}{':decoded' if decoded else ''}": pool.stats()
+        for (role, decoded), pool in list(_pools.items())
+    }
+    try:
+        loop_pools = _async_pools.get(asyncio.get_running_loop(), {})
+    except RuntimeError:
+        loop_pools = {}
+    for (role, decoded), pool in list(loop_pools.items()):
+        stats[f"async:{role}{':decoded' if decoded else ''}"] = _async_pool_stats(pool)
+    stats['pid'] = os.getpid()
+    return stats
+
+class SharedConnectionFactory(ConnectionFactory):
+    """
+    django-redis connection factory that hands out the shared "cache" pool,
+    so the Django cache and the project's own clients draw from one pool.
+
+    Enable with OPTIONS["CONNECTION_FACTORY"] in settings.CACHES. Unless
+    OPTIONS["REDIS_CLIENT_CLASS"] is set, cache calls use InstrumentedRedis.
+    """
+
+    def __init__(self, options):
+        super().__init__(options)
+        if 'REDIS_CLIENT_CLASS' not in options:
+            self.redis_client_cls = InstrumentedRedis
+
+    def get_connection_pool(self, params):
+        return get_connection_pool('cache')
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+Per-process background threads for state kept locally and sent to Redis.
+
+Threads do not survive a fork, so a pre-forking server (gunicorn) needs
+every worker to start its own. ``PerProcess`` runs a start function once in
+each process that uses it and ``start_periodic`` starts a daemon thread
+calling a function at a fixed interval. ``RedisCounters`` combines both into
+process-local counters and histograms that are added to Redis hashes in the
+background, so recording one costs a dict update under a lock.
+"""
+import os
+import logging
+import threading
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+
+class PerProcess:
+    """Call ``start`` on the first ``ensure`` in each process."""
+
+    def __init__(self, start, lock=None):
+        self._start = start
+        self._lock = lock or threading.Lock()
+        self.pid = None
+
+    def ensure(self):
+        pid = os.getpid()
+        if self.pid == pid:
+            return
+
+        with self._lock:
+            if self.pid == pid:
+                return
+            self._start()
+            self.pid = pid
+
+
+def start_periodic(func, interval, name, stop=None):
+    """Start a daemon thread calling ``func`` every ``interval`` seconds until ``stop`` is set."""
+    stop = stop or threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            func()
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+class RedisCounters:
+    """
+    Process-local deltas periodically added to Redis hashes.
+
+    Counts and histograms are both addressed by (hash key, field). Counts are
+    added with HINCRBY, or HINCRBYFLOAT for floats. Histograms are lists of
+    non-cumulative bucket counts written to ``<field><sep><index>``, so the
+    deltas of many processes simply add up.
+
+    Callers call ``ensure_flusher`` and then update ``counts`` and
+    ``histogram()`` while holding ``lock``. Deltas that fail to reach Redis
+    are merged back and sent with the next flush.
+    """
+
+    def __init__(self, redis_client, name, flush_interval, sep='|', on_start=None):
+        self.redis_client = redis_client
+        self.name = name
+        self.flush_interval = flush_interval
+        self.sep = sep
+        self.lock = threading.Lock()
+        self.thread = None
+        self._on_start = on_start
+        self._process = PerProcess(self._start, self.lock)
+        self._reset()
+
+    def ensure_flusher(self):
+        """Start the flush thread once per process."""
+        self._process.ensure()
+
+    def histogram(self, key, field, size):
+        """The bucket counts of a histogram; call with ``lock`` held."""
+        buckets = self.histograms.get((key, field))
+        if buckets is None:
+            buckets = self.histograms[(key, field)] = [0] * size
+        return buckets
+
+    def flush(self, queue=None):
+        """
+        Add the deltas recorded since the last flush to Redis, in one
+        pipeline together with any commands ``queue(pipe)`` adds.
+        """
+        with self.lock:
+            counts, histograms = self.counts, self.histograms
+            self._reset()
+        if not counts and not histograms and queue is None:
+            return
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for (key, field), value in counts.items():
+                if isinstance(value, float):
+                    pipe.hincrbyfloat(key, field, value)
+                else:
+                    pipe.hincrby(key, field, value)
+            for (key, field), buckets in histograms.items():
+                for index, count in enumerate(buckets):
+                    if count:
+                        pipe.hincrby(key, f"{field}{self.sep}{index}", count)
+            if queue is not None:
+                queue(pipe)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error flushing {self.name}: {str(e)}")
+            self._merge(counts, histograms)
+
+    def clear(self):
+        """Drop the deltas not flushed yet."""
+        with self.lock:
+            self._reset()
+
+    def _reset(self):
+        self.counts = defaultdict(int)
+        self.histograms = {}
+
+    def _merge(self, counts, histograms):
+        with self.lock:
+            for labels, value in counts.items():
+                self.counts[labels] += value
+            for (key, field), buckets in histograms.items():
+                current = self.histogram(key, field, len(buckets))
+                for index, count in enumerate(buckets):
+                    current[index] += count
+
+    def _start(self):
+        # Runs under ``lock``; deltas inherited from the parent are its to flush
+        self._reset()
+        if self._on_start is not None:
+            self._on_start()
+        self.thread = start_periodic(self.flush, self.flush_interval, f"{self.name}-flusher")
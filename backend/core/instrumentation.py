@@ -0,0 +1,136 @@
+"""
+Per-request accounting of database queries and Redis calls.
+
+``PerformanceMonitoringMiddleware`` starts a RequestProfile for every
+request. Queries are timed through ``connection.execute_wrapper``; Redis
+calls are timed by InstrumentedRedis, the client class behind
+``core.connections.get_redis_client`` and the Django cache. Both only do
+work while a profile is active, so background threads are not affected.
+"""
+import time
+import contextvars
+from collections import Counter
+import redis
+from redis.client import Pipeline
+
+# Commands whose reply tells a cache hit from a miss
+READ_COMMANDS = frozenset(('GET', 'GETEX', 'HGET'))
+MULTI_READ_COMMANDS = frozenset(('MGET', 'HMGET'))
+
+_current = contextvars.ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """Query and Redis counters for a single request."""
+
+    __slots__ = (
+        'db_queries', 'db_seconds', 'cache_calls', 'cache_seconds',
+        'cache_hits', 'cache_misses', 'statements', '_token',
+    )
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.cache_calls = 0
+        self.cache_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # SQL with placeholders -> executions, used to spot N+1 patterns
+        self.statements = Counter()
+        self._token = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.db_queries += 1
+            self.statements[sql] += 1
+
+    def activate(self):
+        self._token = _current.set(self)
+        return self
+
+    def deactivate(self):
+        if self._token is not None:
+            try:
+                _current.reset(self._token)
+            except ValueError:
+                # Under ASGI the request hooks may run in different contexts
+                _current.set(None)
+            self._token = None
+
+    def record_cache(self, seconds, hits=0, misses=0):
+        self.cache_calls += 1
+        self.cache_seconds += seconds
+        self.cache_hits += hits
+        self.cache_misses += misses
+
+    def repeated_statements(self, threshold):
+        """Statements run at least ``threshold`` times, most frequent first."""
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+def current_profile():
+    """Return the profile of the request being handled, if any."""
+    return _current.get()
+
+
+def _count_hits(command, result):
+    if command in READ_COMMANDS:
+        return (0, 1) if result is None else (1, 0)
+    if command in MULTI_READ_COMMANDS and isinstance(result, list):
+        misses = sum(1 for value in result if value is None)
+        return len(result) - misses, misses
+    return 0, 0
+
+
+class InstrumentedPipeline(Pipeline):
+    """Pipeline recorded as one Redis call per execute()."""
+
+    def execute(self, raise_on_error=True):
+        profile = _current.get()
+        if profile is None:
+            return super().execute(raise_on_error)
+
+        commands = [args[0].upper() if isinstance(args[0], str) else args[0] for args, _ in self.command_stack]
+        start = time.perf_counter()
+        try:
+            results = super().execute(raise_on_error)
+        except Exception:
+            profile.record_cache(time.perf_counter() - start)
+            raise
+
+        hits = misses = 0
+        for command, result in zip(commands, results):
+            command_hits, command_misses = _count_hits(command, result)
+            hits += command_hits
+            misses += command_misses
+        profile.record_cache(time.perf_counter() - start, hits, misses)
+        return results
+
+
+class InstrumentedRedis(redis.Redis):
+    """Redis client that reports call time and hits to the active profile."""
+
+    def execute_command(self, *args, **options):
+        profile = _current.get()
+        if profile is None:
+            return super().execute_command(*args, **options)
+
+        start = time.perf_counter()
+        try:
+            result = super().execute_command(*args, **options)
+        except Exception:
+            profile.record_cache(time.perf_counter() - start)
+            raise
+
+        command = args[0].upper() if isinstance(args[0], str) else args[0]
+        hits, misses = _count_hits(command, result)
+        profile.record_cache(time.perf_counter() - start, hits, misses)
+        return result
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
@@ -0,0 +1,39 @@
+"""
+Register existing cache keys in the tag index used by invalidate_cache_prefix.
+"""
+from django.core.management.base import BaseCommand
+from core.cache.utils import tag_index
+
+# Prefixes invalidated by accounts.signals and accounts.views
+DEFAULT_PREFIXES = ['user-detail:', 'user-profile:', 'user-list']
+
+class Command(BaseCommand):
+    help = (
+        "Index cache keys written before tag-based invalidation was enabled. "
+        "Run once with CACHE_TAGS['SCAN_FALLBACK'] enabled, then turn the fallback off."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prefix',
+            action='append',
+            dest='prefixes',
+            help='Key prefix to index (repeatable). Defaults to the user cache prefixes.',
+        )
+        parser.add_argument(
+            '--scan-count',
+            type=int,
+            default=1000,
+            help='COUNT hint passed to SCAN',
+        )
+
+    def handle(self, *args, **options):
+        prefixes = options['prefixes'] or DEFAULT_PREFIXES
+        total = 0
+
+        for prefix in prefixes:
+            indexed = tag_index.backfill(prefix, scan_count=options['scan_count'])
+            total += indexed
+            self.stdout.write(f"Indexed {indexed} keys for prefix '{prefix}'")
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} keys in total"))
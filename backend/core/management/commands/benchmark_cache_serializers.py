@@ -0,0 +1,86 @@
+"""
+Benchmark cache serializers and compressors on typical Task list payloads.
+"""
+import json
+import timeit
+from django.core.management.base import BaseCommand
+from core.cache.serializers import AVAILABLE, CacheSerializer
+
+def build_task_payload(rows):
+    """A list shaped like Task.objects.all().values()"""
+    return [
+        {
+            'id': i,
+            'title': f"Task {i}: prepare the weekly report",
+            'description': (
+                f"Collect the numbers for week {i % 52}, update the dashboard "
+                "and share the summary with the team before the Friday meeting."
+            ),
+            'completed': i % 3 == 0,
+        }
+        for i in range(1, rows + 1)
+    ]
+
+def legacy_encode(obj):
+    return json.dumps(obj).encode('utf-8')
+
+def legacy_decode(data):
+    # Mirrors the previous HierarchicalRedisCache.decode fallbacks
+    try:
+        return int(data)
+    except (ValueError, TypeError):
+        try:
+            return float(data)
+        except (ValueError, TypeError):
+            return json.loads(data.decode('utf-8'))
+
+class Command(BaseCommand):
+    help = "Measure encode/decode cost and stored size for each cache serializer"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[20, 200, 2000],
+            help='Task list sizes to benchmark',
+        )
+        parser.add_argument(
+            '--number',
+            type=int,
+            default=200,
+            help='Iterations per measurement',
+        )
+
+    def handle(self, *args, **options):
+        candidates = [('legacy json', legacy_encode, legacy_decode)]
+        for serializer in ('json', 'orjson', 'msgpack'):
+            if not AVAILABLE[serializer]:
+                continue
+            for compressor in (None, 'zlib', 'lz4'):
+                if compressor and not AVAILABLE[compressor]:
+                    continue
+                codec = CacheSerializer(serializer, compressor)
+                label = f"{serializer}+{compressor}" if compressor else serializer
+                candidates.append((label, codec.dumps, codec.loads))
+
+        self.stdout.write(
+            f"{'serializer':<16}{'rows':>7}{'bytes':>10}{'encode us':>12}{'decode us':>12}"
+        )
+
+        for rows in options['rows']:
+            payload = build_task_payload(rows)
+            # Scale iterations down for large payloads to keep runs short
+            number = max(1, options['number'] * 20 // max(rows, 20))
+
+            for label, dumps, loads in candidates:
+                encoded = dumps(payload)
+                assert loads(encoded) == payload
+
+                encode_time = min(timeit.repeat(lambda: dumps(payload), number=number, repeat=3))
+                decode_time = min(timeit.repeat(lambda: loads(encoded), number=number, repeat=3))
+
+                self.stdout.write(
+                    f"{label:<16}{rows:>7}{len(encoded):>10}"
+                    f"{encode_time / number * 1e6:>12.1f}{decode_time / number * 1e6:>12.1f}"
+                )
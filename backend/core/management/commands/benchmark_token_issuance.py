@@ -0,0 +1,55 @@
+"""
+Benchmark JWT issuance: the pipelined token service against the previous
+per-request store with one Redis round trip per issued token.
+"""
+import time
+import statistics
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from accounts.tokens import issue_tokens
+from core.authentication import RedisTokenStore
+
+def legacy_issue(user):
+    """Mirrors the previous LoginView: new store, one round trip per token"""
+    refresh = RefreshToken.for_user(user)
+    access = refresh.access_token
+    store = RedisTokenStore()
+    store.add_token(user.id, refresh['jti'], str(refresh), datetime_from_epoch(refresh['exp']))
+    store.track_token(user.id, access['jti'], datetime_from_epoch(access['exp']))
+    return str(refresh), str(access)
+
+class Command(BaseCommand):
+    help = "Measure token issuance latency (p50/p95) for the legacy and pipelined paths"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--number',
+            type=int,
+            default=500,
+            help='Issuances per path',
+        )
+        parser.add_argument(
+            '--username',
+            default='benchmark-user',
+            help='User the tokens are issued for (created if missing)',
+        )
+
+    def handle(self, *args, **options):
+        user, _ = get_user_model().objects.get_or_create(
+            username=options['username'],
+            defaults={'email': f"{options['username']}@example.com"},
+        )
+
+        self.stdout.write(f"{'path':<12}{'p50 ms':>10}{'p95 ms':>10}")
+        for label, issue in (('legacy', legacy_issue), ('pipelined', issue_tokens)):
+            timings = []
+            for _ in range(options['number']):
+                start = time.perf_counter()
+                issue(user)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+            self.stdout.write(f"{label:<12}{statistics.median(timings):>10.3f}{p95:>10.3f}")
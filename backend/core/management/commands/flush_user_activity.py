@@ -0,0 +1,31 @@
+"""
+Flush buffered user activity timestamps from Redis to the database.
+"""
+import time
+from django.core.management.base import BaseCommand
+from accounts.activity import flush_activity
+
+class Command(BaseCommand):
+    help = "Write buffered last_activity timestamps to accounts_user with bulk_update"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Keep running and flush every INTERVAL seconds (0 flushes once)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Users per bulk_update (defaults to USER_ACTIVITY FLUSH_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            updated = flush_activity(options['batch_size'])
+            self.stdout.write(f"Flushed activity for {updated} users")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+"""
+Copy live database sessions into the Redis session store.
+"""
+from django.core.management.base import BaseCommand
+from core.sessions import copy_db_sessions
+
+class Command(BaseCommand):
+    help = (
+        "Copy unexpired django_session rows into Redis so that switching "
+        "SESSION_ENGINE to core.sessions does not log anyone out."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Sessions read from the database per query',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the database rows after copying them',
+        )
+
+    def handle(self, *args, **options):
+        copied = copy_db_sessions(options['batch_size'], delete=not options['keep'])
+        self.stdout.write(self.style.SUCCESS(f"Copied {copied} sessions to Redis"))
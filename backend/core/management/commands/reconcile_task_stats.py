@@ -0,0 +1,28 @@
+"""
+Run the reconciliation of the Redis task counters with the database.
+"""
+import time
+from django.core.management.base import BaseCommand
+from task_manager.stats import reconcile
+
+class Command(BaseCommand):
+    help = "Recompute the task counters served by frequently-accessed-data and fix any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Keep running and reconcile every INTERVAL seconds (0 runs once)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = reconcile()
+            if result is None or result.corrections is None:
+                self.stdout.write(self.style.WARNING("Counters not reconciled, will retry"))
+            else:
+                self.stdout.write(f"Reconciled task counters, {len(result.corrections)} corrected")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,93 @@
+"""
+List and export request profiles captured by core.profiling.
+"""
+import io
+import sys
+import pstats
+import marshal
+import tempfile
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from core.profiling import collapsed_stacks, request_profiler
+
+class Command(BaseCommand):
+    help = (
+        "List the slowest stored request profiles, or dump one in pstats or "
+        "flamegraph-collapsed format."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'profile_id',
+            nargs='?',
+            help='Profile to dump; lists the slowest profiles when omitted',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Profiles to list, or functions to print in text format',
+        )
+        parser.add_argument(
+            '--format',
+            choices=['text', 'pstats', 'collapsed'],
+            default='text',
+            help='text: sorted report, pstats: binary file for pstats/snakeviz, collapsed: flamegraph.pl input',
+        )
+        parser.add_argument(
+            '--sort',
+            default='cumulative',
+            help='pstats sort key for the text format',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write to this file instead of stdout (required for --format pstats)',
+        )
+
+    def handle(self, *args, **options):
+        if not options['profile_id']:
+            return self.list_profiles(options['limit'])
+
+        stats = request_profiler.store.load(options['profile_id'])
+        if stats is None:
+            raise CommandError(f"Profile {options['profile_id']} does not exist or has expired")
+
+        if options['format'] == 'pstats':
+            if not options['output']:
+                raise CommandError("--output is required for --format pstats")
+            self.to_pstats(stats).dump_stats(options['output'])
+        elif options['format'] == 'collapsed':
+            self.write('\n'.join(collapsed_stacks(stats)) + '\n', options['output'])
+        else:
+            buffer = io.StringIO()
+            report = self.to_pstats(stats)
+            report.stream = buffer
+            report.sort_stats(options['sort']).print_stats(options['limit'])
+            self.write(buffer.getvalue(), options['output'])
+
+    def list_profiles(self, limit):
+        profiles = request_profiler.store.worst(limit)
+        if not profiles:
+            self.stdout.write("No stored profiles")
+            return
+
+        for meta in profiles:
+            created = datetime.fromtimestamp(meta['created_at']).isoformat(timespec='seconds')
+            self.stdout.write(
+                f"{meta['id']}  {meta['duration'] * 1000:9.1f} ms  {meta['status']}  "
+                f"{meta['method']} {meta['path']}  {created}{'  (forced)' if meta.get('forced') else ''}"
+            )
+
+    def to_pstats(self, stats):
+        # pstats only loads marshal files, so round-trip through one
+        with tempfile.NamedTemporaryFile(suffix='.prof') as handle:
+            handle.write(marshal.dumps(stats))
+            handle.flush()
+            return pstats.Stats(handle.name, stream=sys.stdout)
+
+    def write(self, content, output):
+        if output:
+            with open(output, 'w') as handle:
+                handle.write(content)
+        else:
+            self.stdout.write(content, ending='')
@@ -0,0 +1,180 @@
+"""
+Request metrics aggregated across worker processes.
+
+``PerformanceMonitoringMiddleware`` records every request into a
+process-local registry: a latency histogram and a request counter per
+route (the resolved URL name) and an in-flight gauge. Recording is a few
+dict updates under a lock. RedisCounters (core.flushing) periodically
+adds the accumulated deltas of each process to Redis hashes in one
+pipeline, and the ``/api/metrics/`` view renders the totals of all
+workers in the Prometheus text exposition format.
+"""
+import time
+import uuid
+import bisect
+import logging
+from collections import defaultdict
+from django.conf import settings
+from core.connections import get_redis_client
+from core.flushing import RedisCounters
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'KEY_PREFIX': 'metrics:http',
+    'FLUSH_INTERVAL': 5,  # Seconds between flushes of local deltas to Redis
+    'BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    'TOKEN': None,  # Bearer token required by the metrics view, if set
+}
+
+metrics_settings = {**DEFAULT_SETTINGS, **getattr(settings, 'METRICS', {})}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Field separator in the Redis hashes; never part of a URL name or method
+SEP = '|'
+
+
+class RequestMetrics:
+    """
+    Process-local request metrics periodically merged into Redis.
+
+    Histograms are kept as non-cumulative bucket counts (the last bucket is
+    +Inf) so that deltas from many processes can simply be added together.
+    """
+
+    def __init__(self, redis_client, key_prefix='metrics:http', buckets=DEFAULT_SETTINGS['BUCKETS'],
+                 flush_interval=5, enabled=True):
+        self.redis_client = redis_client
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+        self.flush_interval = flush_interval
+        self.histogram_key = f"{key_prefix}:duration"
+        self.requests_key = f"{key_prefix}:requests"
+        self.in_flight_key = f"{key_prefix}:in_flight"
+        self._origin = uuid.uuid4().hex
+        self._in_flight = 0
+        self._deltas = RedisCounters(
+            redis_client, 'request-metrics', flush_interval, sep=SEP, on_start=self._process_started,
+        )
+
+    @classmethod
+    def from_settings(cls, redis_client, options=None):
+        """Build the registry from a ``METRICS``-style settings dict."""
+        config = {**DEFAULT_SETTINGS, **(options or {})}
+        return cls(
+            redis_client,
+            key_prefix=config['KEY_PREFIX'],
+            buckets=config['BUCKETS'],
+            flush_interval=config['FLUSH_INTERVAL'],
+            enabled=config['ENABLED'],
+        )
+
+    def request_started(self):
+        deltas = self._deltas
+        deltas.ensure_flusher()
+        with deltas.lock:
+            self._in_flight += 1
+
+    def request_finished(self, route, method, status, duration):
+        """Record one finished request; ``duration`` is in seconds."""
+        index = bisect.bisect_left(self.buckets, duration)
+        deltas = self._deltas
+        with deltas.lock:
+            self._in_flight -= 1
+            deltas.histogram(self.histogram_key, f"{route}{SEP}{method}", len(self.buckets) + 1)[index] += 1
+            deltas.counts[(self.histogram_key, f"{route}{SEP}{method}{SEP}sum")] += duration
+            deltas.counts[(self.requests_key, f"{route}{SEP}{method}{SEP}{status}")] += 1
+
+    def flush(self):
+        """Add the deltas recorded since the last flush to Redis."""
+        # The gauge is reported as is, so it is never merged back
+        in_flight = self._in_flight
+        self._deltas.flush(
+            lambda pipe: pipe.hset(self.in_flight_key, self._origin, f"{in_flight}{SEP}{time.time()}")
+        )
+
+    def render(self):
+        """Return the aggregated metrics in the Prometheus text format."""
+        self.flush()
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hgetall(self.histogram_key)
+        pipe.hgetall(self.requests_key)
+        pipe.hgetall(self.in_flight_key)
+        histogram, requests, in_flight = pipe.execute()
+
+        lines = [
+            '# HELP http_request_duration_seconds Request latency by route.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        series = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+        sums = {}
+        for field, value in histogram.items():
+            route, method, index = _decode(field).rsplit(SEP, 2)
+            if index == 'sum':
+                sums[(route, method)] = float(value)
+            elif int(index) <= len(self.buckets):
+                series[(route, method)][int(index)] += int(value)
+
+        for (route, method), counts in sorted(series.items()):
+            labels = f'route="{_escape(route)}",method="{method}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {sums.get((route, method), 0.0)}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {cumulative}')
+
+        lines += [
+            '# HELP http_requests_total Requests by route, method and status.',
+            '# TYPE http_requests_total counter',
+        ]
+        for field, value in sorted((_decode(f), v) for f, v in requests.items()):
+            route, method, status = field.rsplit(SEP, 2)
+            lines.append(
+                f'http_requests_total{{route="{_escape(route)}",method="{method}",status="{status}"}} {int(value)}'
+            )
+
+        # Gauges reported by workers that stopped flushing are left out
+        cutoff = time.time() - 3 * self.flush_interval
+        total_in_flight = 0
+        stale = []
+        for origin, value in in_flight.items():
+            count, reported_at = _decode(value).split(SEP)
+            if float(reported_at) >= cutoff:
+                total_in_flight += int(count)
+            else:
+                stale.append(origin)
+        if stale:
+            self.redis_client.hdel(self.in_flight_key, *stale)
+        lines += [
+            '# HELP http_requests_in_flight Requests currently being processed.',
+            '# TYPE http_requests_in_flight gauge',
+            f'http_requests_in_flight {total_in_flight}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Drop all local and aggregated metrics."""
+        self._deltas.clear()
+        self.redis_client.delete(self.histogram_key, self.requests_key, self.in_flight_key)
+
+    def _process_started(self):
+        # A forked worker starts with no requests of its own in flight
+        self._in_flight = 0
+        self._origin = uuid.uuid4().hex
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+request_metrics = RequestMetrics.from_settings(
+    get_redis_client('cache', decode_responses=True),
+    getattr(settings, 'METRICS', None),
+)
@@ -1,11 +1,25 @@
 """
 Middleware for monitoring and optimizing application performance.
 """
+import json
 import time
 import logging
 from django.db import connection
 from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
+from core.instrumentation import RequestProfile
+from core.metrics import request_metrics
+from core.profiling import request_profiler
+
+# Other methods are reported as OTHER to bound the number of series
+KNOWN_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+DEFAULT_SETTINGS = {
+    'SLOW_REQUEST_SECONDS': 1.0,
+    'N_PLUS_ONE_THRESHOLD': 5,  # Executions of one statement flagged as N+1
+}
+
+performance_settings = {**DEFAULT_SETTINGS, **getattr(settings, 'PERFORMANCE_MONITORING', {})}
 
 logger = logging.getLogger(__name__)
 
@@ -13,8 +27,13 @@ class PerformanceMonitoringMiddleware(MiddlewareMixin):
     """
     Middleware that logs request performance metrics.
     
-    This middleware tracks request processing time and database query counts,
-    helping to identify slow endpoints or excessive database operations.
+    This middleware tracks request processing time, database queries and
+    Redis calls (see core.instrumentation), helping to identify slow
+    endpoints or excessive database operations. The breakdown is sent in a
+    Server-Timing header, and slow requests or repeated statements (N+1)
+    are logged as JSON. Latency, status and in-flight counts are also
+    recorded per route in core.metrics and exposed at /api/metrics/. With
+    PROFILING enabled, sampled requests run under cProfile (core.profiling).
     """
     
     def __init__(self, get_response=None):
@@ -23,38 +42,96 @@ class PerformanceMonitoringMiddleware(MiddlewareMixin):
         
     def process_request(self, request):
         """
-        Mark the start time of request processing.
+        Mark the start time of request processing and start counting
+        queries and cache calls.
         """
         request.start_time = time.time()
+        request.perf_start = time.perf_counter()
+        if request_metrics.enabled:
+            request_metrics.request_started()
+
+        profile = RequestProfile().activate()
+        request.performance_profile = profile
+        # Entered here and exited in process_response, which run on the same thread
+        request.db_instrumentation = connection.execute_wrapper(profile)
+        request.db_instrumentation.__enter__()
+
+        # Started last so that the profile covers little of this middleware
+        request.profiling = request_profiler.start(request)
         
     def process_response(self, request, response):
         """
         Log performance metrics for the request.
         """
-        # Skip performance tracking for certain paths
-        if hasattr(request, 'start_time'):
-            duration = time.time() - request.start_time
-            
-            # Get query count if DEBUG is True
-            query_count = len(connection.queries) if settings.DEBUG else 0
-            
-            # Add server timing header
-            response['Server-Timing'] = f'total;dur={duration * 1000:.2f}'
-            
-            # Log slow requests (more than 1 second)
-            if duration > 1.0:
-                logger.warning(
-                    f"Slow request: {request.method} {request.path} took "
-                    f"{duration:.4f}s with {query_count} queries"
-                )
-            else:
-                logger.debug(
-                    f"Request: {request.method} {request.path} took "
-                    f"{duration:.4f}s with {query_count} queries"
-                )
+        # Skip performance tracking for requests that never reached process_request
+        if not hasattr(request, 'perf_start'):
+            return response
+
+        duration = time.perf_counter() - request.perf_start
+        slow = duration > performance_settings['SLOW_REQUEST_SECONDS']
+        if request.profiling:
+            profiler, forced = request.profiling
+            profile_id = request_profiler.finish(profiler, forced, {
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration': duration,
+            }, slow)
+            if profile_id:
+                response['X-Profile-Id'] = profile_id
+
+        profile = request.performance_profile
+        request.db_instrumentation.__exit__(None, None, None)
+        profile.deactivate()
+
+        if request_metrics.enabled:
+            self.record_metrics(request, response, duration)
+
+        app_seconds = max(duration - profile.db_seconds - profile.cache_seconds, 0.0)
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={profile.db_seconds * 1000:.2f};desc="{profile.db_queries} queries"',
+            f'cache;dur={profile.cache_seconds * 1000:.2f};desc="{profile.cache_calls} calls, '
+            f'{profile.cache_hits} hits, {profile.cache_misses} misses"',
+            f'app;dur={app_seconds * 1000:.2f}',
+            f'total;dur={duration * 1000:.2f}',
+        ))
+
+        repeated = profile.repeated_statements(performance_settings['N_PLUS_ONE_THRESHOLD'])
+        if slow or repeated:
+            logger.warning("Slow request: " + json.dumps(
+                self.describe(request, response, duration, profile, repeated)
+            ))
+        else:
+            logger.debug(
+                f"Request: {request.method} {request.path} took "
+                f"{duration:.4f}s with {profile.db_queries} queries"
+            )
                 
         return response
 
+    def describe(self, request, response, duration, profile, repeated):
+        """Structured record for the slow-request log."""
+        return {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'db_queries': profile.db_queries,
+            'db_ms': round(profile.db_seconds * 1000, 2),
+            'cache_calls': profile.cache_calls,
+            'cache_hits': profile.cache_hits,
+            'cache_misses': profile.cache_misses,
+            'cache_ms': round(profile.cache_seconds * 1000, 2),
+            'n_plus_one': [{'sql': sql[:500], 'count': count} for sql, count in repeated[:5]],
+        }
+
+    def record_metrics(self, request, response, duration):
+        """Record the request under its resolved URL name."""
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match and match.view_name else 'unmatched'
+        method = request.method if request.method in KNOWN_METHODS else 'OTHER'
+        request_metrics.request_finished(route, method, response.status_code, duration)
+
 class CacheBustingMiddleware(MiddlewareMixin):
     """
     Middleware that allows for cache busting of static assets.
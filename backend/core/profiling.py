@@ -0,0 +1,220 @@
+"""
+Opt-in cProfile capture for a sample of requests.
+
+PerformanceMonitoringMiddleware profiles a request when it is picked by
+``RATE`` (a fraction of all requests) or when it carries an allowlisted
+token in the ``X-Profile-Token`` header. Sampled profiles are kept only if
+the request turned out slow; token-requested ones are always kept.
+
+Profiles are stored in Redis as zlib-compressed marshal dumps of the
+pstats data with a TTL, and indexed by request duration so that
+``manage.py request_profiles`` can list the worst ones and dump them in
+pstats or flamegraph-collapsed format.
+"""
+import hmac
+import json
+import time
+import uuid
+import zlib
+import random
+import marshal
+import logging
+import cProfile
+from django.conf import settings
+from core.connections import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': False,
+    'RATE': 0.01,  # Fraction of requests profiled
+    'TOKENS': (),  # X-Profile-Token values that force a profile
+    'TTL': 24 * 60 * 60,
+    'MAX_PROFILES': 200,  # Profiles kept in the index, the slowest win
+    'KEY_PREFIX': 'profiles',
+}
+
+HEADER = 'X-Profile-Token'
+
+
+class ProfileStore:
+    """Compressed profiles in Redis, indexed by request duration."""
+
+    def __init__(self, redis_client, key_prefix='profiles', ttl=86400, max_profiles=200):
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+        self.max_profiles = max_profiles
+        self.index_key = f"{key_prefix}:index"
+        self.meta_key = f"{key_prefix}:meta"
+
+    def data_key(self, profile_id):
+        return f"{self.key_prefix}:data:{profile_id}"
+
+    def save(self, profiler, meta):
+        """Store a finished cProfile.Profile and return its id."""
+        profiler.create_stats()
+        payload = zlib.compress(marshal.dumps(profiler.stats))
+        profile_id = uuid.uuid4().hex
+        meta = {**meta, 'id': profile_id, 'created_at': time.time(), 'bytes': len(payload)}
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.set(self.data_key(profile_id), payload, ex=self.ttl)
+        pipe.zadd(self.index_key, {profile_id: meta['duration']})
+        pipe.hset(self.meta_key, profile_id, json.dumps(meta))
+        pipe.execute()
+        self._trim()
+        return profile_id
+
+    def worst(self, limit=20):
+        """Metadata of the slowest stored profiles, slowest first."""
+        ids = [_decode(member) for member in self.redis_client.zrevrange(self.index_key, 0, limit - 1)]
+        if not ids:
+            return []
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for profile_id in ids:
+            pipe.exists(self.data_key(profile_id))
+        alive = pipe.execute()
+        metas = self.redis_client.hmget(self.meta_key, ids)
+
+        expired = [profile_id for profile_id, exists in zip(ids, alive) if not exists]
+        if expired:
+            self._forget(expired)
+        return [json.loads(meta) for meta, exists in zip(metas, alive) if exists and meta]
+
+    def load(self, profile_id):
+        """Return the pstats dict of a profile, or None if it expired."""
+        payload = self.redis_client.get(self.data_key(profile_id))
+        if payload is None:
+            return None
+        return marshal.loads(zlib.decompress(payload))
+
+    def _trim(self):
+        overflow = self.redis_client.zcard(self.index_key) - self.max_profiles
+        if overflow > 0:
+            ids = [_decode(member) for member in self.redis_client.zrange(self.index_key, 0, overflow - 1)]
+            self._forget(ids)
+
+    def _forget(self, ids):
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.zrem(self.index_key, *ids)
+        pipe.hdel(self.meta_key, *ids)
+        pipe.delete(*[self.data_key(profile_id) for profile_id in ids])
+        pipe.execute()
+
+
+class RequestProfiler:
+    """Decides which requests to profile and stores the results."""
+
+    def __init__(self, store, enabled=False, rate=0.01, tokens=()):
+        self.store = store
+        self.enabled = enabled
+        self.rate = rate
+        self.tokens = [token.encode() for token in tokens if token]
+
+    @classmethod
+    def from_settings(cls, redis_client, options=None):
+        """Build a profiler from a ``PERFORMANCE_MONITORING['PROFILING']``-style dict."""
+        config = {**DEFAULT_SETTINGS, **(options or {})}
+        store = ProfileStore(
+            redis_client,
+            key_prefix=config['KEY_PREFIX'],
+            ttl=config['TTL'],
+            max_profiles=config['MAX_PROFILES'],
+        )
+        return cls(store, enabled=config['ENABLED'], rate=config['RATE'], tokens=config['TOKENS'])
+
+    def start(self, request):
+        """
+        Start profiling ``request`` if it is selected.
+
+        Returns:
+            tuple: (profiler, forced) or None when the request is not profiled
+        """
+        if not self.enabled:
+            return None
+
+        forced = self._has_token(request)
+        if not forced and random.random() >= self.rate:
+            return None
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (or another profiled request) is already active
+            return None
+        return profiler, forced
+
+    def finish(self, profiler, forced, meta, slow):
+        """Stop profiling and keep the profile if it was forced or slow."""
+        profiler.disable()
+        if not (forced or slow):
+            return None
+        try:
+            return self.store.save(profiler, {**meta, 'forced': forced})
+        except Exception as e:
+            logger.error(f"Error storing request profile: {str(e)}")
+            return None
+
+    def _has_token(self, request):
+        token = request.headers.get(HEADER)
+        if not token or not self.tokens:
+            return False
+        token = token.encode()
+        return any(hmac.compare_digest(token, allowed) for allowed in self.tokens)
+
+
+def collapsed_stacks(stats, max_depth=64, min_seconds=1e-5):
+    """
+    Convert pstats data to flamegraph-collapsed lines (``a;b;c weight``).
+
+    cProfile only records caller/callee pairs, so stacks are rebuilt by
+    walking the call graph from the entry points and splitting each
+    function's time across its callers by their share of its cumulative
+    time. Branches below ``min_seconds`` are dropped to bound the output.
+    Weights are in microseconds.
+    """
+    callees = {}
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        for caller, caller_stats in callers.items():
+            callees.setdefault(caller, []).append((func, caller_stats[3]))
+
+    lines = {}
+
+    def label(func):
+        filename, line, name = func
+        return f"{name} ({filename}:{line})".replace(';', ',').replace(' ', '_')
+
+    def walk(func, path, cumulative):
+        if cumulative < min_seconds:
+            return
+        total = stats[func][3]
+        share = cumulative / total if total else 0.0
+        stack = path + (label(func),)
+        self_time = stats[func][2] * share
+        if self_time > 0:
+            key = ';'.join(stack)
+            lines[key] = lines.get(key, 0) + self_time
+        if len(stack) >= max_depth:
+            return
+        for callee, edge_cumulative in callees.get(func, ()):
+            if label(callee) not in stack:
+                walk(callee, stack, edge_cumulative * share)
+
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        if not callers:
+            walk(func, (), ct)
+
+    return [f"{stack} {int(weight * 1e6)}" for stack, weight in sorted(lines.items()) if int(weight * 1e6)]
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+request_profiler = RequestProfiler.from_settings(
+    get_redis_client('cache'),
+    getattr(settings, 'PERFORMANCE_MONITORING', {}).get('PROFILING'),
+)
@@ -0,0 +1,205 @@
+"""
+Session engine that keeps sessions in the ``default`` Redis cache.
+
+Select it with ``SESSION_ENGINE = "core.sessions"``. Compared to the
+database backend it:
+
+* reads sessions from an optional in-process tier, then Redis, and only
+  falls back to ``django_session`` for sessions written before the switch
+  (or while Redis is unavailable); a session found there is moved to Redis;
+* skips the write entirely when a "modified" session still encodes to the
+  data it was loaded with, refreshing only the TTL when
+  ``SESSION_SAVE_EVERY_REQUEST`` is on;
+* updates an existing session with a single ``SET XX`` instead of a GET
+  followed by a SET.
+
+``manage.py migrate_sessions_to_redis`` copies all live database sessions
+ahead of the switch so that nobody is logged out.
+"""
+import logging
+from django.conf import settings
+from django.contrib.sessions.backends.base import CreateError, UpdateError
+from django.contrib.sessions.backends.cache import SessionStore as CacheSessionStore
+from django.contrib.sessions.backends.db import SessionStore as DBSessionStore
+from django.utils import timezone
+from core.connections import get_redis_client
+from core.cache.local import NearCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'DB_FALLBACK': True,  # Read sessions missing from Redis from django_session
+    'LOCAL_CACHE': {
+        'ENABLED': False,
+        'MAX_ENTRIES': 4096,
+        'MAX_BYTES': 4 * 1024 * 1024,
+        'TIMEOUT': 2,
+        'CHANNEL': 'sessions:invalidations',
+    },
+}
+
+session_settings = {**DEFAULT_SETTINGS, **getattr(settings, 'REDIS_SESSIONS', {})}
+
+# Optional in-process tier; entries are evicted on every worker when a
+# session is saved or deleted, so a logout is seen everywhere at once
+near_cache = NearCache.from_settings(
+    get_redis_client('cache', decode_responses=True),
+    {**DEFAULT_SETTINGS['LOCAL_CACHE'], **session_settings['LOCAL_CACHE']},
+    pubsub_client=get_redis_client('pubsub', decode_responses=True),
+)
+
+
+class SessionStore(CacheSessionStore):
+    """
+    Redis session store with a local tier and a read fallback to the database.
+    """
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._loaded_payload = None
+
+    def load(self):
+        key = self.cache_key
+        if near_cache.enabled:
+            session_data = near_cache.get(key)
+            if session_data is not None:
+                self._remember(session_data)
+                return session_data
+
+        try:
+            session_data = self._cache.get(key)
+        except Exception as e:
+            logger.error(f"Error loading session from Redis: {str(e)}")
+            session_data = None
+
+        if session_data is None and session_settings['DB_FALLBACK']:
+            session_data = self._load_from_db()
+
+        if session_data is None:
+            self._session_key = None
+            return {}
+
+        if near_cache.enabled:
+            near_cache.set(key, session_data, self.get_expiry_age(expiry=session_data.get('_session_expiry')))
+        self._remember(session_data)
+        return session_data
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+
+        data = self._get_session(no_load=must_create)
+        if not must_create and self._loaded_payload is not None and self._serialize(data) == self._loaded_payload:
+            # Marked modified but unchanged, e.g. the same value assigned again
+            if settings.SESSION_SAVE_EVERY_REQUEST:
+                try:
+                    self._cache.touch(self.cache_key, self.get_expiry_age())
+                except Exception as e:
+                    logger.error(f"Error refreshing session expiry: {str(e)}")
+            return
+
+        key = self.cache_key
+        timeout = self.get_expiry_age()
+        try:
+            if must_create:
+                result = self._cache.add(key, data, timeout)
+            else:
+                result = self._cache.set(key, data, timeout, xx=True)
+        except Exception as e:
+            if not session_settings['DB_FALLBACK']:
+                raise
+            logger.error(f"Error saving session to Redis, writing to database: {str(e)}")
+            self._db_store().save(must_create=must_create)
+            result = True
+
+        if not result:
+            raise CreateError if must_create else UpdateError
+
+        if near_cache.enabled:
+            near_cache.invalidate_key(key)
+        self._remember(data)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+
+        super().delete(session_key)
+        if near_cache.enabled:
+            near_cache.invalidate_key(self.cache_key_prefix + session_key)
+        if session_settings['DB_FALLBACK']:
+            # Otherwise a logged-out session could be read back from the database
+            DBSessionStore().delete(session_key)
+
+    @classmethod
+    def clear_expired(cls):
+        # Redis expires sessions itself; only database leftovers need clearing
+        if session_settings['DB_FALLBACK']:
+            DBSessionStore.clear_expired()
+
+    def _load_from_db(self):
+        """Move a session written by the database backend into Redis."""
+        store = self._db_store()
+        try:
+            session_data = store.load()
+        except Exception as e:
+            logger.error(f"Error loading session from database: {str(e)}")
+            return None
+
+        if store.session_key is None:
+            return None
+
+        try:
+            self._cache.add(self.cache_key, session_data, store.get_expiry_age(expiry=session_data.get('_session_expiry')))
+            store.delete()
+        except Exception as e:
+            # Keep serving from the database until Redis is back
+            logger.error(f"Error moving session to Redis: {str(e)}")
+        return session_data
+
+    def _db_store(self):
+        store = DBSessionStore(self.session_key)
+        store._session_cache = getattr(self, '_session_cache', {})
+        return store
+
+    def _serialize(self, data):
+        return self.serializer().dumps(data)
+
+    def _remember(self, data):
+        try:
+            self._loaded_payload = self._serialize(data)
+        except Exception:
+            self._loaded_payload = None
+
+
+def copy_db_sessions(batch_size=500, delete=True):
+    """
+    Copy every unexpired ``django_session`` row into Redis.
+
+    Sessions already present in Redis are left untouched. Returns the number
+    of sessions copied.
+    """
+    from django.contrib.sessions.models import Session
+
+    store = SessionStore()
+    copied = 0
+    last_pk = ''
+    while True:
+        batch = list(
+            Session.objects.filter(pk__gt=last_pk, expire_date__gt=timezone.now()).order_by('pk')[:batch_size]
+        )
+        if not batch:
+            return copied
+
+        for session in batch:
+            timeout = int((session.expire_date - timezone.now()).total_seconds())
+            if timeout <= 0:
+                continue
+            data = store.decode(session.session_data)
+            if store._cache.add(store.cache_key_prefix + session.session_key, data, timeout):
+                copied += 1
+
+        if delete:
+            Session.objects.filter(pk__in=[session.pk for session in batch]).delete()
+        last_pk = batch[-1].pk
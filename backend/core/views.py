@@ -1,9 +1,15 @@
 # filepath: d:\VueProjects\redis-caching-crud-tasks\backend\core\views.py
-from django.http import JsonResponse
+import hmac
+from django.http import HttpResponse, JsonResponse
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from django.conf import settings
-import redis
+from core.cache.utils import cache_stats, near_cache
+from core.cache.stampede import metrics as stampede_metrics
+from core.async_api import async_api_view
+from core.authentication import local_blacklist
+from core.connections import get_redis_client, get_async_redis_client, pool_stats
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, metrics_settings, request_metrics
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -22,13 +28,7 @@ def api_status(request):
     # Check Redis connection
     redis_status = "Not configured"
     try:
-        r = redis.Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            db=settings.REDIS_DB,
-            password=settings.REDIS_PASSWORD,
-            socket_connect_timeout=1,
-        )
+        r = get_redis_client('cache')
         if r.ping():
             redis_status = "Connected"
         else:
@@ -39,8 +39,75 @@ def api_status(request):
     return JsonResponse({
         'status': 'ok',
         'redis': redis_status,
+        'local_cache': near_cache.stats(),
+        'cache_stampede': stampede_metrics.snapshot(),
+        'redis_pools': pool_stats(),
+        'jwt_blacklist': local_blacklist.stats(),
         'debug': settings.DEBUG,
         'allowed_hosts': settings.ALLOWED_HOSTS,
     })
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_statistics(request):
+    """Per-prefix cache hit ratios, write sizes and latency percentiles of all workers."""
+    try:
+        prefixes = cache_stats.snapshot()
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=503)
+
+    return JsonResponse({
+        'status': 'ok',
+        'enabled': cache_stats.enabled,
+        'prefixes': prefixes,
+        'local_cache': near_cache.stats(),
+    })
+
+@async_api_view(['GET'], allow_any=True)
+async def async_health_check(request):
+    """Health check served without a worker thread under ASGI."""
+    return JsonResponse({
+        'status': 'healthy',
+        'message': 'Service is running correctly'
+    })
+
+@async_api_view(['GET'], allow_any=True)
+async def async_api_status(request):
+    """Async version of api_status using the redis.asyncio pool."""
+    try:
+        if await get_async_redis_client('cache').ping():
+            redis_status = "Connected"
+        else:
+            redis_status = "Connection failed"
+    except Exception as e:
+        redis_status = f"Error: {str(e)}"
     
+    return JsonResponse({
+        'status': 'ok',
+        'redis': redis_status,
+        'local_cache': near_cache.stats(),
+        'cache_stampede': stampede_metrics.snapshot(),
+        'redis_pools': pool_stats(),
+        'jwt_blacklist': local_blacklist.stats(),
+        'debug': settings.DEBUG,
+        'allowed_hosts': settings.ALLOWED_HOSTS,
+    })
+
+def metrics(request):
+    """
+    Request metrics of all workers in the Prometheus text format.
 
+    Served outside DRF so that scrapers get plain text. When METRICS['TOKEN']
+    is set, scrapers must send it as a Bearer token.
+    """
+    token = metrics_settings['TOKEN']
+    if token:
+        provided = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(provided.encode(), token.encode()):
+            return HttpResponse(status=401)
+
+    try:
+        body = request_metrics.render()
+    except Exception as e:
+        return HttpResponse(f"# Error reading metrics: {str(e)}\n", status=503, content_type=METRICS_CONTENT_TYPE)
+    return HttpResponse(body, content_type=METRICS_CONTENT_TYPE)
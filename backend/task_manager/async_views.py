@@ -0,0 +1,170 @@
+"""
+Async versions of the task API for ASGI deployments.
+
+Cache hits never leave the event loop: Redis is reached through the shared
+redis.asyncio pool and the database through Django's async ORM, so a single
+worker can hold thousands of concurrent requests without a thread each.
+Responses match the sync endpoints in views.py.
+"""
+import json
+import time
+import logging
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from core.async_api import async_api_view
+from core.cache.utils import cache_stats
+from core.connections import get_async_redis_client
+from .models import Task
+from . import cache as task_list_cache
+from . import search as task_search
+from . import stats as task_stats
+from .views import (
+    TASKS_STREAM_CHUNK_SIZE, _encode_row, _etag, _list_params, _not_modified, _owner, _page_from_rows,
+    _page_querysets, _page_response, _set_validators, _validate_task_fields
+)
+
+logger = logging.getLogger(__name__)
+
+async def _cache_task(task):
+    """Async version of Task.cache_task"""
+    cache_key = f"task_{task.id}"
+    start = time.perf_counter()
+    payload = json.dumps(task.to_dict())
+    await get_async_redis_client('cache').set(cache_key, payload, ex=60*15)  # Cache for 15 minutes
+    if cache_stats.enabled:
+        cache_stats.record_set(cache_key, len(payload), time.perf_counter() - start)
+
+async def _uncache_task(task_id):
+    """Async version of Task.uncache_task"""
+    cache_key = f"task_{task_id}"
+    deleted = await get_async_redis_client('cache').delete(cache_key)
+    if cache_stats.enabled:
+        cache_stats.record_invalidation(cache_key, deleted)
+
+async def _afetch_page(querysets, ordering, limit):
+    """Async version of views._fetch_page"""
+    rows = []
+    for queryset in querysets:
+        rows += [row async for row in queryset.values()[:limit + 1 - len(rows)]]
+        if len(rows) > limit:
+            break
+    return _page_from_rows(rows, ordering, limit)
+
+async def _astream_tasks(querysets, fmt):
+    """Async version of views._stream_tasks"""
+    if fmt == 'json':
+        yield '['
+
+    buffer = []
+    first = True
+    for queryset in querysets:
+        async for row in queryset.values().aiterator(chunk_size=TASKS_STREAM_CHUNK_SIZE):
+            buffer.append(_encode_row(row, fmt, first))
+            first = False
+            if len(buffer) >= TASKS_STREAM_CHUNK_SIZE:
+                yield ''.join(buffer)
+                buffer = []
+
+    if buffer:
+        yield ''.join(buffer)
+    if fmt == 'json':
+        yield ']'
+
+@async_api_view(['GET'])
+async def async_get_tasks(request):
+    try:
+        filters, ordering, cursor, limit = _list_params(request.GET, request.user)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    canonical = task_list_cache.canonical_query(filters, ordering, cursor, limit)
+    validators = await task_list_cache.aget_validators()
+    if validators is not None:
+        etag = _etag('tasks', validators, canonical + request.GET.get('stream', ''))
+        not_modified = _not_modified(request, etag, validators)
+        if not_modified is not None:
+            return not_modified
+
+    querysets = _page_querysets(Task.objects.filter(**filters), ordering, cursor)
+
+    stream = request.GET.get('stream')
+    if stream:
+        if stream not in ('ndjson', 'json'):
+            return JsonResponse({'status': 'error', 'message': 'stream must be ndjson or json'}, status=400)
+        content_type = 'application/x-ndjson' if stream == 'ndjson' else 'application/json'
+        response = StreamingHttpResponse(_astream_tasks(querysets, stream), content_type=content_type)
+    elif task_list_cache.serves(filters, ordering):
+        page = await task_list_cache.aget_page(filters, cursor, limit)
+        if page is None:
+            page = await _afetch_page(querysets, ordering, limit)
+        response = _page_response(request, *page, limit)
+    else:
+        key = task_list_cache.query_key(validators, canonical) if validators is not None else None
+        page = await task_list_cache.aget_query_page(key) if key else None
+        if page is None:
+            page = await _afetch_page(querysets, ordering, limit)
+            if key:
+                await task_list_cache.aset_query_page(key, page)
+        response = _page_response(request, *page, limit)
+
+    if validators is not None:
+        _set_validators(response, etag, validators)
+    return response
+
+@async_api_view(['POST'])
+async def async_create_task(request):
+    try:
+        fields = _validate_task_fields(json.loads(request.body))
+        with task_list_cache.maintained_writes():
+            task = await Task.objects.acreate(**{'title': '', 'description': '', **fields}, user=_owner(request))
+
+        await _cache_task(task)
+        await sync_to_async(task_search.index_tasks)([task])
+        await task_list_cache.aupsert_tasks([task])
+
+        return JsonResponse({'status': 'Task created', 'task_id': task.id})
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+@async_api_view(['PUT'])
+async def async_update_task(request, task_id):
+    try:
+        task = await Task.objects.aget(id=task_id)
+        fields = _validate_task_fields(json.loads(request.body))
+        previous = {task.id: task_stats.state(task)}
+
+        # Update task fields
+        for field, value in fields.items():
+            setattr(task, field, value)
+
+        with task_list_cache.maintained_writes():
+            await task.asave()
+
+        await _cache_task(task)
+        await sync_to_async(task_search.index_tasks)([task])
+        await task_list_cache.aupsert_tasks([task], previous)
+
+        return JsonResponse({'status': 'Task updated', 'task_id': task.id})
+    except Task.DoesNotExist:
+        return JsonResponse({'status': 'error', 'message': 'Task not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+@async_api_view(['DELETE'])
+async def async_delete_task(request, task_id):
+    try:
+        task = await Task.objects.aget(id=task_id)
+        task_id = task.id
+        previous = task_stats.state(task)
+        with task_list_cache.maintained_writes():
+            await task.adelete()
+
+        await _uncache_task(task_id)
+        await sync_to_async(task_search.remove_tasks)([task_id])
+        await task_list_cache.aremove_tasks([task_id], [previous])
+
+        return JsonResponse({'status': 'Task deleted', 'task_id': task_id})
+    except Task.DoesNotExist:
+        return JsonResponse({'status': 'error', 'message': 'Task not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
@@ -0,0 +1,424 @@
+"""
+Incrementally maintained Redis cache of the task list.
+
+Instead of caching serialized pages that every write has to throw away, the
+list is kept as per-task entries:
+
+- ``tasklist:data`` hash: task id -> JSON row
+- ``tasklist:index`` sorted set of all task ids, scored by id
+- ``tasklist:index:completed:<0|1>`` sorted sets per filter value
+
+Writes patch only the affected entry (HSET/HDEL, ZADD/ZREM) and reads page
+through the sorted sets with ZRANGEBYSCORE and fetch rows with HMGET, so the
+cached list survives writes.
+
+The structure is built from the database on a cold read into temporary keys
+that are renamed into place. Every write bumps ``tasklist:generation``; the
+swap runs under WATCH on it so a build that raced a write is discarded
+rather than resurrecting stale rows.
+
+The same write pipelines bump the HTTP validators: ``tasklist:version`` for
+the collection and ``task-version:<id>`` per task, hashes holding a counter
+(``v``) and the modification time (``ts``). The views derive ETag and
+Last-Modified from them with one HMGET.
+
+Writes made elsewhere (admin, shell, management commands) are caught by the
+post_save/post_delete handlers in task_manager.signals, which drop the list
+and the validators once the transaction commits; the views run their writes
+under ``maintained_writes()`` so the handlers leave them alone.
+QuerySet.update() sends no signal: call ``invalidate()`` after one.
+
+The task counters of task_manager.stats are updated in those pipelines too.
+
+Queries the sorted sets cannot answer (other filters or orderings) are
+cached per page under ``tasklist:query:<version>:<digest>``, where the
+digest covers the normalized filters, ordering, cursor and limit. The key
+embeds the collection validators, so a write retires every cached query
+without deleting anything; stale pages just expire.
+"""
+import json
+import time
+import hashlib
+import contextvars
+import uuid
+import logging
+import redis
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from asgiref.sync import sync_to_async
+from core.connections import get_redis_client, get_async_redis_client
+from .models import Task
+from . import stats as task_stats
+
+logger = logging.getLogger(__name__)
+
+redis_client = get_redis_client('cache')
+
+KEY_PREFIX = 'tasklist'
+DATA_KEY = f'{KEY_PREFIX}:data'
+INDEX_KEY = f'{KEY_PREFIX}:index'
+WARM_KEY = f'{KEY_PREFIX}:warm'
+GENERATION_KEY = f'{KEY_PREFIX}:generation'
+VERSION_KEY = f'{KEY_PREFIX}:version'
+BUILD_LOCK_KEY = f'{KEY_PREFIX}:build-lock'
+QUERY_KEY_PREFIX = f'{KEY_PREFIX}:query'
+
+# Boolean filters that get their own sorted set per value
+INDEXED_FILTERS = ('completed',)
+
+LIST_CACHE_TIMEOUT = getattr(settings, 'TASK_LIST_CACHE_TIMEOUT', 60 * 60)
+BUILD_CHUNK_SIZE = getattr(settings, 'TASK_LIST_CACHE_BUILD_CHUNK_SIZE', 2000)
+# Per-task validators expire so deleted or idle tasks do not keep a key
+TASK_VERSION_TIMEOUT = getattr(settings, 'TASK_VERSION_TIMEOUT', 24 * 60 * 60)
+QUERY_CACHE_TIMEOUT = getattr(settings, 'TASK_QUERY_CACHE_TIMEOUT', 5 * 60)
+
+# Set while a view writes tasks and patches the caches itself
+_maintained = contextvars.ContextVar('task_cache_maintained', default=False)
+
+@contextmanager
+def maintained_writes():
+    """Mark task writes whose caches the caller keeps up to date."""
+    token = _maintained.set(True)
+    try:
+        yield
+    finally:
+        _maintained.reset(token)
+
+def writes_maintained():
+    return _maintained.get()
+
+def task_version_key(task_id):
+    return f"task-version:{task_id}"
+
+def index_key(filters=None, base=INDEX_KEY):
+    """Return the sorted set holding the ids that match ``filters``."""
+    if not filters:
+        return base
+    (field, value), = filters.items()
+    return f"{base}:{field}:{int(bool(value))}"
+
+def serves(filters, ordering):
+    """True if the sorted sets can answer the query."""
+    return ordering == 'id' and len(filters) <= 1 and set(filters) <= set(INDEXED_FILTERS)
+
+def canonical_query(filters, ordering, cursor, limit):
+    """Stable string form of a normalized list query."""
+    return json.dumps(
+        [sorted(filters.items()), ordering, cursor, limit], cls=DjangoJSONEncoder, separators=(',', ':')
+    )
+
+def query_key(validators, canonical):
+    """Cache key of one query page, tied to the collection validators."""
+    version, modified = validators
+    digest = hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+    return f"{QUERY_KEY_PREFIX}:{version}-{int(modified * 1e6):x}:{digest}"
+
+def structure_keys(data_key=DATA_KEY, base=INDEX_KEY):
+    """All keys making up one copy of the structure, data hash first."""
+    keys = [data_key, base]
+    for field in INDEXED_FILTERS:
+        keys.append(index_key({field: True}, base))
+        keys.append(index_key({field: False}, base))
+    return keys
+
+def normalize_row(row):
+    """A row as it reads back from the cache, dates and times as ISO strings."""
+    return json.loads(json.dumps(row, cls=DjangoJSONEncoder))
+
+def task_row(task):
+    """Same shape as a row of Task.objects.values(), normalized like a cached row."""
+    return normalize_row({field.attname: field.value_from_object(task) for field in Task._meta.concrete_fields})
+
+def _queue_upsert(pipe, row, data_key=DATA_KEY, base=INDEX_KEY):
+    task_id = row['id']
+    pipe.hset(data_key, task_id, json.dumps(row, cls=DjangoJSONEncoder))
+    pipe.zadd(base, {task_id: task_id})
+    for field in INDEXED_FILTERS:
+        value = bool(row[field])
+        pipe.zadd(index_key({field: value}, base), {task_id: task_id})
+        pipe.zrem(index_key({field: not value}, base), task_id)
+
+def _queue_bump(pipe, task_ids):
+    """Bump the collection validator and those of ``task_ids``."""
+    now = time.time()
+    for key in [VERSION_KEY] + [task_version_key(task_id) for task_id in task_ids]:
+        pipe.hincrby(key, 'v', 1)
+        pipe.hset(key, 'ts', now)
+        if key != VERSION_KEY:
+            pipe.expire(key, TASK_VERSION_TIMEOUT)
+
+def _queue_remove(pipe, task_ids):
+    pipe.incr(GENERATION_KEY)
+    _queue_bump(pipe, task_ids)
+    pipe.hdel(DATA_KEY, *task_ids)
+    for key in structure_keys()[1:]:
+        pipe.zrem(key, *task_ids)
+
+def _decode_page(ids, rows, limit):
+    """Turn ZRANGEBYSCORE ids and HMGET rows into (rows, next_cursor), or None"""
+    if any(row is None for row in rows):
+        return None
+    next_cursor = int(ids[limit - 1]) if len(ids) > limit else None
+    return [json.loads(row) for row in rows], next_cursor
+
+def _stats_changes(tasks, previous):
+    """Counter deltas of an upsert; tasks missing from ``previous`` were created."""
+    previous = previous or {}
+    return task_stats.changes(
+        [previous[task.id] for task in tasks if task.id in previous],
+        [task_stats.state(task) for task in tasks],
+    )
+
+def upsert_tasks(tasks, previous=None):
+    """
+    Patch the cached entries of created or updated tasks.
+
+    ``previous`` maps the id of each updated task to its task_stats.state()
+    before the update; tasks missing from it are counted as created.
+    """
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.incr(GENERATION_KEY)
+        _queue_bump(pipe, [task.id for task in tasks])
+        for task in tasks:
+            _queue_upsert(pipe, task_row(task))
+        task_stats.queue_changes(pipe, _stats_changes(tasks, previous))
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Error updating task list cache: {str(e)}")
+        invalidate([task.id for task in tasks])
+
+def remove_tasks(task_ids, previous=()):
+    """Drop deleted tasks, whose task_stats states were ``previous``, from the cached list."""
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        _queue_remove(pipe, task_ids)
+        task_stats.queue_changes(pipe, task_stats.changes(previous=previous))
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Error removing tasks from list cache: {str(e)}")
+        invalidate(task_ids)
+
+def invalidate(task_ids=()):
+    """
+    Forget the whole list; the next read rebuilds it.
+
+    The validators of the collection and of ``task_ids`` are dropped as well,
+    so they are recreated with a new timestamp and no client is told that a
+    changed resource is not modified.
+    """
+    try:
+        redis_client.delete(
+            WARM_KEY, VERSION_KEY, *structure_keys(), *[task_version_key(task_id) for task_id in task_ids]
+        )
+    except Exception as e:
+        logger.error(f"Error invalidating task list cache: {str(e)}")
+
+def _validators_key(task_id):
+    return VERSION_KEY if task_id is None else task_version_key(task_id)
+
+def _queue_init_validators(pipe, key):
+    # HSETNX keeps whatever a concurrent write or read stored first
+    pipe.hsetnx(key, 'v', 0)
+    pipe.hsetnx(key, 'ts', time.time())
+    if key != VERSION_KEY:
+        pipe.expire(key, TASK_VERSION_TIMEOUT)
+    pipe.hmget(key, 'v', 'ts')
+
+def _decode_validators(values):
+    version, modified = values
+    return int(version), float(modified)
+
+def get_validators(task_id=None):
+    """
+    Return (version, modified_timestamp) of the collection or of one task.
+
+    Costs one HMGET when the validators exist; missing ones are created.
+    Returns None if Redis is unavailable.
+    """
+    key = _validators_key(task_id)
+    try:
+        values = redis_client.hmget(key, 'v', 'ts')
+        if values[1] is None:
+            pipe = redis_client.pipeline(transaction=True)
+            _queue_init_validators(pipe, key)
+            values = pipe.execute()[-1]
+        return _decode_validators(values)
+    except Exception as e:
+        logger.error(f"Error reading task validators: {str(e)}")
+        return None
+
+def get_query_page(key):
+    """Return the cached (rows, next_cursor) of a query page, or None."""
+    try:
+        cached = redis_client.get(key)
+    except Exception as e:
+        logger.error(f"Error reading task query cache: {str(e)}")
+        return None
+    return tuple(json.loads(cached)) if cached is not None else None
+
+def set_query_page(key, page):
+    try:
+        redis_client.set(key, json.dumps(page, cls=DjangoJSONEncoder), ex=QUERY_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Error writing task query cache: {str(e)}")
+
+def ensure_built():
+    """
+    Build the structure from the database if it is not warm.
+
+    Returns:
+        bool: True if the cache can serve reads
+    """
+    if redis_client.exists(WARM_KEY):
+        return True
+
+    lock = redis_client.lock(BUILD_LOCK_KEY, timeout=60)
+    if not lock.acquire(blocking=False):
+        # Another worker is building; serve this request from the database
+        return False
+
+    suffix = uuid.uuid4().hex
+    build_keys = structure_keys(f"{DATA_KEY}:build:{suffix}", f"{INDEX_KEY}:build:{suffix}")
+    try:
+        if redis_client.exists(WARM_KEY):
+            return True
+
+        generation = redis_client.get(GENERATION_KEY)
+        pipe = redis_client.pipeline(transaction=False)
+        rows = Task.objects.order_by('id').values().iterator(chunk_size=BUILD_CHUNK_SIZE)
+        for count, row in enumerate(rows, 1):
+            _queue_upsert(pipe, row, build_keys[0], build_keys[1])
+            if count % BUILD_CHUNK_SIZE == 0:
+                pipe.execute()
+        pipe.execute()
+
+        with redis_client.pipeline(transaction=True) as pipe:
+            pipe.watch(GENERATION_KEY)
+            if pipe.get(GENERATION_KEY) != generation:
+                return False
+            present = [pipe.exists(key) for key in build_keys]
+
+            pipe.multi()
+            pipe.delete(*structure_keys())
+            for build_key, key, exists in zip(build_keys, structure_keys(), present):
+                if exists:
+                    pipe.rename(build_key, key)
+                    pipe.expire(key, LIST_CACHE_TIMEOUT)
+            pipe.set(WARM_KEY, 1, ex=LIST_CACHE_TIMEOUT)
+            pipe.execute()
+        return True
+    except redis.WatchError:
+        # A write landed while building; the snapshot may be stale
+        return False
+    finally:
+        redis_client.delete(*build_keys)
+        try:
+            lock.release()
+        except Exception:
+            pass
+
+def get_page(filters, cursor, limit):
+    """
+    Return up to ``limit`` rows with an id greater than ``cursor``.
+
+    Returns:
+        tuple: (rows, next_cursor), or None if the cache cannot serve the read
+    """
+    try:
+        if not ensure_built():
+            return None
+
+        ids = redis_client.zrangebyscore(index_key(filters), f"({cursor}", '+inf', start=0, num=limit + 1)
+        rows = redis_client.hmget(DATA_KEY, ids[:limit]) if ids else []
+        page = _decode_page(ids, rows, limit)
+        if page is None:
+            # The keys expired between reads; rebuild on the next request
+            invalidate()
+        return page
+    except Exception as e:
+        logger.error(f"Error reading task list cache: {str(e)}")
+        return None
+
+# Async variants for the ASGI views. They share the sync client's keys but
+# use the loop's redis.asyncio pool; the one-off build stays in a thread.
+
+async def aupsert_tasks(tasks, previous=None):
+    """Async version of upsert_tasks."""
+    try:
+        pipe = get_async_redis_client('cache').pipeline(transaction=True)
+        pipe.incr(GENERATION_KEY)
+        _queue_bump(pipe, [task.id for task in tasks])
+        for task in tasks:
+            _queue_upsert(pipe, task_row(task))
+        task_stats.queue_changes(pipe, _stats_changes(tasks, previous))
+        await pipe.execute()
+    except Exception as e:
+        logger.error(f"Error updating task list cache: {str(e)}")
+        await sync_to_async(invalidate)([task.id for task in tasks])
+
+async def aremove_tasks(task_ids, previous=()):
+    """Async version of remove_tasks."""
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    try:
+        pipe = get_async_redis_client('cache').pipeline(transaction=True)
+        _queue_remove(pipe, task_ids)
+        task_stats.queue_changes(pipe, task_stats.changes(previous=previous))
+        await pipe.execute()
+    except Exception as e:
+        logger.error(f"Error removing tasks from list cache: {str(e)}")
+        await sync_to_async(invalidate)(task_ids)
+
+async def aget_page(filters, cursor, limit):
+    """Async version of get_page."""
+    client = get_async_redis_client('cache')
+    try:
+        if not await client.exists(WARM_KEY) and not await sync_to_async(ensure_built)():
+            return None
+
+        ids = await client.zrangebyscore(index_key(filters), f"({cursor}", '+inf', start=0, num=limit + 1)
+        rows = await client.hmget(DATA_KEY, ids[:limit]) if ids else []
+        page = _decode_page(ids, rows, limit)
+        if page is None:
+            await client.delete(WARM_KEY, *structure_keys())
+        return page
+    except Exception as e:
+        logger.error(f"Error reading task list cache: {str(e)}")
+        return None
+
+async def aget_query_page(key):
+    """Async version of get_query_page."""
+    try:
+        cached = await get_async_redis_client('cache').get(key)
+    except Exception as e:
+        logger.error(f"Error reading task query cache: {str(e)}")
+        return None
+    return tuple(json.loads(cached)) if cached is not None else None
+
+async def aset_query_page(key, page):
+    """Async version of set_query_page."""
+    try:
+        await get_async_redis_client('cache').set(key, json.dumps(page, cls=DjangoJSONEncoder), ex=QUERY_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Error writing task query cache: {str(e)}")
+
+async def aget_validators(task_id=None):
+    """Async version of get_validators."""
+    client = get_async_redis_client('cache')
+    key = _validators_key(task_id)
+    try:
+        values = await client.hmget(key, 'v', 'ts')
+        if values[1] is None:
+            pipe = client.pipeline(transaction=True)
+            _queue_init_validators(pipe, key)
+            values = (await pipe.execute())[-1]
+        return _decode_validators(values)
+    except Exception as e:
+        logger.error(f"Error reading task validators: {str(e)}")
+        return None
@@ -1,50 +1,160 @@
+from django.conf import settings
 from django.db import models
-import redis
+from django.utils import timezone
 import json
-from django.conf import settings
+import time
+from core.connections import get_redis_client
+from core.cache.utils import cache_stats
 
 # Configure Redis connection
-redis_client = redis.StrictRedis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    db=settings.REDIS_DB
-)
+redis_client = get_redis_client('cache')
 
 class Task(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('in_progress', 'In progress'),
+        ('completed', 'Completed'),
+    )
+    PRIORITY_CHOICES = (
+        (1, 'Low'),
+        (2, 'Medium'),
+        (3, 'High'),
+    )
+
     title = models.CharField(max_length=255)
     description = models.TextField()
     completed = models.BooleanField(default=False)
+    # Indexed together with id below
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='tasks',
+        null=True, blank=True, db_index=False
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    priority = models.PositiveSmallIntegerField(choices=PRIORITY_CHOICES, default=1)
+    due_date = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         app_label = 'task_manager'
+        # One index per list filter, each ending with id so that the keyset
+        # pagination of the list (ordered by the field, then id) is an index
+        # range scan. Per-user lists use the user-prefixed ones.
+        indexes = [
+            # completed has two values, so one partial index per value rather than a
+            # (completed, id) index that SQLite's planner passes over for a table scan
+            models.Index(fields=['id'], condition=models.Q(completed=True), name='task_completed_idx'),
+            models.Index(fields=['id'], condition=models.Q(completed=False), name='task_open_idx'),
+            models.Index(fields=['status', 'id'], name='task_status_idx'),
+            models.Index(fields=['priority', 'id'], name='task_priority_idx'),
+            models.Index(fields=['due_date', 'id'], name='task_due_date_idx'),
+            models.Index(fields=['user', 'id'], name='task_user_idx'),
+            models.Index(fields=['user', 'status', 'id'], name='task_user_status_idx'),
+            models.Index(fields=['user', 'priority', 'id'], name='task_user_priority_idx'),
+            models.Index(fields=['user', 'due_date', 'id'], name='task_user_due_date_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def is_overdue(self):
+        return bool(self.due_date) and not self.completed and self.due_date < timezone.now().date()
+
     def to_dict(self):
         return {
             "id": self.id,
             "title": self.title,
             "description": self.description,
-            "completed": self.completed
+            "completed": self.completed,
+            "user_id": self.user_id,
+            "status": self.status,
+            "priority": self.priority,
+            "due_date": self.due_date.isoformat() if self.due_date else None,
         }
 
     def cache_task(self):
         cache_key = f"task_{self.id}"
+        start = time.perf_counter()
         # Use json.dumps instead of str() to ensure valid JSON
-        redis_client.set(cache_key, json.dumps(self.to_dict()), ex=60*15)  # Cache for 15 minutes
+        payload = json.dumps(self.to_dict())
+        redis_client.set(cache_key, payload, ex=60*15)  # Cache for 15 minutes
+        if cache_stats.enabled:
+            cache_stats.record_set(cache_key, len(payload), time.perf_counter() - start)
 
     def uncache_task(self):
         cache_key = f"task_{self.id}"
-        redis_client.delete(cache_key)
+        deleted = redis_client.delete(cache_key)
+        if cache_stats.enabled:
+            cache_stats.record_invalidation(cache_key, deleted)
+
+    @classmethod
+    def cache_tasks(cls, tasks):
+        """Write the task_<id> keys of many tasks in one pipeline"""
+        if not tasks:
+            return
+        start = time.perf_counter()
+        size = 0
+        pipe = redis_client.pipeline(transaction=False)
+        for task in tasks:
+            payload = json.dumps(task.to_dict())
+            size += len(payload)
+            pipe.set(f"task_{task.id}", payload, ex=60*15)  # Cache for 15 minutes
+        pipe.execute()
+        if cache_stats.enabled:
+            cache_stats.record_set("task_", size, time.perf_counter() - start, count=len(tasks))
+
+    @classmethod
+    def uncache_tasks(cls, task_ids):
+        """Evict the task_<id> keys of many tasks in one round trip"""
+        if task_ids:
+            deleted = redis_client.delete(*[f"task_{task_id}" for task_id in task_ids])
+            if cache_stats.enabled:
+                cache_stats.record_invalidation("task_", deleted)
 
     @classmethod
     def get_cached_task(cls, task_id):
         cache_key = f"task_{task_id}"
+        start = time.perf_counter()
         cached_task = redis_client.get(cache_key)
+        if cache_stats.enabled:
+            cache_stats.record_get(cache_key, cached_task is not None, time.perf_counter() - start)
         if cached_task:
             # Use json.loads to properly parse the JSON string
             return json.loads(cached_task.decode('utf-8'))
         task = cls.objects.get(id=task_id)
         task.cache_task()
-        return task.to_dict()
\ No newline at end of file
+        return task.to_dict()
+
+    @classmethod
+    def get_cached_tasks(cls, task_ids):
+        """
+        Fetch many tasks with one MGET, one query for the misses and one
+        pipelined backfill.
+
+        Returns:
+            list: Task dicts in the order of ``task_ids``; ids that do not
+            exist are skipped
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        if not task_ids:
+            return []
+
+        found = {}
+        keys = [f"task_{task_id}" for task_id in task_ids]
+        start = time.perf_counter()
+        cached = redis_client.mget(keys)
+        for task_id, cached_task in zip(task_ids, cached):
+            if cached_task:
+                found[task_id] = json.loads(cached_task.decode('utf-8'))
+        if cache_stats.enabled:
+            cache_stats.record_get_many(keys, len(found), time.perf_counter() - start)
+
+        missing = [task_id for task_id in task_ids if task_id not in found]
+        if missing:
+            tasks = list(cls.objects.filter(id__in=missing))
+            cls.cache_tasks(tasks)
+            for task in tasks:
+                found[task.id] = task.to_dict()
+
+        return [found[task_id] for task_id in task_ids if task_id in found]
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+Full-text search over task titles and descriptions, indexed in Redis.
+
+Every token of a task maps to a sorted set of the ids of the tasks that
+contain it, scored by term frequency with title occurrences counting
+TITLE_WEIGHT times:
+
+- ``tasksearch:term:<token>`` postings of a whole token
+- ``tasksearch:prefix:<prefix>`` postings of all tokens starting with
+  ``prefix`` (MIN_PREFIX to MAX_PREFIX characters), for autocomplete
+- ``tasksearch:doc:<id>`` hash of the posting keys of one task and its
+  weight in each, so an update or delete knows what to remove
+- ``tasksearch:ids`` set of indexed ids, the document count for idf
+
+A one-token query is a single ZREVRANGE. Several tokens are intersected
+with ZINTERSTORE, weighted by inverse document frequency, which costs in
+proportion to the shortest posting list. The top MAX_RESULTS ids of a
+query are cached under the collection validators of task_manager.cache,
+so hot queries are one GET and any write retires them.
+
+The write views update the index next to the list cache, and
+``manage.py rebuild_search_index`` backfills it.
+"""
+import re
+import json
+import math
+import uuid
+import hashlib
+import logging
+from collections import Counter
+import redis
+from django.conf import settings
+from core.connections import get_redis_client
+from .models import Task
+from . import cache as task_list_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'KEY_PREFIX': 'tasksearch',
+    'TITLE_WEIGHT': 3,
+    'MIN_PREFIX': 2,  # Also the shortest token indexed
+    'MAX_PREFIX': 10,
+    'MAX_RESULTS': 500,  # Ids kept per cached query
+    'RESULT_CACHE_TIMEOUT': 5 * 60,
+    'WATCH_RETRIES': 5,
+}
+
+search_settings = {**DEFAULT_SETTINGS, **getattr(settings, 'TASK_SEARCH', {})}
+
+KEY_PREFIX = search_settings['KEY_PREFIX']
+IDS_KEY = f'{KEY_PREFIX}:ids'
+RESULTS_KEY_PREFIX = f'{KEY_PREFIX}:results'
+
+TOKEN_RE = re.compile(r'\w+')
+MAX_TOKEN_LENGTH = 64
+
+redis_client = get_redis_client('cache', decode_responses=True)
+
+def tokenize(text):
+    """Lowercased word tokens of ``text`` that are worth indexing."""
+    return [
+        token for token in TOKEN_RE.findall((text or '').lower())
+        if search_settings['MIN_PREFIX'] <= len(token) <= MAX_TOKEN_LENGTH
+    ]
+
+def term_key(token):
+    return f"{KEY_PREFIX}:term:{token}"
+
+def prefix_key(prefix):
+    return f"{KEY_PREFIX}:prefix:{prefix[:search_settings['MAX_PREFIX']]}"
+
+def doc_key(task_id):
+    return f"{KEY_PREFIX}:doc:{task_id}"
+
+def postings(task):
+    """Posting key -> weight of ``task`` in it."""
+    tokens = Counter(tokenize(task.description))
+    for token in tokenize(task.title):
+        tokens[token] += search_settings['TITLE_WEIGHT']
+
+    weights = {}
+    for token, weight in tokens.items():
+        weights[term_key(token)] = weight
+        for length in range(search_settings['MIN_PREFIX'], min(len(token), search_settings['MAX_PREFIX']) + 1):
+            key = prefix_key(token[:length])
+            weights[key] = weights.get(key, 0) + weight
+    return weights
+
+def _queue_remove(pipe, task_id, previous):
+    for key in previous:
+        pipe.zrem(key, task_id)
+    pipe.delete(doc_key(task_id))
+
+def _update(task_ids, new_postings):
+    """
+    Replace the postings of ``task_ids`` with ``new_postings`` (None removes).
+
+    The previous postings are read under WATCH so that two concurrent
+    writes of a task cannot leave the postings of both behind.
+    """
+    keys = [doc_key(task_id) for task_id in task_ids]
+    with redis_client.pipeline(transaction=True) as pipe:
+        for _ in range(search_settings['WATCH_RETRIES']):
+            try:
+                pipe.watch(*keys)
+                reader = redis_client.pipeline(transaction=False)
+                for key in keys:
+                    reader.hgetall(key)
+                previous = reader.execute()
+
+                pipe.multi()
+                for task_id, old, new in zip(task_ids, previous, new_postings):
+                    _queue_remove(pipe, task_id, old)
+                    if new is None:
+                        pipe.srem(IDS_KEY, task_id)
+                        continue
+                    for key, weight in new.items():
+                        pipe.zadd(key, {task_id: weight})
+                    if new:
+                        pipe.hset(doc_key(task_id), mapping=new)
+                    pipe.sadd(IDS_KEY, task_id)
+                pipe.execute()
+                return
+            except redis.WatchError:
+                continue
+    logger.error(f"Gave up updating the search index of tasks {task_ids}; rebuild it to recover")
+
+def index_tasks(tasks):
+    """Add or refresh the postings of created or updated tasks."""
+    tasks = list(tasks)
+    if not tasks:
+        return
+    try:
+        _update([task.id for task in tasks], [postings(task) for task in tasks])
+    except Exception as e:
+        logger.error(f"Error updating task search index: {str(e)}")
+
+def remove_tasks(task_ids):
+    """Drop deleted tasks from the index."""
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    try:
+        _update(task_ids, [None] * len(task_ids))
+    except Exception as e:
+        logger.error(f"Error removing tasks from search index: {str(e)}")
+
+def _results_key(validators, keys):
+    version, modified = validators
+    digest = hashlib.blake2b(json.dumps(keys).encode(), digest_size=16).hexdigest()
+    return f"{RESULTS_KEY_PREFIX}:{version}-{int(modified * 1e6):x}:{digest}"
+
+def _rank(keys):
+    """Return (total, [(task_id, score), ...]) of the best MAX_RESULTS matches."""
+    top = search_settings['MAX_RESULTS'] - 1
+    if len(keys) == 1:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zcard(keys[0])
+        pipe.zrevrange(keys[0], 0, top, withscores=True)
+        total, hits = pipe.execute()
+        return total, hits
+
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.scard(IDS_KEY)
+    for key in keys:
+        pipe.zcard(key)
+    documents, *frequencies = pipe.execute()
+    if not all(frequencies):
+        return 0, []
+
+    # Rare tokens weigh more than ones found in most tasks
+    weights = {key: math.log(1 + documents / frequency) for key, frequency in zip(keys, frequencies)}
+    temp_key = f"{KEY_PREFIX}:tmp:{uuid.uuid4().hex}"
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.zinterstore(temp_key, weights, aggregate='SUM')
+    pipe.zrevrange(temp_key, 0, top, withscores=True)
+    pipe.delete(temp_key)
+    total, hits, _ = pipe.execute()
+    return total, hits
+
+def search(query, prefix=False, offset=0, limit=20):
+    """
+    Rank the tasks matching every token of ``query``.
+
+    With ``prefix`` the last token matches any token it starts, for
+    search-as-you-type. Only the best MAX_RESULTS matches can be paged
+    through; ``total`` counts all of them.
+
+    Returns:
+        tuple: (total, [(task_id, score), ...]) for the requested window
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return 0, []
+    keys = [term_key(token) for token in tokens]
+    if prefix:
+        keys[-1] = prefix_key(tokens[-1])
+    keys = sorted(set(keys))
+
+    validators = task_list_cache.get_validators()
+    cache_key = _results_key(validators, keys) if validators is not None else None
+    cached = redis_client.get(cache_key) if cache_key else None
+    if cached is not None:
+        total, hits = json.loads(cached)
+    else:
+        total, hits = _rank(keys)
+        hits = [(int(task_id), score) for task_id, score in hits]
+        if cache_key:
+            redis_client.set(cache_key, json.dumps([total, hits]), ex=search_settings['RESULT_CACHE_TIMEOUT'])
+    return total, [tuple(hit) for hit in hits[offset:offset + limit]]
+
+def clear(pattern=f"{KEY_PREFIX}:*"):
+    """Delete the whole index, or the keys matching ``pattern``."""
+    batch = []
+    for key in redis_client.scan_iter(match=pattern, count=1000):
+        batch.append(key)
+        if len(batch) >= 1000:
+            redis_client.unlink(*batch)
+            batch = []
+    if batch:
+        redis_client.unlink(*batch)
+
+def rebuild(batch_size=2000):
+    """Clear the index and index every task again. Returns the number indexed."""
+    clear()
+    indexed = 0
+    batch = []
+    for task in Task.objects.only('id', 'title', 'description').order_by('id').iterator(chunk_size=batch_size):
+        batch.append(task)
+        if len(batch) >= batch_size:
+            _update([task.id for task in batch], [postings(task) for task in batch])
+            indexed += len(batch)
+            batch = []
+    if batch:
+        _update([task.id for task in batch], [postings(task) for task in batch])
+        indexed += len(batch)
+    # Drop results cached from the partial index while rebuilding
+    clear(f"{RESULTS_KEY_PREFIX}:*")
+    return indexed
@@ -0,0 +1,41 @@
+"""
+Keep the task caches honest for writes that bypass the task views.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Task
+from . import cache as task_list_cache
+from . import search as task_search
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, **kwargs):
+    """
+    Signal handler for task saves made outside the views.
+    Evicts and reindexes the task and drops the cached list and its
+    validators, so conditional GETs and cached queries cannot outlive the
+    change.
+    """
+    if task_list_cache.writes_maintained():
+        return
+
+    def refresh():
+        Task.uncache_tasks([instance.pk])
+        task_search.index_tasks([instance])
+        task_list_cache.invalidate([instance.pk])
+    transaction.on_commit(refresh)
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    """
+    Signal handler for task deletions made outside the views.
+    """
+    if task_list_cache.writes_maintained():
+        return
+
+    task_id = instance.pk
+    def refresh():
+        Task.uncache_tasks([task_id])
+        task_search.remove_tasks([task_id])
+        task_list_cache.invalidate([task_id])
+    transaction.on_commit(refresh)
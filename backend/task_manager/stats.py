@@ -0,0 +1,203 @@
+"""
+Task counters kept in Redis instead of COUNT queries.
+
+``taskstats:global`` and ``taskstats:user:<id>`` are hashes of ``total``,
+``completed``, ``status:<status>`` and ``priority:<priority>`` counts. The
+write paths of task_manager.cache queue the HINCRBYs computed by
+``changes`` in the same MULTI pipeline as their list cache update, so
+counters and cached list move together; reading them is one HGETALL.
+
+Writes that bypass the views (admin, cascades from user deletion) or a
+failed pipeline make the counters drift. ``reconcile`` recomputes them from
+the database with grouped queries and swaps them in under WATCH on the
+list cache generation, so a reconciliation that raced a write is retried.
+It runs from ``manage.py reconcile_task_stats`` and on the first read after
+the counters were lost, which is then answered from the counts it computed.
+"""
+import logging
+from collections import Counter, namedtuple
+import redis
+from django.conf import settings
+from django.db.models import Count
+from core.connections import get_redis_client
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'taskstats'
+GLOBAL_KEY = f'{KEY_PREFIX}:global'
+# Set by reconcile; without it the counters cannot be trusted
+READY_KEY = f'{KEY_PREFIX}:ready'
+RECONCILE_LOCK_KEY = f'{KEY_PREFIX}:reconcile-lock'
+
+RECONCILE_RETRIES = getattr(settings, 'TASK_STATS_RECONCILE_RETRIES', 5)
+
+# counts: (hash key, field) -> count read from the database
+# corrections: (hash key, field) -> correction applied, None if not stored
+Reconciliation = namedtuple('Reconciliation', ['counts', 'corrections'])
+
+redis_client = get_redis_client('cache', decode_responses=True)
+
+def user_key(user_id):
+    return f"{KEY_PREFIX}:user:{user_id}"
+
+def state(task):
+    """The fields of a task the counters depend on."""
+    return task.user_id, task.status, task.priority, task.completed
+
+# Same order as state(), for values_list()
+STATE_FIELDS = ('user_id', 'status', 'priority', 'completed')
+
+def _counted(task_state):
+    user_id, status, priority, completed = task_state
+    fields = ['total', f'status:{status}', f'priority:{priority}']
+    if completed:
+        fields.append('completed')
+    keys = [GLOBAL_KEY] if user_id is None else [GLOBAL_KEY, user_key(user_id)]
+    return [(key, field) for key in keys for field in fields]
+
+def changes(previous=(), current=()):
+    """
+    Counter deltas for tasks going from the ``previous`` states to the
+    ``current`` ones; creations have no previous state, deletions no
+    current one.
+
+    Returns:
+        dict: (hash key, field) -> non-zero delta
+    """
+    deltas = Counter()
+    for task_state in previous:
+        for counter in _counted(task_state):
+            deltas[counter] -= 1
+    for task_state in current:
+        for counter in _counted(task_state):
+            deltas[counter] += 1
+    return {counter: delta for counter, delta in deltas.items() if delta}
+
+def queue_changes(pipe, deltas):
+    for (key, field), delta in deltas.items():
+        pipe.hincrby(key, field, delta)
+
+def _format(counters):
+    counts = {field: int(value) for field, value in counters.items()}
+    return {
+        'total': counts.get('total', 0),
+        'completed': counts.get('completed', 0),
+        'by_status': {status: counts.get(f'status:{status}', 0) for status, _ in Task.STATUS_CHOICES},
+        'by_priority': {priority: counts.get(f'priority:{priority}', 0) for priority, _ in Task.PRIORITY_CHOICES},
+    }
+
+def _stats_from_counts(counts, user_id=None):
+    hashes = _hashes(counts)
+    return _format(hashes.get(GLOBAL_KEY, {})), (_format(hashes.get(user_key(user_id), {})) if user_id is not None else None)
+
+def get_stats(user_id=None):
+    """
+    Return the global counters, and those of ``user_id`` if given.
+
+    When the counters were lost the read reconciles them and answers from
+    the counts that computed. Reads racing that reconciliation serve the
+    counters still stored, or count once in the database if there are none.
+
+    Returns:
+        tuple: (global stats, user stats or None)
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.exists(READY_KEY)
+    pipe.hgetall(GLOBAL_KEY)
+    if user_id is not None:
+        pipe.hgetall(user_key(user_id))
+    ready, global_counters, *user_counters = pipe.execute()
+
+    if not ready:
+        result = reconcile()
+        if result is not None:
+            return _stats_from_counts(result.counts, user_id)
+        if not global_counters:
+            return get_stats_from_db(user_id)
+    return _format(global_counters), (_format(user_counters[0]) if user_id is not None else None)
+
+def _count_rows(queryset):
+    """(hash key, field) -> count computed with grouped queries"""
+    counts = Counter()
+    groups = (
+        ('total', queryset.values('user_id').annotate(n=Count('id'))),
+        ('completed', queryset.filter(completed=True).values('user_id').annotate(n=Count('id'))),
+        ('status', queryset.values('user_id', 'status').annotate(n=Count('id'))),
+        ('priority', queryset.values('user_id', 'priority').annotate(n=Count('id'))),
+    )
+    for name, rows in groups:
+        for row in rows.order_by():
+            field = name if name in ('total', 'completed') else f"{name}:{row[name]}"
+            counts[(GLOBAL_KEY, field)] += row['n']
+            if row['user_id'] is not None:
+                counts[(user_key(row['user_id']), field)] += row['n']
+    return counts
+
+def _hashes(counts):
+    """hash key -> {field: count}"""
+    hashes = {}
+    for (key, field), count in counts.items():
+        hashes.setdefault(key, {})[field] = count
+    return hashes
+
+def get_stats_from_db(user_id=None):
+    """Counters computed by the database, for when Redis cannot serve them."""
+    return _stats_from_counts(_count_rows(Task.objects.all()), user_id)
+
+def reconcile():
+    """
+    Recompute every counter from the database and store them.
+
+    Returns:
+        Reconciliation: the counts read and the corrections applied, with
+        ``corrections`` None if tasks kept changing and the counters could
+        not be swapped in; None if another reconciliation is running
+    """
+    from .cache import GENERATION_KEY
+
+    lock = redis_client.lock(RECONCILE_LOCK_KEY, timeout=300)
+    if not lock.acquire(blocking=False):
+        return None
+    try:
+        for _ in range(RECONCILE_RETRIES):
+            generation = redis_client.get(GENERATION_KEY)
+            counts = _count_rows(Task.objects.all())
+            counts.setdefault((GLOBAL_KEY, 'total'), 0)
+            hashes = _hashes(counts)
+            stale_keys = set(redis_client.scan_iter(match=user_key('*'), count=1000)) | {GLOBAL_KEY}
+
+            with redis_client.pipeline(transaction=True) as pipe:
+                try:
+                    pipe.watch(GENERATION_KEY)
+                    if pipe.get(GENERATION_KEY) != generation:
+                        continue
+                    reader = redis_client.pipeline(transaction=False)
+                    for key in stale_keys:
+                        reader.hgetall(key)
+                    before = dict(zip(stale_keys, reader.execute()))
+
+                    pipe.multi()
+                    pipe.delete(*stale_keys)
+                    for key, fields in hashes.items():
+                        pipe.hset(key, mapping=fields)
+                    pipe.set(READY_KEY, 1)
+                    pipe.execute()
+                except redis.WatchError:
+                    continue
+
+            corrections = Counter(counts)
+            for key, fields in before.items():
+                for field, value in fields.items():
+                    corrections[(key, field)] -= int(value)
+            corrections = {counter: delta for counter, delta in corrections.items() if delta}
+            if corrections:
+                logger.warning(f"Corrected {len(corrections)} drifted task counters")
+            return Reconciliation(counts, corrections)
+        logger.error("Could not reconcile task counters: tasks kept changing")
+        return Reconciliation(counts, None)
+    finally:
+        try:
+            lock.release()
+        except Exception:
+            pass
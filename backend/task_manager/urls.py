@@ -1,16 +1,38 @@
 from django.urls import path
 from .views import (
     get_tasks,
+    get_task,
     create_task,
     update_task,
     delete_task,
+    bulk_create_tasks,
+    bulk_update_tasks,
+    bulk_delete_tasks,
+    get_tasks_batch,
+    search_tasks,
     frequently_accessed_data
 )
+from .async_views import (
+    async_get_tasks,
+    async_create_task,
+    async_update_task,
+    async_delete_task
+)
 
 urlpatterns = [
     path('', get_tasks, name='get-tasks'),
+    path('<int:task_id>/', get_task, name='get-task'),
     path('create/', create_task, name='create-task'),
     path('update/<int:task_id>/', update_task, name='update-task'),
     path('delete/<int:task_id>/', delete_task, name='delete-task'),
+    path('batch/', get_tasks_batch, name='get-tasks-batch'),
+    path('search/', search_tasks, name='search-tasks'),
+    path('bulk/create/', bulk_create_tasks, name='bulk-create-tasks'),
+    path('bulk/update/', bulk_update_tasks, name='bulk-update-tasks'),
+    path('bulk/delete/', bulk_delete_tasks, name='bulk-delete-tasks'),
+    path('async/', async_get_tasks, name='async-get-tasks'),
+    path('async/create/', async_create_task, name='async-create-task'),
+    path('async/update/<int:task_id>/', async_update_task, name='async-update-task'),
+    path('async/delete/<int:task_id>/', async_delete_task, name='async-delete-task'),
     path('frequently-accessed-data/', frequently_accessed_data, name='frequently-accessed-data'),
 ]
\ No newline at end of file
@@ -1,48 +1,357 @@
 import json
-import redis
+import hashlib
+import logging
+from itertools import chain
 from django.conf import settings
-from django.core.cache import cache
-from django.http import JsonResponse
-from django.views.decorators.cache import cache_page
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from .models import Task
 from rest_framework.decorators import api_view
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from core.cache import memoize_response
+from core.connections import get_redis_client
+from . import cache as task_list_cache
+from . import search as task_search
+from . import stats as task_stats
+
+logger = logging.getLogger(__name__)
 
 # Configure Redis connection
-redis_client = redis.StrictRedis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    db=settings.REDIS_DB
-)
+redis_client = get_redis_client('cache')
+
+# Keyset pagination for the task list
+TASKS_PAGE_SIZE = getattr(settings, 'TASKS_PAGE_SIZE', 100)
+TASKS_MAX_PAGE_SIZE = getattr(settings, 'TASKS_MAX_PAGE_SIZE', 1000)
+TASKS_STREAM_CHUNK_SIZE = getattr(settings, 'TASKS_STREAM_CHUNK_SIZE', 2000)
+
+# Maximum number of items accepted by the bulk endpoints
+TASKS_BULK_MAX_ITEMS = getattr(settings, 'TASKS_BULK_MAX_ITEMS', 1000)
+TASK_FIELDS = ('title', 'description', 'completed', 'status', 'priority', 'due_date')
+TASK_STATUSES = tuple(value for value, _ in Task.STATUS_CHOICES)
+TASK_PRIORITIES = tuple(value for value, _ in Task.PRIORITY_CHOICES)
+
+# Supported list orderings; ties are broken by id in the same direction
+TASK_ORDERINGS = ('id', 'priority', '-priority', 'due_date', '-due_date')
+
+def _parse_bool(value):
+    if value.lower() in ('true', '1'):
+        return True
+    if value.lower() in ('false', '0'):
+        return False
+    raise ValueError(f"Invalid boolean value: {value}")
+
+def _parse_date(value):
+    parsed = parse_date(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise ValueError(f"Invalid date: {value}, expected YYYY-MM-DD")
+    return parsed
+
+def _task_filters(params, user=None):
+    """
+    Normalize the supported list filters from the query string into ORM lookups.
+
+    ``user=me`` is resolved to the requesting user's id, so equal queries
+    share a cache key whatever their spelling.
+    """
+    filters = {}
+    if 'completed' in params:
+        filters['completed'] = _parse_bool(params['completed'])
+    if 'user' in params:
+        if params['user'] == 'me':
+            if user is None or not user.is_authenticated:
+                raise ValueError("user=me requires an authenticated user")
+            filters['user_id'] = user.id
+        else:
+            filters['user_id'] = int(params['user'])
+    if 'status' in params:
+        if params['status'] not in TASK_STATUSES:
+            raise ValueError(f"status must be one of {', '.join(TASK_STATUSES)}")
+        filters['status'] = params['status']
+    if 'priority' in params:
+        filters['priority'] = int(params['priority'])
+    if 'due_date' in params:
+        filters['due_date'] = _parse_date(params['due_date'])
+    if 'due_after' in params:
+        filters['due_date__gte'] = _parse_date(params['due_after'])
+    if 'due_before' in params:
+        filters['due_date__lte'] = _parse_date(params['due_before'])
+    return filters
+
+def _parse_cursor(value, ordering):
+    """
+    Decode a list cursor: a task id for the id ordering, ``<value>~<id>``
+    otherwise (an empty value for tasks without a due date).
+    """
+    if ordering == 'id':
+        cursor = int(value or 0)
+        if cursor < 0:
+            raise ValueError("cursor must be >= 0")
+        return cursor
+    if not value:
+        return None
+    field_value, separator, last_id = value.rpartition('~')
+    if not separator:
+        raise ValueError(f"Invalid cursor for ordering {ordering}")
+    if ordering.lstrip('-') == 'priority':
+        return int(field_value), int(last_id)
+    return (_parse_date(field_value) if field_value else None), int(last_id)
+
+def _list_params(params, user=None):
+    """Return (filters, ordering, cursor, limit) from the query string or raise ValueError"""
+    filters = _task_filters(params, user)
+    ordering = params.get('ordering', 'id')
+    if ordering not in TASK_ORDERINGS:
+        raise ValueError(f"ordering must be one of {', '.join(TASK_ORDERINGS)}")
+    cursor = _parse_cursor(params.get('cursor'), ordering)
+    limit = min(int(params.get('limit', TASKS_PAGE_SIZE)), TASKS_MAX_PAGE_SIZE)
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+    return filters, ordering, cursor, limit
+
+def _page_querysets(queryset, ordering, cursor):
+    """
+    Querysets to read in turn for the rows after ``cursor`` in ``ordering``.
+
+    Rows are ordered by the field, then id, in the same direction, which the
+    ``(field, id)`` indexes serve as a range scan. Tasks without a due date
+    come last in both due date orderings and are read by id.
+    """
+    if ordering == 'id':
+        if cursor is not None:
+            queryset = queryset.filter(id__gt=cursor)
+        return [queryset.order_by('id')]
+    
+    field = ordering.lstrip('-')
+    descending = ordering.startswith('-')
+    lookup = 'lt' if descending else 'gt'
+    value, last_id = cursor if cursor is not None else (None, None)
+    
+    querysets = []
+    if cursor is None or value is not None:
+        ranged = queryset.filter(due_date__isnull=False) if field == 'due_date' else queryset
+        if cursor is not None:
+            ranged = ranged.filter(Q(**{f'{field}__{lookup}': value}) | Q(**{field: value, f'id__{lookup}': last_id}))
+        querysets.append(ranged.order_by(ordering, '-id' if descending else 'id'))
+    if field == 'due_date':
+        undated = queryset.filter(due_date__isnull=True)
+        if cursor is not None and value is None:
+            undated = undated.filter(id__gt=last_id)
+        querysets.append(undated.order_by('id'))
+    return querysets
+
+def _page_from_rows(rows, ordering, limit):
+    """
+    Split up to ``limit + 1`` database rows into (rows, next_cursor), the rows
+    normalized so that they match pages served from the cache
+    """
+    page = [task_list_cache.normalize_row(row) for row in rows[:limit]]
+    if len(rows) <= limit:
+        return page, None
+    last = page[-1]
+    if ordering == 'id':
+        return page, last['id']
+    value = last[ordering.lstrip('-')]
+    return page, f"{'' if value is None else value}~{last['id']}"
+
+def _fetch_page(querysets, ordering, limit):
+    """Read one page from the database, one extra row telling whether another follows"""
+    rows = []
+    for queryset in querysets:
+        rows += list(queryset.values()[:limit + 1 - len(rows)])
+        if len(rows) > limit:
+            break
+    return _page_from_rows(rows, ordering, limit)
+
+def _encode_row(row, fmt, first):
+    encoded = json.dumps(row, cls=DjangoJSONEncoder)
+    if fmt == 'ndjson':
+        return encoded + '\n'
+    return encoded if first else ',' + encoded
+
+def _page_response(request, tasks, next_cursor, limit):
+    """
+    A page of the task list. Every page says whether more follow, so clients
+    written for the unpaginated list can tell that they got a partial result.
+    """
+    response = JsonResponse(tasks, safe=False)
+    response['X-Page-Limit'] = str(limit)
+    response['X-Has-More'] = 'false' if next_cursor is None else 'true'
+    if next_cursor is not None:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        response['X-Next-Cursor'] = str(next_cursor)
+        response['Link'] = f'<{request.build_absolute_uri(request.path)}?{params.urlencode()}>; rel="next"'
+    return response
 
-# Memoization decorator
-def memoize(func):
-    def wrapper(*args, **kwargs):
-        cache_key = f"{func.__name__}_{args}_{kwargs}"
-        cached_result = redis_client.get(cache_key)
-        if cached_result:
-            return JsonResponse(json.loads(cached_result))
-        result = func(*args, **kwargs)
-        redis_client.set(cache_key, json.dumps(result.content.decode()), ex=60*5)  # Cache for 5 minutes
-        return result
-    return wrapper
+def _etag(kind, validators, variant=''):
+    """Strong ETag for a validator pair from task_list_cache.get_validators."""
+    version, modified = validators
+    tag = f"{kind}-{version}-{int(modified * 1e6):x}"
+    if variant:
+        # Pages and filters of the list are distinct representations
+        tag += '-' + hashlib.blake2b(variant.encode(), digest_size=8).hexdigest()
+    return f'"{tag}"'
+
+def _not_modified(request, etag, validators):
+    """Return a 304/412 response for a matching conditional request, else None."""
+    response = get_conditional_response(request, etag=etag, last_modified=int(validators[1]))
+    if response is not None:
+        _set_validators(response, etag, validators)
+    return response
+
+def _set_validators(response, etag, validators):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(int(validators[1]))
+    return response
+
+def _stream_tasks(querysets, fmt):
+    """Yield the querysets as NDJSON or a JSON array without loading them all"""
+    rows = chain.from_iterable(
+        queryset.values().iterator(chunk_size=TASKS_STREAM_CHUNK_SIZE) for queryset in querysets
+    )
+    
+    if fmt == 'json':
+        yield '['
+    
+    buffer = []
+    first = True
+    for row in rows:
+        buffer.append(_encode_row(row, fmt, first))
+        first = False
+        if len(buffer) >= TASKS_STREAM_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+    
+    if buffer:
+        yield ''.join(buffer)
+    if fmt == 'json':
+        yield ']'
 
 @swagger_auto_schema(
     method='get',
-    operation_description="Get all tasks with Redis caching",
-    responses={200: openapi.Response('List of tasks')}
+    operation_description=(
+        "Get tasks with keyset pagination and Redis caching, filtered by user, status, "
+        "priority, due date or completion and ordered by id, priority or due date. "
+        f"Responses are pages of at most `limit` tasks ({TASKS_PAGE_SIZE} by default), "
+        "not the whole list: every page carries X-Page-Limit and X-Has-More, and while "
+        "X-Has-More is true, pass the X-Next-Cursor header as `cursor` (or follow the "
+        "rel=\"next\" Link) to fetch the next page. "
+        "`stream=ndjson` or `stream=json` streams the whole filtered list instead. "
+        "Responses carry ETag and Last-Modified; a matching If-None-Match or "
+        "If-Modified-Since is answered with 304."
+    ),
+    manual_parameters=[
+        openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          description="X-Next-Cursor of the previous page"),
+        openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                          description=f"Page size, at most {TASKS_MAX_PAGE_SIZE}"),
+        openapi.Parameter('ordering', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          enum=list(TASK_ORDERINGS)),
+        openapi.Parameter('completed', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN),
+        openapi.Parameter('user', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          description="User id, or `me`"),
+        openapi.Parameter('status', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          enum=list(TASK_STATUSES)),
+        openapi.Parameter('priority', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        openapi.Parameter('due_date', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+        openapi.Parameter('due_after', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+        openapi.Parameter('due_before', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+        openapi.Parameter('stream', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          enum=['ndjson', 'json']),
+    ],
+    responses={
+        200: openapi.Response('List of tasks'),
+        304: openapi.Response('Not modified since the ETag or date sent by the client'),
+        400: openapi.Response('Invalid query parameters'),
+    }
 )
 @api_view(['GET'])
-@cache_page(60 * 15)  # Cache page for 15 minutes
 def get_tasks(request):
-    tasks = cache.get('tasks')
-    if not tasks:
-        tasks = list(Task.objects.all().values())
-        cache.set('tasks', tasks, timeout=60*15)  # Cache for 15 minutes
-    return JsonResponse(tasks, safe=False)
+    try:
+        filters, ordering, cursor, limit = _list_params(request.GET, request.user)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    
+    # Answer an unchanged poll from the validators alone, before any query
+    canonical = task_list_cache.canonical_query(filters, ordering, cursor, limit)
+    validators = task_list_cache.get_validators()
+    if validators is not None:
+        etag = _etag('tasks', validators, canonical + request.GET.get('stream', ''))
+        not_modified = _not_modified(request, etag, validators)
+        if not_modified is not None:
+            return not_modified
+    
+    querysets = _page_querysets(Task.objects.filter(**filters), ordering, cursor)
+    
+    stream = request.GET.get('stream')
+    if stream:
+        if stream not in ('ndjson', 'json'):
+            return JsonResponse({'status': 'error', 'message': 'stream must be ndjson or json'}, status=400)
+        content_type = 'application/x-ndjson' if stream == 'ndjson' else 'application/json'
+        response = StreamingHttpResponse(_stream_tasks(querysets, stream), content_type=content_type)
+    elif task_list_cache.serves(filters, ordering):
+        page = task_list_cache.get_page(filters, cursor, limit)
+        if page is None:
+            # Cache unavailable or being rebuilt
+            page = _fetch_page(querysets, ordering, limit)
+        response = _page_response(request, *page, limit)
+    else:
+        # Other filters and orderings are cached per normalized query
+        key = task_list_cache.query_key(validators, canonical) if validators is not None else None
+        page = task_list_cache.get_query_page(key) if key else None
+        if page is None:
+            page = _fetch_page(querysets, ordering, limit)
+            if key:
+                task_list_cache.set_query_page(key, page)
+        response = _page_response(request, *page, limit)
+    
+    # Validators read before the data: a write in between only makes the
+    # next poll download again
+    if validators is not None:
+        _set_validators(response, etag, validators)
+    return response
+
+@swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Get one task from the Redis cache. Responses carry ETag and Last-Modified; "
+        "a matching If-None-Match or If-Modified-Since is answered with 304."
+    ),
+    responses={
+        200: openapi.Response('Task'),
+        304: openapi.Response('Not modified since the ETag or date sent by the client'),
+        404: openapi.Response('Task not found'),
+    }
+)
+@api_view(['GET'])
+def get_task(request, task_id):
+    validators = task_list_cache.get_validators(task_id)
+    if validators is not None:
+        etag = _etag('task', validators)
+        not_modified = _not_modified(request, etag, validators)
+        if not_modified is not None:
+            return not_modified
+    
+    try:
+        task = Task.get_cached_task(task_id)
+    except Task.DoesNotExist:
+        return JsonResponse({'status': 'error', 'message': 'Task not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    
+    response = JsonResponse(task)
+    if validators is not None:
+        _set_validators(response, etag, validators)
+    return response
 
 @swagger_auto_schema(
     method='post',
@@ -54,6 +363,9 @@ def get_tasks(request):
             'title': openapi.Schema(type=openapi.TYPE_STRING),
             'description': openapi.Schema(type=openapi.TYPE_STRING),
             'completed': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+            'status': openapi.Schema(type=openapi.TYPE_STRING, enum=list(TASK_STATUSES)),
+            'priority': openapi.Schema(type=openapi.TYPE_INTEGER, enum=list(TASK_PRIORITIES)),
+            'due_date': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
         }
     ),
     responses={
@@ -65,25 +377,16 @@ def get_tasks(request):
 @csrf_exempt
 def create_task(request):
     try:
-        data = json.loads(request.body)
-        task = Task.objects.create(
-            title=data.get('title', ''),
-            description=data.get('description', ''),
-            completed=data.get('completed', False)
-        )
+        fields = _validate_task_fields(json.loads(request.body))
+        with task_list_cache.maintained_writes():
+            task = Task.objects.create(**{'title': '', 'description': '', **fields}, user=_owner(request))
         
         # Cache the individual task
-        task_dict = {
-            'id': task.id,
-            'title': task.title,
-            'description': task.description,
-            'completed': task.completed
-        }
-        cache_key = f"task_{task.id}"
-        redis_client.set(cache_key, json.dumps(task_dict), ex=60*15)
+        task.cache_task()
         
-        # Invalidate the tasks list cache
-        cache.delete('tasks')
+        # Patch the task's entries in the search index and cached list
+        task_search.index_tasks([task])
+        task_list_cache.upsert_tasks([task])
         
         return JsonResponse({'status': 'Task created', 'task_id': task.id})
     except Exception as e:
@@ -98,6 +401,9 @@ def create_task(request):
             'title': openapi.Schema(type=openapi.TYPE_STRING),
             'description': openapi.Schema(type=openapi.TYPE_STRING),
             'completed': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+            'status': openapi.Schema(type=openapi.TYPE_STRING, enum=list(TASK_STATUSES)),
+            'priority': openapi.Schema(type=openapi.TYPE_INTEGER, enum=list(TASK_PRIORITIES)),
+            'due_date': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
         }
     ),
     responses={
@@ -111,30 +417,22 @@ def create_task(request):
 def update_task(request, task_id):
     try:
         task = Task.objects.get(id=task_id)
-        data = json.loads(request.body)
+        fields = _validate_task_fields(json.loads(request.body))
+        previous = {task.id: task_stats.state(task)}
         
         # Update task fields
-        if 'title' in data:
-            task.title = data['title']
-        if 'description' in data:
-            task.description = data['description']
-        if 'completed' in data:
-            task.completed = data['completed']
+        for field, value in fields.items():
+            setattr(task, field, value)
         
-        task.save()
+        with task_list_cache.maintained_writes():
+            task.save()
         
         # Update task in cache
-        task_dict = {
-            'id': task.id,
-            'title': task.title,
-            'description': task.description,
-            'completed': task.completed
-        }
-        cache_key = f"task_{task.id}"
-        redis_client.set(cache_key, json.dumps(task_dict), ex=60*15)
+        task.cache_task()
         
-        # Invalidate the tasks list cache
-        cache.delete('tasks')
+        # Patch the task's entries in the search index and cached list
+        task_search.index_tasks([task])
+        task_list_cache.upsert_tasks([task], previous)
         
         return JsonResponse({'status': 'Task updated', 'task_id': task.id})
     except Task.DoesNotExist:
@@ -157,14 +455,17 @@ def delete_task(request, task_id):
     try:
         task = Task.objects.get(id=task_id)
         task_id = task.id
-        task.delete()
+        previous = task_stats.state(task)
+        with task_list_cache.maintained_writes():
+            task.delete()
         
         # Remove task from cache
         cache_key = f"task_{task_id}"
         redis_client.delete(cache_key)
         
-        # Invalidate the tasks list cache
-        cache.delete('tasks')
+        # Drop the task from the search index and cached list
+        task_search.remove_tasks([task_id])
+        task_list_cache.remove_tasks([task_id], [previous])
         
         return JsonResponse({'status': 'Task deleted', 'task_id': task_id})
     except Task.DoesNotExist:
@@ -172,20 +473,353 @@ def delete_task(request, task_id):
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
 
+def _parse_bulk_items(request, key):
+    """
+    Return the list of items from a bulk request body, or an error response.
+
+    The body is either a JSON array or an object holding the array under ``key``.
+    """
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return None, JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+    
+    items = data.get(key) if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return None, JsonResponse({'status': 'error', 'message': f'Expected a non-empty list of {key}'}, status=400)
+    if len(items) > TASKS_BULK_MAX_ITEMS:
+        return None, JsonResponse(
+            {'status': 'error', 'message': f'At most {TASKS_BULK_MAX_ITEMS} items per request'}, status=400
+        )
+    return items, None
+
+def _validate_task_fields(item, require_title=False):
+    """Return the task fields in ``item`` or raise ValueError"""
+    if not isinstance(item, dict):
+        raise ValueError('Each item must be an object')
+    if require_title and not item.get('title'):
+        raise ValueError('title is required')
+    
+    fields = {field: item[field] for field in TASK_FIELDS if field in item}
+    for field in ('title', 'description'):
+        if field in fields and not isinstance(fields[field], str):
+            raise ValueError(f'{field} must be a string')
+    if 'completed' in fields and not isinstance(fields['completed'], bool):
+        raise ValueError('completed must be a boolean')
+    if 'status' in fields and fields['status'] not in TASK_STATUSES:
+        raise ValueError(f"status must be one of {', '.join(TASK_STATUSES)}")
+    if 'priority' in fields and (isinstance(fields['priority'], bool) or fields['priority'] not in TASK_PRIORITIES):
+        raise ValueError(f"priority must be one of {', '.join(map(str, TASK_PRIORITIES))}")
+    if fields.get('due_date') is not None:
+        fields['due_date'] = _parse_date(fields['due_date'])
+    return fields
+
+def _owner(request):
+    """User new tasks belong to"""
+    user = getattr(request, 'user', None)
+    return user if user is not None and user.is_authenticated else None
+
+def _bulk_response(results):
+    failed = sum(1 for result in results if result['status'] == 'error')
+    return JsonResponse({
+        'status': 'ok' if not failed else 'partial',
+        'succeeded': len(results) - failed,
+        'failed': failed,
+        'results': results,
+    })
+
+bulk_item_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'title': openapi.Schema(type=openapi.TYPE_STRING),
+        'description': openapi.Schema(type=openapi.TYPE_STRING),
+        'completed': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+        'status': openapi.Schema(type=openapi.TYPE_STRING, enum=list(TASK_STATUSES)),
+        'priority': openapi.Schema(type=openapi.TYPE_INTEGER, enum=list(TASK_PRIORITIES)),
+        'due_date': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+    }
+)
+
+@swagger_auto_schema(
+    method='post',
+    operation_description="Create many tasks in one request with a single INSERT batch and Redis pipeline",
+    request_body=openapi.Schema(type=openapi.TYPE_ARRAY, items=bulk_item_schema),
+    responses={
+        200: openapi.Response('Per-item results'),
+        400: openapi.Response('Bad request'),
+    }
+)
+@api_view(['POST'])
+@csrf_exempt
+def bulk_create_tasks(request):
+    items, error = _parse_bulk_items(request, 'tasks')
+    if error:
+        return error
+    
+    results = [None] * len(items)
+    pending = []
+    owner = _owner(request)
+    for index, item in enumerate(items):
+        try:
+            fields = _validate_task_fields(item, require_title=True)
+            pending.append((index, Task(**{'description': '', **fields}, user=owner)))
+        except ValueError as e:
+            results[index] = {'index': index, 'status': 'error', 'message': str(e)}
+    
+    try:
+        with transaction.atomic():
+            created = Task.objects.bulk_create([task for _, task in pending])
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    
+    for (index, _), task in zip(pending, created):
+        results[index] = {'index': index, 'status': 'created', 'task_id': task.id}
+    
+    try:
+        Task.cache_tasks(created)
+    except Exception as e:
+        logger.error(f"Error caching bulk created tasks: {str(e)}")
+    task_search.index_tasks(created)
+    task_list_cache.upsert_tasks(created)
+    
+    return _bulk_response(results)
+
+@swagger_auto_schema(
+    method='put',
+    operation_description="Update many tasks in one request; each item must carry its id",
+    request_body=openapi.Schema(
+        type=openapi.TYPE_ARRAY,
+        items=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['id'],
+            properties={'id': openapi.Schema(type=openapi.TYPE_INTEGER), **bulk_item_schema.properties},
+        )
+    ),
+    responses={
+        200: openapi.Response('Per-item results'),
+        400: openapi.Response('Bad request'),
+    }
+)
+@api_view(['PUT'])
+@csrf_exempt
+def bulk_update_tasks(request):
+    items, error = _parse_bulk_items(request, 'tasks')
+    if error:
+        return error
+    
+    results = [None] * len(items)
+    updates = {}
+    for index, item in enumerate(items):
+        try:
+            fields = _validate_task_fields(item)
+            task_id = item.get('id')
+            if not isinstance(task_id, int) or isinstance(task_id, bool):
+                raise ValueError('id must be an integer')
+            if task_id in updates:
+                raise ValueError('Duplicate id in request')
+            updates[task_id] = (index, fields)
+        except ValueError as e:
+            results[index] = {'index': index, 'status': 'error', 'message': str(e)}
+    
+    try:
+        with transaction.atomic():
+            tasks = Task.objects.select_for_update().in_bulk(list(updates))
+            previous = {task_id: task_stats.state(task) for task_id, task in tasks.items()}
+            # bulk_update() does not apply auto_now
+            changed_fields = {'updated_at'}
+            now = timezone.now()
+            for task_id, (index, fields) in updates.items():
+                task = tasks.get(task_id)
+                if task is None:
+                    results[index] = {'index': index, 'status': 'error', 'task_id': task_id, 'message': 'Task not found'}
+                    continue
+                for field, value in fields.items():
+                    setattr(task, field, value)
+                task.updated_at = now
+                changed_fields.update(fields)
+                results[index] = {'index': index, 'status': 'updated', 'task_id': task_id}
+            
+            updated = [tasks[task_id] for task_id in updates if task_id in tasks]
+            if updated:
+                Task.objects.bulk_update(updated, sorted(changed_fields))
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    
+    try:
+        Task.cache_tasks(updated)
+    except Exception as e:
+        logger.error(f"Error caching bulk updated tasks: {str(e)}")
+    task_search.index_tasks(updated)
+    task_list_cache.upsert_tasks(updated, previous)
+    
+    return _bulk_response(results)
+
+@swagger_auto_schema(
+    method='delete',
+    operation_description="Delete many tasks in one request",
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['ids'],
+        properties={'ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER))}
+    ),
+    responses={
+        200: openapi.Response('Per-item results'),
+        400: openapi.Response('Bad request'),
+    }
+)
+@api_view(['DELETE'])
+@csrf_exempt
+def bulk_delete_tasks(request):
+    task_ids, error = _parse_bulk_items(request, 'ids')
+    if error:
+        return error
+    
+    valid_ids = [task_id for task_id in task_ids if isinstance(task_id, int) and not isinstance(task_id, bool)]
+    try:
+        with transaction.atomic(), task_list_cache.maintained_writes():
+            # id -> task_stats.state() of the tasks being deleted
+            existing = {
+                row[0]: row[1:]
+                for row in Task.objects.filter(id__in=valid_ids).values_list('id', *task_stats.STATE_FIELDS)
+            }
+            Task.objects.filter(id__in=existing).delete()
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    
+    results = []
+    for index, task_id in enumerate(task_ids):
+        if not isinstance(task_id, int) or isinstance(task_id, bool):
+            results.append({'index': index, 'status': 'error', 'message': 'id must be an integer'})
+        elif task_id in existing:
+            results.append({'index': index, 'status': 'deleted', 'task_id': task_id})
+        else:
+            results.append({'index': index, 'status': 'error', 'task_id': task_id, 'message': 'Task not found'})
+    
+    try:
+        Task.uncache_tasks(existing)
+    except Exception as e:
+        logger.error(f"Error evicting bulk deleted tasks: {str(e)}")
+    task_search.remove_tasks(existing)
+    task_list_cache.remove_tasks(existing, existing.values())
+    
+    return _bulk_response(results)
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Get many tasks by id with one Redis MGET, keeping the requested order",
+    manual_parameters=[
+        openapi.Parameter('ids', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                          description="Comma separated task ids, e.g. 3,1,2"),
+    ],
+    responses={
+        200: openapi.Response('Tasks in the requested order'),
+        400: openapi.Response('Bad request'),
+    }
+)
+@api_view(['GET'])
+def get_tasks_batch(request):
+    try:
+        task_ids = [int(task_id) for task_id in request.GET.get('ids', '').split(',') if task_id.strip()]
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'ids must be comma separated integers'}, status=400)
+    if not task_ids:
+        return JsonResponse({'status': 'error', 'message': 'ids is required'}, status=400)
+    if len(task_ids) > TASKS_BULK_MAX_ITEMS:
+        return JsonResponse(
+            {'status': 'error', 'message': f'At most {TASKS_BULK_MAX_ITEMS} ids per request'}, status=400
+        )
+    
+    try:
+        tasks = Task.get_cached_tasks(task_ids)
+    except Exception as e:
+        logger.error(f"Error fetching cached tasks: {str(e)}")
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    
+    found = {task['id'] for task in tasks}
+    return JsonResponse({
+        'tasks': tasks,
+        'missing': [task_id for task_id in dict.fromkeys(task_ids) if task_id not in found],
+    })
+
+TASK_SEARCH_MAX_LIMIT = 100
+
+def _task_list_version(request):
+    """Memoization version that changes with every task write"""
+    validators = task_list_cache.get_validators()
+    return None if validators is None else f"{validators[0]}-{validators[1]}"
+
 @swagger_auto_schema(
     method='get',
-    operation_description="Get frequently accessed data with memoization caching",
+    operation_description=(
+        "Full-text search over task titles and descriptions, best matches first. "
+        "With `prefix=true` the last word also matches longer words it starts, for autocomplete."
+    ),
+    manual_parameters=[
+        openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+        openapi.Parameter('prefix', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN),
+        openapi.Parameter('offset', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                          description=f"Page size, at most {TASK_SEARCH_MAX_LIMIT}"),
+    ],
+    responses={
+        200: openapi.Response('Matching tasks with their score and the total number of matches'),
+        400: openapi.Response('Invalid query parameters'),
+    }
+)
+@api_view(['GET'])
+def search_tasks(request):
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'status': 'error', 'message': 'q is required'}, status=400)
+    try:
+        prefix = _parse_bool(request.GET.get('prefix', 'false'))
+        offset = int(request.GET.get('offset', 0))
+        limit = min(int(request.GET.get('limit', 20)), TASK_SEARCH_MAX_LIMIT)
+        if offset < 0 or limit < 1:
+            raise ValueError("offset must be >= 0 and limit >= 1")
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    
+    try:
+        total, hits = task_search.search(query, prefix=prefix, offset=offset, limit=limit)
+        tasks = {task['id']: task for task in Task.get_cached_tasks([task_id for task_id, _ in hits])}
+    except Exception as e:
+        logger.error(f"Error searching tasks: {str(e)}")
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    
+    return JsonResponse({
+        'query': query,
+        'total': total,
+        'results': [{**tasks[task_id], 'score': score} for task_id, score in hits if task_id in tasks],
+    })
+
+@swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Get frequently accessed data with memoization caching. Task counts come from "
+        "counters maintained in Redis by every write, globally and for the requesting user."
+    ),
     responses={200: openapi.Response('Frequently accessed data')}
 )
 @api_view(['GET'])
-@memoize
+@memoize_response('frequently-accessed-data', timeout=60*5, version=_task_list_version)
 def frequently_accessed_data(request):
-    # Example implementation of frequently accessed data
+    user_id = request.user.id if request.user.is_authenticated else None
+    try:
+        stats, user_stats = task_stats.get_stats(user_id)
+    except Exception as e:
+        logger.error(f"Error reading task counters: {str(e)}")
+        stats, user_stats = task_stats.get_stats_from_db(user_id)
+    
     data = {
         'data': 'Frequently accessed data',
         'stats': {
-            'total_tasks': Task.objects.count(),
-            'completed_tasks': Task.objects.filter(completed=True).count()
+            'total_tasks': stats['total'],
+            'completed_tasks': stats['completed'],
+            'by_status': stats['by_status'],
+            'by_priority': stats['by_priority'],
         }
     }
+    if user_stats is not None:
+        data['user_stats'] = user_stats
     return JsonResponse(data)
\ No newline at end of file
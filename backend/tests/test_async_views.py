@@ -0,0 +1,55 @@
+import json
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from task_manager.models import Task, redis_client
+
+@pytest.fixture
+def async_client(test_user):
+    client = AsyncClient()
+    client.force_login(test_user)
+    return client
+
+@pytest.mark.django_db
+def test_async_task_crud(async_client):
+    @async_to_sync
+    async def scenario():
+        created = await async_client.post(
+            reverse('async-create-task'), {'title': 'Async task'}, content_type='application/json'
+        )
+        task_id = created.json()['task_id']
+
+        await async_client.put(
+            reverse('async-update-task', args=[task_id]), {'completed': True}, content_type='application/json'
+        )
+        listed = await async_client.get(reverse('async-get-tasks'), {'completed': 'true'})
+        missing = await async_client.delete(reverse('async-delete-task', args=[task_id + 1]))
+        return task_id, listed, missing
+
+    task_id, listed, missing = scenario()
+    assert [task['id'] for task in listed.json()] == [task_id]
+    assert json.loads(redis_client.get(f"task_{task_id}"))['completed'] is True
+    assert missing.status_code == 404
+    assert Task.objects.get(id=task_id).completed
+
+@pytest.mark.django_db
+def test_async_stream(async_client):
+    tasks = [Task.objects.create(title=f"Task {i}", description='') for i in range(3)]
+
+    @async_to_sync
+    async def stream():
+        response = await async_client.get(reverse('async-get-tasks'), {'stream': 'ndjson'})
+        return b''.join([chunk async for chunk in response.streaming_content])
+
+    rows = [json.loads(line) for line in stream().decode().splitlines()]
+    assert [row['id'] for row in rows] == [task.id for task in tasks]
+
+@pytest.mark.django_db
+def test_async_views_require_authentication():
+    response = async_to_sync(AsyncClient().get)(reverse('async-get-tasks'))
+    assert response.status_code == 401
+
+def test_async_status_pings_redis():
+    response = async_to_sync(AsyncClient().get)(reverse('api-async-status'))
+    assert response.json()['redis'] == 'Connected'
@@ -0,0 +1,79 @@
+import json
+import pytest
+from django.urls import reverse
+from task_manager.models import Task, redis_client
+
+@pytest.mark.django_db
+def test_bulk_create_reports_per_item_results(authenticated_client, django_assert_max_num_queries):
+    items = [{'title': f"Imported {i}"} for i in range(50)] + [{'description': 'no title'}]
+
+    # One INSERT for the whole batch, independent of its size
+    with django_assert_max_num_queries(5):
+        response = authenticated_client.post(reverse('bulk-create-tasks'), items, format='json')
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body['succeeded'] == 50 and body['failed'] == 1
+    assert body['results'][-1] == {'index': 50, 'status': 'error', 'message': 'title is required'}
+
+    task_id = body['results'][0]['task_id']
+    assert json.loads(redis_client.get(f"task_{task_id}"))['title'] == 'Imported 0'
+    assert len(authenticated_client.get(reverse('get-tasks'), {'limit': 100}).json()) == 50
+
+@pytest.mark.django_db
+def test_bulk_update_and_delete(authenticated_client):
+    tasks = [Task.objects.create(title=f"Task {i}", description='') for i in range(3)]
+
+    response = authenticated_client.put(reverse('bulk-update-tasks'), [
+        {'id': tasks[0].id, 'completed': True},
+        {'id': tasks[1].id, 'title': 'Renamed'},
+        {'id': 999999, 'title': 'Missing'},
+    ], format='json')
+    statuses = [result['status'] for result in response.json()['results']]
+    assert statuses == ['updated', 'updated', 'error']
+    assert Task.objects.get(id=tasks[0].id).completed
+    assert json.loads(redis_client.get(f"task_{tasks[1].id}"))['title'] == 'Renamed'
+
+    response = authenticated_client.delete(
+        reverse('bulk-delete-tasks'), {'ids': [tasks[0].id, tasks[2].id, 999999]}, format='json'
+    )
+    assert response.json()['succeeded'] == 2
+    assert list(Task.objects.values_list('id', flat=True)) == [tasks[1].id]
+    assert redis_client.get(f"task_{tasks[0].id}") is None
+
+    listed = authenticated_client.get(reverse('get-tasks')).json()
+    assert [task['id'] for task in listed] == [tasks[1].id]
+
+@pytest.mark.django_db
+def test_bulk_rejects_oversized_batches(authenticated_client, monkeypatch):
+    monkeypatch.setattr('task_manager.views.TASKS_BULK_MAX_ITEMS', 2)
+    response = authenticated_client.post(
+        reverse('bulk-create-tasks'), [{'title': 'a'}, {'title': 'b'}, {'title': 'c'}], format='json'
+    )
+    assert response.status_code == 400
+
+@pytest.mark.django_db
+def test_get_cached_tasks_batches_misses(django_assert_num_queries):
+    tasks = [Task.objects.create(title=f"Task {i}", description='') for i in range(4)]
+    tasks[1].cache_task()
+    redis_client.delete(*[f"task_{task.id}" for task in tasks if task is not tasks[1]])
+
+    order = [tasks[3].id, tasks[1].id, 999999, tasks[0].id]
+    with django_assert_num_queries(1):
+        result = Task.get_cached_tasks(order)
+    assert [task['id'] for task in result] == [tasks[3].id, tasks[1].id, tasks[0].id]
+
+    # The misses were backfilled, so the second call never hits the database
+    with django_assert_num_queries(0):
+        assert Task.get_cached_tasks([tasks[0].id, tasks[3].id])[1]['title'] == 'Task 3'
+    assert redis_client.ttl(f"task_{tasks[0].id}") > 0
+
+@pytest.mark.django_db
+def test_batch_endpoint_keeps_requested_order(authenticated_client):
+    tasks = [Task.objects.create(title=f"Task {i}", description='') for i in range(3)]
+    response = authenticated_client.get(
+        reverse('get-tasks-batch'), {'ids': f"{tasks[2].id},{tasks[0].id},999999"}
+    )
+    body = response.json()
+    assert [task['id'] for task in body['tasks']] == [tasks[2].id, tasks[0].id]
+    assert body['missing'] == [999999]
\ No newline at end of file
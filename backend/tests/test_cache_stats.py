@@ -0,0 +1,49 @@
+import uuid
+import pytest
+from django.urls import reverse
+from core.cache.stats import CacheStats, key_prefix
+from core.cache.utils import redis_client
+from core.cache import get_cache, set_cache
+from task_manager.models import Task
+
+@pytest.fixture
+def stats():
+    recorder = CacheStats(redis_client, key_prefix=f"test:{uuid.uuid4()}")
+    yield recorder
+    recorder.reset()
+
+def test_key_prefix():
+    assert key_prefix('task_42') == 'task'
+    assert key_prefix('tasks') == 'tasks'
+    assert key_prefix('user-detail:7') == 'user-detail'
+    assert key_prefix(b'tasks-list:/api/tasks/:page=2') == 'tasks-list'
+
+def test_snapshot_merges_counters_and_latency(stats):
+    stats.record_get('task_1', True, 0.0003)
+    stats.record_get('task_2', False, 0.0004)
+    stats.record_get('task_3', True, 0.00001, local=True)
+    stats.record_set('task_2', 100, 0.0008)
+    stats.record_set('task_3', None, 0.0008)
+    stats.record_invalidation('task_3')
+
+    task = stats.snapshot()['task']
+    assert (task['hits'], task['local_hits'], task['misses']) == (1, 1, 1)
+    assert task['hit_ratio'] == round(2 / 3, 4)
+    assert (task['sets'], task['avg_set_bytes'], task['bytes_written']) == (2, 100, 200)
+    assert task['invalidations'] == 1
+    assert task['latency_ms']['set'] == {'p50': 1.0, 'p95': 1.0, 'p99': 1.0}
+
+@pytest.mark.django_db
+def test_admin_endpoint_reports_prefixes(admin_client, authenticated_client, cache_key_prefix):
+    set_cache(f"{cache_key_prefix}:value", 1)
+    get_cache(f"{cache_key_prefix}:value")
+    task = Task.objects.create(title="Cached task", description="", completed=False)
+    Task.get_cached_task(task.id)
+
+    assert authenticated_client.get(reverse('api-cache-stats')).status_code == 403
+
+    response = admin_client.get(reverse('api-cache-stats'))
+    assert response.status_code == 200
+    prefixes = response.json()['prefixes']
+    assert prefixes['test']['hits'] >= 1
+    assert prefixes['task']['sets'] >= 1
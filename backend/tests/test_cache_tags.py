@@ -0,0 +1,83 @@
+import pytest
+from django.core.cache import cache
+from core.cache.tags import key_tags
+from core.cache.utils import get_cache, set_cache, invalidate_cache_prefix, tag_index
+
+def test_key_tags_uses_leading_segments():
+    assert key_tags('user-list', 3) == ['user-list']
+    assert key_tags('user-detail:5:/api/x:user:5', 2) == ['user-detail', 'user-detail:5']
+
+def test_can_invalidate_only_shallow_prefixes():
+    assert tag_index.can_invalidate('user-list')
+    assert tag_index.can_invalidate('user-detail:5:')
+    assert tag_index.can_invalidate('tasks:user:1:*')
+    assert not tag_index.can_invalidate('a:b:c:d')
+    assert not tag_index.can_invalidate('task_*_detail')
+    assert not tag_index.can_invalidate('task_*')
+
+@pytest.mark.django_db
+def test_invalidate_prefix_removes_only_tagged_keys():
+    set_cache('user-detail:1:/api/accounts/profile/', {'id': 1}, 60)
+    set_cache('user-detail:1:/api/accounts/other/', {'id': 1}, 60)
+    set_cache('user-detail:2:/api/accounts/profile/', {'id': 2}, 60)
+    set_cache('user-list', [1, 2], 60)
+
+    assert invalidate_cache_prefix('user-detail:1') == 2
+
+    assert get_cache('user-detail:1:/api/accounts/profile/') is None
+    assert get_cache('user-detail:1:/api/accounts/other/') is None
+    assert get_cache('user-detail:2:/api/accounts/profile/') == {'id': 2}
+    assert get_cache('user-list') == [1, 2]
+
+@pytest.mark.django_db
+def test_backfill_indexes_existing_keys():
+    # Written directly, bypassing set_cache, like keys cached before the index existed
+    cache.set('user-profile:7:/api/accounts/profile/', {'id': 7}, 60)
+
+    assert tag_index.backfill('user-profile:') == 1
+    assert invalidate_cache_prefix('user-profile:7') == 1
+    assert cache.get('user-profile:7:/api/accounts/profile/') is None
+
+@pytest.mark.django_db
+def test_partial_segment_prefix_walks_keyspace():
+    set_cache('task_41', {'id': 41}, 60)
+    set_cache('task_42', {'id': 42}, 60)
+
+    assert invalidate_cache_prefix('task_') == 0
+    assert invalidate_cache_prefix('task_*') >= 2
+    assert get_cache('task_41') is None
+
+@pytest.mark.django_db
+def test_tags_expire_with_their_longest_lived_member():
+    set_cache('report:1:short', 1, 30)
+    set_cache('report:1:long', 2, 300)
+    tag_key = tag_index.tag_key('report:1')
+    assert 290 < tag_index.client.ttl(tag_key) <= 302
+
+    # A member without expiry keeps the tag forever
+    set_cache('report:1:forever', 3, None)
+    assert tag_index.client.ttl(tag_key) == -1
+
+@pytest.mark.django_db
+def test_delete_cache_removes_index_members():
+    from core.cache.utils import delete_cache
+
+    set_cache('report:2:a', 1, 60)
+    delete_cache('report:2:a')
+
+    assert tag_index.client.zcard(tag_index.tag_key('report:2')) == 0
+
+@pytest.mark.django_db
+def test_backend_deletes_remove_index_members():
+    from core.cache.backends import HierarchicalRedisCache
+
+    backend = HierarchicalRedisCache('', {})
+    tag_key = backend._tags.tag_key('report:3')
+
+    backend.set('report:3:a', 1, 60)
+    assert backend.delete('report:3:a')
+    assert backend._client.zcard(tag_key) == 0
+
+    backend.set_many({'report:3:b': 2, 'report:3:c': 3}, 60)
+    backend.delete_many(['report:3:b', 'report:3:c'])
+    assert backend._client.zcard(tag_key) == 0
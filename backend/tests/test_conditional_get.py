@@ -0,0 +1,84 @@
+import pytest
+from django.urls import reverse
+from task_manager.models import Task
+
+@pytest.fixture
+def tasks():
+    return [Task.objects.create(title=f"Task {i}", description='') for i in range(3)]
+
+@pytest.mark.django_db
+def test_unchanged_list_answered_without_queries(authenticated_client, tasks, django_assert_num_queries):
+    url = reverse('get-tasks')
+    response = authenticated_client.get(url)
+    etag = response['ETag']
+    assert response.status_code == 200 and response['Last-Modified']
+
+    with django_assert_num_queries(0):
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+
+    # Another filter or page is another representation
+    assert authenticated_client.get(url, {'completed': 'true'})['ETag'] != etag
+
+@pytest.mark.django_db
+def test_write_changes_list_etag(authenticated_client, tasks):
+    url = reverse('get-tasks')
+    etag = authenticated_client.get(url)['ETag']
+
+    authenticated_client.put(
+        reverse('update-task', args=[tasks[0].id]),
+        {'title': 'Renamed', 'completed': True}, format='json'
+    )
+    response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert response.json()[0]['title'] == 'Renamed'
+
+@pytest.mark.django_db
+def test_task_detail_validators(authenticated_client, tasks):
+    url = reverse('get-task', args=[tasks[1].id])
+    response = authenticated_client.get(url)
+    assert response.status_code == 200
+    assert response.json()['id'] == tasks[1].id
+    etag = response['ETag']
+
+    assert authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert authenticated_client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code == 304
+
+    # Only writes to this task change its ETag
+    authenticated_client.delete(reverse('delete-task', args=[tasks[2].id]))
+    assert authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    authenticated_client.put(
+        reverse('update-task', args=[tasks[1].id]),
+        {'title': 'Changed', 'completed': False}, format='json'
+    )
+    assert authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+@pytest.mark.django_db
+def test_missing_task_is_404(authenticated_client):
+    assert authenticated_client.get(reverse('get-task', args=[999999])).status_code == 404
+
+@pytest.mark.django_db
+def test_writes_outside_the_views_change_etags(authenticated_client, tasks, django_capture_on_commit_callbacks):
+    list_url = reverse('get-tasks')
+    detail_url = reverse('get-task', args=[tasks[0].id])
+    list_etag = authenticated_client.get(list_url)['ETag']
+    detail_etag = authenticated_client.get(detail_url)['ETag']
+
+    # As from the admin or a shell
+    with django_capture_on_commit_callbacks(execute=True):
+        tasks[0].title = 'Edited elsewhere'
+        tasks[0].save()
+
+    response = authenticated_client.get(list_url, HTTP_IF_NONE_MATCH=list_etag)
+    assert response.status_code == 200
+    assert response.json()[0]['title'] == 'Edited elsewhere'
+    response = authenticated_client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+    assert response.status_code == 200
+    assert response.json()['title'] == 'Edited elsewhere'
+
+    list_etag = authenticated_client.get(list_url)['ETag']
+    with django_capture_on_commit_callbacks(execute=True):
+        tasks[1].delete()
+    assert authenticated_client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).status_code == 200
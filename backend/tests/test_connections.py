@@ -0,0 +1,50 @@
+import threading
+import time
+import pytest
+import redis
+from django.conf import settings
+from core.connections import InstrumentedConnectionPool, get_connection_pool, get_redis_client
+
+def make_pool(**kwargs):
+    return InstrumentedConnectionPool(
+        role='test',
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        password=settings.REDIS_PASSWORD,
+        **kwargs
+    )
+
+def test_clients_share_pool_per_role():
+    assert get_redis_client('cache').connection_pool is get_redis_client('cache').connection_pool
+    assert get_connection_pool('cache') is not get_connection_pool('tokens')
+
+def test_pool_records_wait_when_saturated():
+    pool = make_pool(max_connections=1, timeout=2)
+    held = pool.get_connection('PING')
+
+    def release_later():
+        time.sleep(0.1)
+        pool.release(held)
+
+    threading.Thread(target=release_later).start()
+    connection = pool.get_connection('PING')
+    pool.release(connection)
+
+    stats = pool.stats()
+    assert stats['checkouts'] == 2
+    assert stats['waits'] == 1
+    assert stats['max_wait_seconds'] >= 0.05
+    pool.disconnect()
+
+def test_pool_counts_exhaustion():
+    pool = make_pool(max_connections=1, timeout=0.05)
+    held = pool.get_connection('PING')
+
+    with pytest.raises(redis.ConnectionError):
+        pool.get_connection('PING')
+
+    assert pool.stats()['exhausted'] == 1
+    assert pool.stats()['saturation'] == 1.0
+    pool.release(held)
+    pool.disconnect()
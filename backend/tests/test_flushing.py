@@ -0,0 +1,30 @@
+import uuid
+import pytest
+from core.cache.utils import redis_client
+from core.flushing import RedisCounters
+
+@pytest.fixture
+def key():
+    key = f"test:{uuid.uuid4()}"
+    yield key
+    redis_client.delete(key)
+
+def test_failed_flush_is_merged_into_the_next(key, monkeypatch):
+    deltas = RedisCounters(redis_client, 'test-counters', flush_interval=60)
+    with deltas.lock:
+        deltas.counts[(key, 'requests')] += 2
+        deltas.counts[(key, 'seconds')] += 0.5
+        deltas.histogram(key, 'latency', 3)[1] += 1
+
+    def fail(*args, **kwargs):
+        raise ConnectionError("redis unavailable")
+
+    monkeypatch.setattr(deltas.redis_client, 'pipeline', fail)
+    deltas.flush()
+    monkeypatch.undo()
+
+    with deltas.lock:
+        deltas.counts[(key, 'requests')] += 1
+    deltas.flush()
+
+    assert redis_client.hgetall(key) == {'requests': '3', 'seconds': '0.5', 'latency|1': '1'}
@@ -0,0 +1,62 @@
+import json
+import logging
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from core.connections import get_redis_client
+from core.instrumentation import RequestProfile, current_profile
+from core.middleware import PerformanceMonitoringMiddleware
+from task_manager.models import Task
+
+@pytest.fixture
+def tasks():
+    return [
+        Task.objects.create(title=f"Task {i}", description=f"Description {i}", completed=(i >= 2))
+        for i in range(3)
+    ]
+
+def test_redis_calls_are_counted_only_inside_a_profile(cache_key_prefix):
+    client = get_redis_client('cache', decode_responses=True)
+    client.set(f"{cache_key_prefix}:a", 1)
+
+    profile = RequestProfile().activate()
+    try:
+        assert current_profile() is profile
+        client.get(f"{cache_key_prefix}:a")
+        client.get(f"{cache_key_prefix}:missing")
+        pipe = client.pipeline()
+        pipe.mget(f"{cache_key_prefix}:a", f"{cache_key_prefix}:b")
+        pipe.execute()
+    finally:
+        profile.deactivate()
+
+    client.get(f"{cache_key_prefix}:a")
+    client.delete(f"{cache_key_prefix}:a")
+    assert current_profile() is None
+    assert (profile.cache_calls, profile.cache_hits, profile.cache_misses) == (3, 2, 2)
+
+@pytest.mark.django_db
+def test_server_timing_breakdown(authenticated_client, tasks):
+    response = authenticated_client.get(reverse('get-tasks'))
+
+    timing = response['Server-Timing']
+    for metric in ('db;dur=', 'cache;dur=', 'app;dur=', 'total;dur='):
+        assert metric in timing
+
+@pytest.mark.django_db
+def test_repeated_statements_are_logged(tasks, caplog):
+    def view(request):
+        for task in tasks:
+            for _ in range(2):
+                Task.objects.filter(pk=task.pk).exists()
+        return HttpResponse()
+
+    caplog.set_level(logging.WARNING, logger='core.middleware.performance_middleware')
+    middleware = PerformanceMonitoringMiddleware(view)
+    response = middleware(RequestFactory().get('/api/tasks/'))
+
+    assert 'desc="6 queries"' in response['Server-Timing']
+    record = json.loads(caplog.records[-1].getMessage().removeprefix('Slow request: '))
+    assert record['db_queries'] == 6
+    assert record['n_plus_one'][0]['count'] == 6
@@ -0,0 +1,76 @@
+import json
+import time
+from core.cache.local import LocalCache, NearCache
+
+def test_local_cache_hits_and_misses():
+    local = LocalCache(max_entries=10, max_bytes=1024 * 1024, timeout=60)
+
+    assert local.get('tasks') is None
+    local.set('tasks', [{'id': 1, 'title': 'Task 1'}])
+    assert local.get('tasks') == [{'id': 1, 'title': 'Task 1'}]
+
+    stats = local.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['entries'] == 1
+
+def test_local_cache_returns_copies():
+    local = LocalCache(timeout=60)
+    local.set('task_1', {'title': 'Task 1'})
+
+    local.get('task_1')['title'] = 'Mutated'
+    assert local.get('task_1') == {'title': 'Task 1'}
+
+def test_local_cache_evicts_least_recently_used():
+    local = LocalCache(max_entries=2, timeout=60)
+    local.set('task_1', 1)
+    local.set('task_2', 2)
+
+    # Touch task_1 so task_2 becomes the eviction candidate
+    local.get('task_1')
+    local.set('task_3', 3)
+
+    assert local.get('task_2') is None
+    assert local.get('task_1') == 1
+    assert local.get('task_3') == 3
+    assert local.stats()['evictions'] == 1
+
+def test_local_cache_respects_byte_budget():
+    local = LocalCache(max_entries=100, max_bytes=300, timeout=60)
+    local.set('a', 'x' * 100)
+    local.set('b', 'y' * 100)
+    local.set('c', 'z' * 100)
+
+    assert local.stats()['bytes'] <= 300
+    assert local.get('a') is None
+
+    # Payloads larger than the whole budget are never stored
+    assert local.set('huge', 'x' * 1000) is False
+
+def test_local_cache_expires_entries():
+    local = LocalCache(timeout=0.05)
+    local.set('tasks', [1, 2, 3])
+    time.sleep(0.1)
+    assert local.get('tasks') is None
+
+def test_near_cache_applies_remote_invalidations():
+    near = NearCache(redis_client=None, channel='test', timeout=60)
+    near.local.set('user-detail:1:a', 1)
+    near.local.set('user-detail:1:b', 2)
+    near.local.set('task_1', 3)
+
+    message = {'origin': 'other-worker', 'op': 'prefix', 'target': 'user-detail:1'}
+    near._handle_message({'data': json.dumps(message)})
+
+    assert near.local.get('user-detail:1:a') is None
+    assert near.local.get('user-detail:1:b') is None
+    assert near.local.get('task_1') == 3
+
+def test_near_cache_ignores_own_messages():
+    near = NearCache(redis_client=None, channel='test', timeout=60)
+    near.local.set('task_1', 1)
+
+    message = {'origin': near._origin, 'op': 'key', 'target': 'task_1'}
+    near._handle_message({'data': json.dumps(message)})
+
+    assert near.local.get('task_1') == 1
\ No newline at end of file
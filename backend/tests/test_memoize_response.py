@@ -0,0 +1,77 @@
+import pytest
+from django.urls import reverse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+from core.cache import memoize_response
+from core.cache.utils import cache_stats
+
+factory = APIRequestFactory()
+
+@pytest.mark.django_db
+def test_repeated_calls_hit(authenticated_client, test_tasks):
+    cache_stats.reset()
+    url = reverse('frequently-accessed-data')
+    bodies = {authenticated_client.get(url).content for _ in range(50)}
+    assert len(bodies) == 1
+
+    stats = cache_stats.snapshot()['frequently-accessed-data']
+    assert (stats['hits'], stats['misses']) == (49, 1)
+    assert stats['hit_ratio'] >= 0.98
+
+@pytest.mark.django_db
+def test_task_write_retires_entry(authenticated_client, test_tasks):
+    url = reverse('frequently-accessed-data')
+    assert authenticated_client.get(url).json()['stats']['total_tasks'] == 3
+    authenticated_client.post(reverse('create-task'), {'title': 'Another'}, format='json')
+    assert authenticated_client.get(url).json()['stats']['total_tasks'] == 4
+
+def test_function_view_keys_are_canonical():
+    calls = []
+
+    @api_view(['GET'])
+    @permission_classes([AllowAny])
+    @memoize_response('memo-test-function', scope='global')
+    def view(request):
+        calls.append(request.GET.dict())
+        return Response({'calls': len(calls)}, headers={'X-Custom': 'kept'})
+
+    first = view(factory.get('/memo/', {'b': '2', 'a': '1'}))
+    second = view(factory.get('/memo/?a=1&b=2'))
+    assert len(calls) == 1
+    assert second.content == first.content
+    assert second['Content-Type'] == first['Content-Type']
+    assert second['X-Custom'] == 'kept'
+
+    view(factory.get('/memo/?a=1&b=3'))
+    assert len(calls) == 2
+
+def test_api_view_method_scoped_per_user(django_user_model):
+    calls = []
+
+    class MemoView(APIView):
+        permission_classes = [AllowAny]
+
+        @memoize_response('memo-test-method')
+        def get(self, request, pk):
+            calls.append(pk)
+            return Response({'pk': pk, 'user': request.user.username})
+
+    view = MemoView.as_view()
+    alice, bob = django_user_model(username='alice', pk=101), django_user_model(username='bob', pk=102)
+
+    def get(user, pk):
+        request = factory.get(f'/memo/{pk}/')
+        force_authenticate(request, user=user)
+        response = view(request, pk=pk)
+        if hasattr(response, 'render'):
+            response.render()
+        return response.content
+
+    assert get(alice, 1) == get(alice, 1)
+    assert b'"user":"alice"' in get(alice, 1)
+    assert b'"user":"bob"' in get(bob, 1)
+    get(alice, 2)
+    assert calls == [1, 1, 2]
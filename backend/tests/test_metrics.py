@@ -0,0 +1,42 @@
+import time
+import uuid
+import pytest
+from django.urls import reverse
+from core.connections import get_redis_client
+from core.metrics import RequestMetrics
+
+@pytest.fixture
+def metrics():
+    registry = RequestMetrics(get_redis_client('cache', decode_responses=True), key_prefix=f"test:{uuid.uuid4()}")
+    yield registry
+    registry.reset()
+
+def test_histogram_is_cumulative_and_aggregated(metrics):
+    for duration in (0.001, 0.02, 0.02, 3.0):
+        metrics.request_started()
+        metrics.request_finished('task-list', 'GET', 200, duration)
+    metrics.request_started()
+
+    body = metrics.render()
+    assert 'http_request_duration_seconds_bucket{route="task-list",method="GET",le="0.005"} 1' in body
+    assert 'http_request_duration_seconds_bucket{route="task-list",method="GET",le="0.025"} 3' in body
+    assert 'http_request_duration_seconds_bucket{route="task-list",method="GET",le="+Inf"} 4' in body
+    assert 'http_request_duration_seconds_count{route="task-list",method="GET"} 4' in body
+    assert 'http_requests_total{route="task-list",method="GET",status="200"} 4' in body
+    assert 'http_requests_in_flight 1' in body
+
+def test_recording_stays_cheap(metrics):
+    start = time.perf_counter()
+    for _ in range(10000):
+        metrics.request_started()
+        metrics.request_finished('task-list', 'GET', 200, 0.01)
+    assert (time.perf_counter() - start) / 10000 < 50e-6
+
+@pytest.mark.django_db
+def test_metrics_endpoint_reports_routes(api_client):
+    api_client.get(reverse('api-health'))
+
+    response = api_client.get(reverse('api-metrics'))
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain')
+    assert 'route="api-health",method="GET",status="200"' in response.content.decode()
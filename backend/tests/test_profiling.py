@@ -0,0 +1,50 @@
+import uuid
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory
+from core.connections import get_redis_client
+from core.profiling import ProfileStore, RequestProfiler, collapsed_stacks
+
+@pytest.fixture
+def profiler():
+    store = ProfileStore(get_redis_client('cache'), key_prefix=f"test:{uuid.uuid4()}", ttl=60, max_profiles=2)
+    return RequestProfiler(store, enabled=True, rate=0.0, tokens=['secret'])
+
+def busy():
+    return sum(i * i for i in range(20000))
+
+def test_only_token_requests_are_forced(profiler):
+    assert profiler.start(RequestFactory().get('/')) is None
+    assert profiler.start(RequestFactory().get('/', HTTP_X_PROFILE_TOKEN='wrong')) is None
+
+    started = profiler.start(RequestFactory().get('/', HTTP_X_PROFILE_TOKEN='secret'))
+    assert started is not None
+    session, forced = started
+    busy()
+    profile_id = profiler.finish(session, forced, {'method': 'GET', 'path': '/', 'status': 200, 'duration': 0.1}, False)
+
+    stats = profiler.store.load(profile_id)
+    assert any(name == 'busy' for (_, _, name) in stats)
+    assert any('busy' in line for line in collapsed_stacks(stats))
+
+def test_store_keeps_the_slowest(profiler):
+    profiler.rate = 1.0
+    for duration in (0.5, 2.0, 1.0):
+        session, forced = profiler.start(RequestFactory().get('/'))
+        busy()
+        profiler.finish(session, forced, {'method': 'GET', 'path': '/', 'status': 200, 'duration': duration}, True)
+
+    assert [meta['duration'] for meta in profiler.store.worst()] == [2.0, 1.0]
+
+def test_command_lists_and_dumps(profiler, monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr('core.management.commands.request_profiles.request_profiler', profiler)
+    session, forced = profiler.start(RequestFactory().get('/', HTTP_X_PROFILE_TOKEN='secret'))
+    busy()
+    profile_id = profiler.finish(session, forced, {'method': 'GET', 'path': '/slow/', 'status': 200, 'duration': 1.5}, True)
+
+    call_command('request_profiles')
+    assert profile_id in capsys.readouterr().out
+
+    output = tmp_path / 'profile.prof'
+    call_command('request_profiles', profile_id, format='pstats', output=str(output))
+    assert output.stat().st_size > 0
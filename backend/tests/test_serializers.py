@@ -0,0 +1,56 @@
+import json
+import pytest
+from core.cache.backends import HierarchicalRedisCache
+from core.cache.serializers import AVAILABLE, MARKER, CacheSerializer, is_framed
+
+TASKS = [
+    {'id': i, 'title': f"Task {i}", 'description': "Description " * 20, 'completed': i % 2 == 0}
+    for i in range(50)
+]
+
+@pytest.mark.parametrize('serializer', [name for name in ('json', 'orjson', 'msgpack') if AVAILABLE[name]])
+def test_round_trip_with_header(serializer):
+    codec = CacheSerializer(serializer)
+    payload = codec.dumps(TASKS)
+
+    assert payload[0] == MARKER
+    assert codec.loads(payload) == TASKS
+
+def test_numeric_strings_stay_strings():
+    backend = HierarchicalRedisCache('', {})
+    assert backend.decode(backend.encode('123')) == '123'
+    assert backend.decode(backend.encode('1.5')) == '1.5'
+    assert backend.decode(backend.encode(42)) == 42
+
+def test_compression_above_threshold_only():
+    codec = CacheSerializer('json', 'zlib', compress_min_length=512)
+
+    small = codec.dumps({'id': 1})
+    large = codec.dumps(TASKS)
+
+    assert small[1] & 0x0F == 0
+    assert large[1] & 0x0F != 0
+    assert len(large) < len(json.dumps(TASKS))
+    assert codec.loads(large) == TASKS
+
+def test_reads_payloads_from_other_configurations():
+    written = CacheSerializer('json', 'zlib', compress_min_length=0).dumps(TASKS)
+    reader = CacheSerializer('json')
+    assert reader.loads(written) == TASKS
+
+def test_legacy_payloads_still_decode():
+    backend = HierarchicalRedisCache('', {})
+    legacy = json.dumps({'id': 1}).encode('utf-8')
+
+    assert not is_framed(legacy)
+    assert backend.decode(legacy) == {'id': 1}
+
+def test_legacy_bytes_starting_with_the_marker():
+    backend = HierarchicalRedisCache('', {})
+    unknown_type = bytes((MARKER, 0xE7)) + b'raw'
+    bad_payload = bytes((MARKER, 0x11)) + b'not zlib data'
+
+    assert not is_framed(unknown_type)
+    assert backend.decode(unknown_type) == unknown_type
+    assert is_framed(bad_payload)
+    assert backend.decode(bad_payload) == bad_payload
@@ -0,0 +1,47 @@
+import pytest
+from django.contrib.sessions.backends.db import SessionStore as DBSessionStore
+from django.contrib.sessions.models import Session
+from core.sessions import SessionStore, copy_db_sessions
+
+@pytest.mark.django_db
+def test_db_session_is_moved_to_redis_on_first_read(django_assert_num_queries):
+    legacy = DBSessionStore()
+    legacy['user'] = 'alice'
+    legacy.create()
+
+    store = SessionStore(legacy.session_key)
+    assert store['user'] == 'alice'
+    assert not Session.objects.filter(session_key=legacy.session_key).exists()
+
+    with django_assert_num_queries(0):
+        assert SessionStore(legacy.session_key)['user'] == 'alice'
+
+@pytest.mark.django_db
+def test_unchanged_session_is_not_written(monkeypatch):
+    store = SessionStore()
+    store['cart'] = [1, 2]
+    store.save()
+
+    reloaded = SessionStore(store.session_key)
+    reloaded['cart'] = [1, 2]
+    assert reloaded.modified
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unexpected session write")
+
+    monkeypatch.setattr(reloaded._cache, 'set', fail)
+    reloaded.save()
+
+@pytest.mark.django_db
+def test_logout_does_not_resurrect_db_copy():
+    legacy = DBSessionStore()
+    legacy['user'] = 'bob'
+    legacy.create()
+    assert copy_db_sessions(delete=False) >= 1
+
+    store = SessionStore(legacy.session_key)
+    assert store['user'] == 'bob'
+    store.flush()
+
+    assert SessionStore(legacy.session_key).load() == {}
+    assert not Session.objects.filter(session_key=legacy.session_key).exists()
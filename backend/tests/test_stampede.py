@@ -0,0 +1,179 @@
+import time
+import pytest
+from core.cache.decorators import cache_method
+from core.cache.stampede import (
+    LOCK_PREFIX, get_or_compute, make_envelope, metrics, should_recompute
+)
+from core.cache.utils import get_cache, set_cache, redis_client
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+def test_should_recompute_after_expiry():
+    envelope = {'expiry': time.time() - 1, 'delta': 0.1}
+    assert should_recompute(envelope)
+
+def test_should_recompute_early_only_when_enabled():
+    envelope = {'expiry': time.time() + 1, 'delta': 10.0}
+    assert not should_recompute(envelope, beta=0)
+    # A slow computation close to expiry is refreshed with near certainty
+    assert should_recompute(envelope, beta=1000)
+
+def test_should_not_recompute_without_expiry():
+    assert not should_recompute({'expiry': None, 'delta': 10.0}, beta=1000)
+
+@pytest.mark.django_db
+def test_stale_value_served_while_locked():
+    key = 'stampede:test:stale'
+    envelope = make_envelope('stale', 60, 0.1)
+    envelope['expiry'] = time.time() - 1
+    set_cache(key, envelope, 60)
+
+    # Simulate another worker holding the recompute lock
+    lock = redis_client.lock(f"{LOCK_PREFIX}{key}", timeout=10)
+    assert lock.acquire(blocking=False)
+    try:
+        lookup = get_or_compute(key, lambda: 'fresh', 60, beta=0)
+    finally:
+        lock.release()
+
+    assert not lookup.computed
+    assert lookup.value == 'stale'
+    assert metrics.snapshot()['stale_served'] == 1
+
+@pytest.mark.django_db
+def test_early_refresh_recomputes_before_expiry():
+    key = 'stampede:test:early'
+    set_cache(key, make_envelope('old', 60, 100.0), 120)
+
+    lookup = get_or_compute(key, lambda: 'new', 60, beta=1000)
+
+    assert lookup.computed
+    assert lookup.result == 'new'
+    assert get_cache(key)['value'] == 'new'
+    assert metrics.snapshot()['early_refreshes'] == 1
+
+@pytest.mark.django_db
+def test_cache_method_stampede_mode_computes_once():
+    calls = []
+
+    class Report:
+        @cache_method('report', timeout=60, stampede_protection=True, early_recompute_beta=0)
+        def build(self):
+            calls.append(1)
+            return {'total': 3}
+
+    report = Report()
+    assert report.build() == {'total': 3}
+    assert report.build() == {'total': 3}
+    assert len(calls) == 1
+
+@pytest.mark.django_db
+def test_cache_view_serves_stale_and_refreshes_in_background():
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from core.cache.decorators import cache_view
+
+    calls = []
+
+    @cache_view('swr-test', timeout=60, soft_timeout=30)
+    def view(request):
+        calls.append(1)
+        return HttpResponse(f"version {len(calls)}")
+
+    request = RequestFactory().get('/swr-test/')
+    assert view(request).content == b"version 1"
+
+    # Age the cached envelope past its soft timeout
+    cache_key = 'swr-test:/swr-test/'
+    envelope = get_cache(cache_key)
+    envelope['expiry'] = time.time() - 1
+    set_cache(cache_key, envelope, 30)
+
+    assert view(request).content == b"version 1"
+
+    deadline = time.time() + 2
+    while get_cache(cache_key)['value']['content'] != b"version 2" and time.time() < deadline:
+        time.sleep(0.05)
+
+    assert view(request).content == b"version 2"
+    assert metrics.snapshot()['background_refreshes'] == 1
+
+@pytest.mark.django_db
+def test_background_refresh_releases_lock_and_uses_detached_request():
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from core.cache.decorators import cache_view
+
+    seen = []
+
+    @cache_view('swr-lock-test', timeout=60, soft_timeout=30)
+    def view(request):
+        seen.append(request)
+        return HttpResponse(f"version {len(seen)}")
+
+    request = RequestFactory().get('/swr-lock-test/', {'page': '2'})
+    view(request)
+
+    cache_key = 'swr-lock-test:/swr-lock-test/:page=2'
+    envelope = get_cache(cache_key)
+    envelope['expiry'] = time.time() - 1
+    set_cache(cache_key, envelope, 30)
+
+    assert view(request).content == b"version 1"
+
+    deadline = time.time() + 2
+    while get_cache(cache_key)['value']['content'] != b"version 2" and time.time() < deadline:
+        time.sleep(0.05)
+
+    # The refresh thread released the lock it did not acquire itself
+    assert not redis_client.exists(f"{LOCK_PREFIX}{cache_key}")
+    refreshed = seen[-1]
+    assert refreshed is not request
+    assert refreshed.path == '/swr-lock-test/'
+    assert refreshed.GET['page'] == '2'
+
+@pytest.mark.django_db
+def test_background_refresh_of_api_view_gets_a_drf_request(test_user, monkeypatch):
+    from rest_framework.decorators import api_view
+    from rest_framework.response import Response
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from core.cache import decorators
+
+    copies = []
+    detached_request = decorators._detached_request
+    monkeypatch.setattr(decorators, '_detached_request', lambda request: copies.append(1) or detached_request(request))
+    seen = []
+
+    @api_view(['GET'])
+    @decorators.cache_view('swr-api-test', timeout=60, soft_timeout=30)
+    def view(request):
+        seen.append((request.query_params.get('page'), request.user))
+        return Response({'version': len(seen)})
+
+    def get():
+        request = APIRequestFactory().get('/swr-api-test/', {'page': '2'})
+        force_authenticate(request, user=test_user)
+        return view(request)
+
+    assert get().data == {'version': 1}
+    assert get().data == {'version': 1}
+    # Fresh hits never copy the request
+    assert copies == []
+
+    cache_key = 'swr-api-test:/swr-api-test/:page=2'
+    envelope = get_cache(cache_key)
+    envelope['expiry'] = time.time() - 1
+    set_cache(cache_key, envelope, 30)
+
+    assert get().data == {'version': 1}
+    deadline = time.time() + 2
+    while get_cache(cache_key)['value'] != {'version': 2} and time.time() < deadline:
+        time.sleep(0.05)
+
+    assert copies == [1]
+    assert seen[-1] == ('2', test_user)
+    assert get().data == {'version': 2}
@@ -0,0 +1,52 @@
+import pytest
+from django.urls import reverse
+from task_manager import cache as task_list_cache
+from task_manager.models import Task
+
+@pytest.fixture
+def tasks():
+    return [Task.objects.create(title=f"Task {i}", description='') for i in range(5)]
+
+@pytest.mark.django_db
+def test_writes_patch_list_without_rebuild(authenticated_client, tasks):
+    url = reverse('get-tasks')
+    assert len(authenticated_client.get(url).json()) == 5
+    assert task_list_cache.redis_client.exists(task_list_cache.WARM_KEY)
+
+    authenticated_client.put(
+        reverse('update-task', args=[tasks[1].id]),
+        {'title': 'Renamed', 'completed': True}, format='json'
+    )
+    authenticated_client.delete(reverse('delete-task', args=[tasks[2].id]))
+
+    # The cached structure was patched in place, not dropped
+    assert task_list_cache.redis_client.exists(task_list_cache.WARM_KEY)
+    listed = authenticated_client.get(url).json()
+    assert [task['id'] for task in listed] == [tasks[i].id for i in (0, 1, 3, 4)]
+    assert listed[1]['title'] == 'Renamed'
+
+    completed = authenticated_client.get(url, {'completed': 'true'}).json()
+    assert [task['id'] for task in completed] == [tasks[1].id]
+
+@pytest.mark.django_db
+def test_pages_served_from_cache(tasks, django_assert_num_queries):
+    assert task_list_cache.get_page({}, 0, 2) == (
+        [task_list_cache.task_row(task) for task in tasks[:2]], tasks[1].id
+    )
+    with django_assert_num_queries(0):
+        rows, next_cursor = task_list_cache.get_page({}, tasks[1].id, 10)
+    assert [row['id'] for row in rows] == [task.id for task in tasks[2:]]
+    assert next_cursor is None
+
+@pytest.mark.django_db
+def test_build_discarded_when_write_races(tasks, monkeypatch):
+    order_by = Task.objects.order_by
+
+    def racing_order_by(*args, **kwargs):
+        # A write lands between the generation check and the swap
+        task_list_cache.remove_tasks([tasks[0].id])
+        return order_by(*args, **kwargs)
+
+    monkeypatch.setattr(Task.objects, 'order_by', racing_order_by)
+    assert task_list_cache.ensure_built() is False
+    assert not task_list_cache.redis_client.exists(task_list_cache.WARM_KEY)
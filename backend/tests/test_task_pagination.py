@@ -0,0 +1,59 @@
+import json
+import pytest
+from django.urls import reverse
+from task_manager.models import Task
+
+@pytest.fixture
+def many_tasks():
+    return [
+        Task.objects.create(title=f"Task {i}", completed=(i % 2 == 0))
+        for i in range(7)
+    ]
+
+@pytest.mark.django_db
+def test_keyset_pages_cover_all_tasks(authenticated_client, many_tasks):
+    url = reverse('get-tasks')
+    seen = []
+    cursor = 0
+    while True:
+        response = authenticated_client.get(url, {'cursor': cursor, 'limit': 3})
+        assert response.status_code == 200
+        seen.extend(task['id'] for task in response.json())
+        assert response['X-Page-Limit'] == '3'
+        if 'X-Next-Cursor' not in response:
+            assert response['X-Has-More'] == 'false'
+            break
+        assert response['X-Has-More'] == 'true'
+        assert 'rel="next"' in response['Link']
+        cursor = response['X-Next-Cursor']
+
+    assert seen == [task.id for task in many_tasks]
+
+@pytest.mark.django_db
+def test_pages_are_cached_per_filter_and_invalidated(authenticated_client, many_tasks):
+    url = reverse('get-tasks')
+    completed = authenticated_client.get(url, {'completed': 'true'}).json()
+    assert all(task['completed'] for task in completed)
+    assert len(authenticated_client.get(url).json()) == 7
+
+    authenticated_client.delete(reverse('delete-task', args=[many_tasks[0].id]))
+    assert len(authenticated_client.get(url).json()) == 6
+    assert len(authenticated_client.get(url, {'completed': 'true'}).json()) == len(completed) - 1
+
+@pytest.mark.django_db
+def test_invalid_cursor_rejected(authenticated_client):
+    response = authenticated_client.get(reverse('get-tasks'), {'cursor': 'abc'})
+    assert response.status_code == 400
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('fmt', ['ndjson', 'json'])
+def test_streaming_modes(authenticated_client, many_tasks, fmt):
+    response = authenticated_client.get(reverse('get-tasks'), {'stream': fmt})
+    assert response.streaming
+    body = b''.join(response.streaming_content).decode()
+
+    if fmt == 'ndjson':
+        rows = [json.loads(line) for line in body.splitlines()]
+    else:
+        rows = json.loads(body)
+    assert [row['id'] for row in rows] == [task.id for task in many_tasks]
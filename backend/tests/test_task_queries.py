@@ -0,0 +1,132 @@
+import re
+import datetime
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from task_manager import cache as task_list_cache
+from task_manager.models import Task
+from task_manager.views import _page_querysets
+
+TODAY = datetime.date(2030, 1, 1)
+
+@pytest.fixture
+def tasks(test_user, admin_user):
+    specs = [
+        (test_user, 'pending', 1, TODAY),
+        (test_user, 'completed', 3, TODAY + datetime.timedelta(days=2)),
+        (test_user, 'in_progress', 2, None),
+        (admin_user, 'pending', 3, TODAY + datetime.timedelta(days=1)),
+        (test_user, 'pending', 2, TODAY + datetime.timedelta(days=1)),
+        (admin_user, 'completed', 1, None),
+    ]
+    return [
+        Task.objects.create(title=f"Task {i}", description='', user=user, status=status, priority=priority,
+                            due_date=due_date, completed=(status == 'completed'))
+        for i, (user, status, priority, due_date) in enumerate(specs)
+    ]
+
+def _all_pages(client, params, limit=2):
+    ids = []
+    params = {**params, 'limit': limit}
+    while True:
+        response = client.get(reverse('get-tasks'), params)
+        assert response.status_code == 200, response.content
+        ids.extend(task['id'] for task in response.json())
+        if 'X-Next-Cursor' not in response:
+            return ids
+        params['cursor'] = response['X-Next-Cursor']
+
+@pytest.mark.django_db
+def test_filters(authenticated_client, tasks, test_user):
+    ids = lambda *indexes: [tasks[i].id for i in indexes]
+    assert _all_pages(authenticated_client, {'user': 'me'}) == ids(0, 1, 2, 4)
+    assert _all_pages(authenticated_client, {'user': test_user.id, 'status': 'pending'}) == ids(0, 4)
+    assert _all_pages(authenticated_client, {'priority': 3}) == ids(1, 3)
+    assert _all_pages(authenticated_client, {'due_date': TODAY.isoformat()}) == ids(0)
+    assert _all_pages(authenticated_client, {'due_after': '2030-01-02', 'due_before': '2030-01-02'}) == ids(3, 4)
+
+@pytest.mark.django_db
+def test_orderings_page_through_every_task(authenticated_client, tasks):
+    ids = lambda *indexes: [tasks[i].id for i in indexes]
+    assert _all_pages(authenticated_client, {'ordering': 'priority'}) == ids(0, 5, 2, 4, 1, 3)
+    assert _all_pages(authenticated_client, {'ordering': '-priority'}) == ids(3, 1, 4, 2, 5, 0)
+    # Tasks without a due date come last either way
+    assert _all_pages(authenticated_client, {'ordering': 'due_date'}) == ids(0, 3, 4, 1, 2, 5)
+    assert _all_pages(authenticated_client, {'ordering': '-due_date'}) == ids(1, 4, 3, 0, 2, 5)
+    assert _all_pages(authenticated_client, {'ordering': 'due_date', 'user': 'me'}, limit=1) == ids(0, 4, 1, 2)
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [
+    {'status': 'unknown'}, {'priority': 'high'}, {'due_date': '01/01/2030'},
+    {'ordering': 'title'}, {'ordering': 'priority', 'cursor': '12'},
+])
+def test_invalid_query_rejected(authenticated_client, params):
+    assert authenticated_client.get(reverse('get-tasks'), params).status_code == 400
+
+@pytest.mark.django_db
+def test_query_pages_cached_per_normalized_filter_set(authenticated_client, tasks, test_user,
+                                                       django_assert_num_queries):
+    url = reverse('get-tasks')
+    pattern = f"{task_list_cache.QUERY_KEY_PREFIX}:*"
+    first = authenticated_client.get(url, {'user': 'me', 'status': 'pending'}).json()
+    assert len(task_list_cache.redis_client.keys(pattern)) == 1
+
+    # Same filters spelled differently hit the same entry, without a query
+    with django_assert_num_queries(0):
+        again = authenticated_client.get(url, {'status': 'pending', 'user': test_user.id}).json()
+    assert again == first
+    authenticated_client.get(url, {'user': 'me', 'status': 'completed'})
+    assert len(task_list_cache.redis_client.keys(pattern)) == 2
+
+    # A write retires every cached query
+    authenticated_client.put(reverse('update-task', args=[tasks[2].id]), {'status': 'pending'}, format='json')
+    refreshed = authenticated_client.get(url, {'user': 'me', 'status': 'pending'}).json()
+    assert [task['id'] for task in refreshed] == [tasks[0].id, tasks[2].id, tasks[4].id]
+
+ROWS = 1_000_000
+USERS = 50
+
+@pytest.fixture
+def million_tasks():
+    User = get_user_model()
+    User.objects.bulk_create([User(username=f"owner{i}") for i in range(USERS)])
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s),
+            owners AS (SELECT id, ROW_NUMBER() OVER (ORDER BY id) - 1 AS rn FROM {User._meta.db_table})
+            INSERT INTO {Task._meta.db_table}
+                (title, description, completed, user_id, status, priority, due_date, created_at, updated_at)
+            SELECT 'Task ' || n, '', n % 2, owners.id,
+                   CASE n % 3 WHEN 0 THEN 'pending' WHEN 1 THEN 'in_progress' ELSE 'completed' END,
+                   n % 3 + 1,
+                   CASE WHEN n % 10 = 0 THEN NULL ELSE date('2030-01-01', '+' || (n % 365) || ' days') END,
+                   '2030-01-01 00:00:00', '2030-01-01 00:00:00'
+            FROM seq JOIN owners ON owners.rn = seq.n % {USERS}
+        """, [ROWS])
+        cursor.execute("ANALYZE")
+    return User.objects.order_by('id').values_list('id', flat=True).first()
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='Asserts SQLite query plans')
+def test_every_filter_uses_an_index(million_tasks):
+    user_id = million_tasks
+    cases = [
+        ({'completed': True}, 'id'),
+        ({'status': 'pending'}, 'id'),
+        ({'priority': 2}, 'id'),
+        ({'due_date': datetime.date(2030, 3, 1)}, 'id'),
+        ({'due_date__gte': datetime.date(2030, 3, 1), 'due_date__lte': datetime.date(2030, 3, 7)}, 'due_date'),
+        ({'user_id': user_id}, 'id'),
+        ({'user_id': user_id, 'status': 'pending'}, 'id'),
+        ({'user_id': user_id}, 'priority'),
+        ({'user_id': user_id}, '-due_date'),
+        ({}, 'priority'),
+        ({}, 'due_date'),
+    ]
+    for filters, ordering in cases:
+        for queryset in _page_querysets(Task.objects.filter(**filters), ordering, None):
+            plan = queryset.values()[:101].explain()
+            # Every access to the table goes through an index, never a full scan
+            assert re.search(r'USING (COVERING )?INDEX', plan), (filters, ordering, plan)
+            assert not re.search(rf'SCAN {Task._meta.db_table}$', plan, re.M), (filters, ordering, plan)
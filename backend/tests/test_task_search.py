@@ -0,0 +1,76 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from task_manager import search as task_search
+from task_manager.models import Task
+
+@pytest.fixture
+def indexed_tasks(authenticated_client):
+    specs = [
+        ('Write quarterly report', 'Numbers for the board'),
+        ('Review pull request', 'Report bugs found in the review'),
+        ('Book flights', 'Conference trip, see the report template'),
+    ]
+    for title, description in specs:
+        authenticated_client.post(
+            reverse('create-task'), {'title': title, 'description': description}, format='json'
+        )
+    return list(Task.objects.order_by('id'))
+
+def _search(client, **params):
+    response = client.get(reverse('search-tasks'), params)
+    assert response.status_code == 200, response.content
+    return response.json()
+
+@pytest.mark.django_db
+def test_results_ranked_by_weighted_term_frequency(authenticated_client, indexed_tasks):
+    body = _search(authenticated_client, q='report')
+    assert body['total'] == 3
+    # A title match outweighs description matches
+    assert [task['id'] for task in body['results']][0] == indexed_tasks[0].id
+    assert body['results'][0]['title'] == 'Write quarterly report'
+
+    body = _search(authenticated_client, q='review report')
+    assert [task['id'] for task in body['results']] == [indexed_tasks[1].id]
+
+@pytest.mark.django_db
+def test_prefix_search(authenticated_client, indexed_tasks):
+    assert _search(authenticated_client, q='quart')['total'] == 0
+    body = _search(authenticated_client, q='quart', prefix='true')
+    assert [task['id'] for task in body['results']] == [indexed_tasks[0].id]
+    body = _search(authenticated_client, q='report con', prefix='true')
+    assert [task['id'] for task in body['results']] == [indexed_tasks[2].id]
+
+@pytest.mark.django_db
+def test_index_follows_updates_and_deletes(authenticated_client, indexed_tasks):
+    authenticated_client.put(
+        reverse('update-task', args=[indexed_tasks[2].id]),
+        {'title': 'Book hotel', 'description': 'Near the venue'}, format='json'
+    )
+    assert _search(authenticated_client, q='flights')['total'] == 0
+    assert [task['id'] for task in _search(authenticated_client, q='hotel')['results']] == [indexed_tasks[2].id]
+
+    authenticated_client.delete(reverse('delete-task', args=[indexed_tasks[0].id]))
+    assert _search(authenticated_client, q='quarterly')['total'] == 0
+    assert _search(authenticated_client, q='report')['total'] == 1
+
+@pytest.mark.django_db
+def test_hot_query_served_from_cache(authenticated_client, indexed_tasks, django_assert_num_queries):
+    first = _search(authenticated_client, q='report', limit=2)
+    with django_assert_num_queries(0):
+        assert _search(authenticated_client, q='report', limit=2) == first
+    assert task_search.redis_client.keys(f"{task_search.RESULTS_KEY_PREFIX}:*")
+
+@pytest.mark.django_db
+def test_rebuild_command_backfills(authenticated_client, indexed_tasks):
+    Task.objects.create(title='Imported task', description='Created without the API')
+    task_search.clear()
+    assert _search(authenticated_client, q='report')['total'] == 0
+
+    call_command('rebuild_search_index', batch_size=2)
+    assert _search(authenticated_client, q='report')['total'] == 3
+    assert _search(authenticated_client, q='imported')['total'] == 1
+
+@pytest.mark.django_db
+def test_search_requires_query(authenticated_client):
+    assert authenticated_client.get(reverse('search-tasks')).status_code == 400
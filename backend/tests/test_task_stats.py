@@ -0,0 +1,74 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from task_manager import stats as task_stats
+from task_manager.models import Task
+
+def _counters_match_db(user_id=None):
+    assert task_stats.get_stats(user_id) == task_stats.get_stats_from_db(user_id)
+
+@pytest.fixture
+def reconciled():
+    assert task_stats.reconcile().corrections is not None
+
+@pytest.mark.django_db
+def test_write_paths_keep_counters_exact(authenticated_client, test_user, reconciled):
+    for i in range(3):
+        authenticated_client.post(reverse('create-task'), {'title': f'Task {i}', 'priority': 2}, format='json')
+    first, second, third = Task.objects.order_by('id')
+    _counters_match_db(test_user.id)
+
+    authenticated_client.put(
+        reverse('update-task', args=[first.id]), {'status': 'completed', 'completed': True}, format='json'
+    )
+    authenticated_client.delete(reverse('delete-task', args=[second.id]))
+    authenticated_client.post(reverse('bulk-create-tasks'), [{'title': 'Bulk', 'priority': 3}], format='json')
+    authenticated_client.put(reverse('bulk-update-tasks'), [{'id': third.id, 'status': 'in_progress'}], format='json')
+    authenticated_client.delete(reverse('bulk-delete-tasks'), {'ids': [first.id]}, format='json')
+    _counters_match_db(test_user.id)
+
+    stats, user_stats = task_stats.get_stats(test_user.id)
+    assert stats['total'] == user_stats['total'] == 2
+    assert stats['by_status'] == {'pending': 1, 'in_progress': 1, 'completed': 0}
+    assert stats['by_priority'] == {1: 0, 2: 1, 3: 1}
+
+@pytest.mark.django_db
+def test_reconcile_corrects_drift(test_user, reconciled):
+    # Writes that bypass the views are not counted until reconciled
+    Task.objects.create(title='Imported', description='', user=test_user, completed=True)
+    assert task_stats.get_stats()[0]['total'] == 0
+
+    call_command('reconcile_task_stats')
+    _counters_match_db(test_user.id)
+    assert task_stats.get_stats()[0]['completed'] == 1
+
+@pytest.mark.django_db
+def test_lost_counters_rebuilt_on_read(test_user, django_assert_num_queries):
+    Task.objects.create(title='Existing', description='', user=test_user)
+    task_stats.redis_client.delete(task_stats.READY_KEY, task_stats.GLOBAL_KEY)
+    # One pass of grouped counts both rebuilds the counters and answers the read
+    with django_assert_num_queries(4):
+        stats, user_stats = task_stats.get_stats(test_user.id)
+    assert stats['total'] == user_stats['total'] == 1
+    assert task_stats.redis_client.exists(task_stats.READY_KEY)
+
+@pytest.mark.django_db
+def test_read_during_reconciliation_serves_stored_counters(test_user, reconciled, django_assert_num_queries):
+    Task.objects.create(title='Imported', description='', user=test_user)
+    task_stats.redis_client.delete(task_stats.READY_KEY)
+    lock = task_stats.redis_client.lock(task_stats.RECONCILE_LOCK_KEY, timeout=10)
+    assert lock.acquire(blocking=False)
+    try:
+        with django_assert_num_queries(0):
+            assert task_stats.get_stats()[0]['total'] == 0
+    finally:
+        lock.release()
+
+@pytest.mark.django_db
+def test_frequently_accessed_data_without_queries(authenticated_client, test_tasks, reconciled,
+                                                  django_assert_num_queries):
+    with django_assert_num_queries(0):
+        body = authenticated_client.get(reverse('frequently-accessed-data')).json()
+    assert body['stats']['total_tasks'] == 3
+    assert body['stats']['completed_tasks'] == 1
+    assert body['user_stats']['by_status']['pending'] == 2
@@ -0,0 +1,102 @@
+import json
+import time
+import uuid
+import pytest
+from datetime import timedelta
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.utils import aware_utcnow
+from core.authentication import BLACKLIST_INDEX_KEY, LocalBlacklist, RedisTokenStore, local_blacklist
+
+@pytest.fixture
+def store():
+    return RedisTokenStore()
+
+@pytest.fixture
+def blacklist(store):
+    worker = LocalBlacklist(store.redis_conn, channel=f"test:{uuid.uuid4()}", resync_interval=60)
+    assert not worker.contains('warmup', 'jwt:blacklist:warmup')
+    return worker
+
+def test_not_blacklisted_needs_no_redis(blacklist, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("unexpected Redis call")
+
+    monkeypatch.setattr(blacklist.redis_client, 'exists', fail)
+    assert not blacklist.contains('unknown-jti', 'jwt:blacklist:unknown-jti')
+
+def test_blacklist_token_is_seen_locally(store):
+    jti = uuid.uuid4().hex
+    store.add_token(1, jti, {}, aware_utcnow() + timedelta(minutes=5))
+    assert store.blacklist_token(jti)
+
+    assert store.is_blacklisted(jti)
+    assert local_blacklist._entries[jti] > time.time()
+
+def test_remote_messages_and_resync(store, blacklist):
+    jti = uuid.uuid4().hex
+    blacklist._handle_message({'data': json.dumps({'jti': jti, 'expires_at': time.time() + 60})})
+    assert blacklist.contains(jti, f"jwt:blacklist:{jti}")
+
+    # A token blacklisted by another worker whose message was missed is
+    # picked up by the next resync
+    missed = uuid.uuid4().hex
+    store.redis_conn.zadd(BLACKLIST_INDEX_KEY, {missed: time.time() + 60})
+    assert not blacklist.contains(missed, f"jwt:blacklist:{missed}")
+    blacklist.resync()
+    assert blacklist.contains(missed, f"jwt:blacklist:{missed}")
+
+def test_listener_errors_fall_back_to_redis(store, blacklist):
+    jti = uuid.uuid4().hex
+    store.redis_conn.set(f"jwt:blacklist:{jti}", "1", ex=60)
+
+    blacklist._fallback_until = time.monotonic() + 5
+    assert blacklist.contains(jti, f"jwt:blacklist:{jti}")
+
+def test_user_index_is_trimmed_sorted_set(store):
+    user_id = f"test-{uuid.uuid4().hex}"
+    key = store.user_tokens_key(user_id)
+    store.track_token(user_id, 'expired', aware_utcnow() - timedelta(seconds=1))
+    store.add_token(user_id, 'live', {}, aware_utcnow() + timedelta(minutes=5))
+
+    assert store.redis_conn.type(key) == b'zset'
+    assert store.redis_conn.zrange(key, 0, -1) == [b'live']
+    assert 0 < store.redis_conn.ttl(key) <= store.user_index_ttl
+
+def test_legacy_set_index_is_migrated(store):
+    user_id = f"test-{uuid.uuid4().hex}"
+    key = store.user_tokens_key(user_id)
+    store.redis_conn.set("jwt:token:old", json.dumps({'expires_at': int(time.time()) + 60}), ex=60)
+    store.redis_conn.sadd(key, 'old', 'gone')
+
+    store.add_token(user_id, 'new', {}, aware_utcnow() + timedelta(minutes=5))
+    assert sorted(store.redis_conn.zrange(key, 0, -1)) == [b'new', b'old']
+
+def test_revoke_all_for_user(store):
+    user_id = f"test-{uuid.uuid4().hex}"
+    jtis = [uuid.uuid4().hex for _ in range(3)]
+    for jti in jtis:
+        store.add_token(user_id, jti, {}, aware_utcnow() + timedelta(minutes=5))
+
+    assert store.revoke_all_for_user(user_id) == 3
+    assert all(store.is_blacklisted(jti) for jti in jtis)
+    assert not store.redis_conn.exists(store.user_tokens_key(user_id))
+
+@pytest.mark.django_db
+def test_change_password_ends_all_sessions(test_user):
+    client = APIClient()
+    login = client.post(reverse('login'), {'username': 'testuser', 'password': 'testpassword123'}, format='json')
+    access = login.json()['access']
+
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    response = client.post(
+        reverse('change-password'),
+        {'old_password': 'testpassword123', 'new_password': 'n3w-Passw0rd!'}, format='json'
+    )
+    assert response.status_code == 200
+
+    other = APIClient()
+    other.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    assert other.get(reverse('user-profile')).status_code == 401
+    refreshed = other.post(reverse('token_refresh'), {'refresh': login.json()['refresh']}, format='json')
+    assert refreshed.status_code == 401
\ No newline at end of file
@@ -0,0 +1,45 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from accounts.tokens import issue_tokens
+from core.authentication import token_store
+
+@pytest.mark.django_db
+def test_issue_tokens_uses_one_transaction(test_user, monkeypatch):
+    executed = []
+    pipeline = token_store.redis_conn.pipeline
+
+    def counting_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        executed.append(pipe)
+        return pipe
+
+    monkeypatch.setattr(token_store.redis_conn, 'pipeline', counting_pipeline)
+    data = issue_tokens(test_user)
+
+    assert len(executed) == 1
+    refresh, access = RefreshToken(data['refresh']), AccessToken(data['access'])
+    assert token_store.redis_conn.exists(f"jwt:token:{refresh['jti']}")
+    index = token_store.redis_conn.zrange(token_store.user_tokens_key(test_user.id), 0, -1)
+    assert {refresh['jti'].encode(), access['jti'].encode()} <= set(index)
+    assert set(data['expires']) == set(data['expiry']) == {'access', 'refresh'}
+
+@pytest.mark.django_db
+def test_refresh_records_rotated_tokens(test_user):
+    client = APIClient()
+    login = client.post(reverse('login'), {'username': 'testuser', 'password': 'testpassword123'}, format='json')
+
+    response = client.post(reverse('token_refresh'), {'refresh': login.json()['refresh']}, format='json')
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {'refresh', 'access', 'expires', 'expiry'}
+
+    new_refresh = RefreshToken(body['refresh'])
+    assert token_store.redis_conn.exists(f"jwt:token:{new_refresh['jti']}")
+    index = token_store.redis_conn.zrange(token_store.user_tokens_key(test_user.id), 0, -1)
+    assert AccessToken(body['access'])['jti'].encode() in index
+
+    # The rotated-out refresh token cannot be used again
+    again = client.post(reverse('token_refresh'), {'refresh': login.json()['refresh']}, format='json')
+    assert again.status_code == 401
@@ -0,0 +1,66 @@
+import time
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from accounts import activity
+from accounts.activity import PENDING_KEY, flush_activity, record_activity, should_record
+
+@pytest.fixture(autouse=True)
+def clean_activity():
+    activity.redis_client.delete(PENDING_KEY)
+    activity._recent.clear()
+    yield
+    activity.redis_client.delete(PENDING_KEY)
+    activity._recent.clear()
+
+@pytest.mark.django_db
+def test_throttle_counts_whole_days(test_user):
+    # The old check used timedelta.seconds, which ignores days
+    test_user.last_activity = timezone.now() - timedelta(days=2, seconds=10)
+    assert should_record(test_user)
+
+    test_user.last_activity = timezone.now() - timedelta(seconds=10)
+    assert not should_record(test_user)
+
+@pytest.mark.django_db
+def test_record_is_buffered_until_flush(test_user, django_assert_num_queries):
+    test_user.last_activity = None
+    with django_assert_num_queries(0):
+        record_activity(test_user.pk)
+    assert not should_record(test_user)
+
+    test_user.refresh_from_db()
+    assert test_user.last_activity is None
+
+    assert flush_activity() == 1
+    test_user.refresh_from_db()
+    assert abs(test_user.last_activity.timestamp() - time.time()) < 60
+    assert not activity.redis_client.exists(PENDING_KEY)
+
+@pytest.mark.django_db
+def test_flush_coalesces_and_restores_on_error(test_user, monkeypatch):
+    record_activity(test_user.pk, timestamp=1000)
+    record_activity(test_user.pk, timestamp=2000)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(type(test_user).objects, 'bulk_update', fail)
+    with pytest.raises(RuntimeError):
+        flush_activity()
+    assert float(activity.redis_client.hget(PENDING_KEY, test_user.pk)) == 2000
+
+    monkeypatch.undo()
+    assert flush_activity() == 1
+    test_user.refresh_from_db()
+    assert test_user.last_activity.timestamp() == 2000
+
+def test_flush_thread_started_once_per_process(monkeypatch):
+    started = []
+    monkeypatch.setitem(activity.activity_settings, 'FLUSH_INTERVAL', 30)
+    monkeypatch.setattr(activity._flusher, 'pid', None)
+    monkeypatch.setattr(activity, 'start_periodic', lambda func, interval, name: started.append(interval))
+
+    record_activity(1)
+    record_activity(2)
+    assert started == [30]
@@ -2,10 +2,17 @@ import axios from 'axios';
 
 const API_URL = 'http://localhost:8000/api';
 
+// The task list is paged: follow X-Next-Cursor until X-Has-More is false
 export const fetchTasks = async () => {
   try {
-    const response = await axios.get(`${API_URL}/tasks/`);
-    return response.data;
+    const tasks: any[] = [];
+    let cursor: string | undefined;
+    do {
+      const response = await axios.get(`${API_URL}/tasks/`, { params: cursor ? { cursor } : {} });
+      tasks.push(...response.data);
+      cursor = response.headers['x-has-more'] === 'true' ? response.headers['x-next-cursor'] : undefined;
+    } while (cursor);
+    return tasks;
   } catch (error) {
     console.error('Error fetching tasks:', error);
     throw error;